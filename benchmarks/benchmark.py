@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+
+"""Benchmarks for the Intcode interpreter and the challenge solvers."""
+
+from __future__ import annotations
+
+import json
+import statistics
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Final, Optional
+
+import typer
+
+ROOT: Final[Path] = Path(__file__).resolve().parent.parent
+CHALLENGE_DIR: Final[Path] = ROOT / "challenges"
+RESULTS_DIR: Final[Path] = ROOT / "benchmarks" / "results"
+DATA_DIR: Final[Path] = ROOT / "data"
+
+sys.path.insert(0, str(CHALLENGE_DIR))
+
+from aoc import get_solver  # noqa: E402
+from challenge_07 import (  # noqa: E402
+    find_fastest_phase_sequence,
+    run_amplifier_feedback_loop,
+    run_amplifier_series,
+)
+from intcode import Intcode, IntcodeComputer, IntcodeEngine, IntcodeInput  # noqa: E402
+from intcode_compiler import CompiledIntcodeComputer  # noqa: E402
+from intcode_loader import load_program, parse_program  # noqa: E402
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Called with the result of `setup` if there is one.
+    func: Callable[..., object]
+    # Intcode instructions executed by one call, for instructions per second.
+    n_instructions: Optional[int] = None
+    # Untimed preparation before each timed call (e.g. building a computer).
+    setup: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    times: list[float] = field(default_factory=list)
+    n_instructions: Optional[int] = None
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    @property
+    def instructions_per_second(self) -> Optional[float]:
+        if self.n_instructions is None:
+            return None
+        return self.n_instructions / self.best
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "median": self.median,
+            "best": self.best,
+            "times": self.times,
+            "n_instructions": self.n_instructions,
+            "instructions_per_second": self.instructions_per_second,
+        }
+
+    def __str__(self) -> str:
+        s = f"{self.name:<48} best: {self.best * 1000:>10.3f} ms"
+        s += f"  median: {self.median * 1000:>10.3f} ms"
+        if (ips := self.instructions_per_second) is not None:
+            s += f"  {ips / 1e6:>6.2f} M instr/s"
+        return s
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.baseline * 1000:.3f} ms -> "
+            f"{self.current * 1000:.3f} ms ({self.change:+.1%})"
+        )
+
+
+# ---- Running benchmarks ----
+
+
+def _call(bench: Benchmark) -> float:
+    args = () if bench.setup is None else (bench.setup(),)
+    start = perf_counter()
+    bench.func(*args)
+    return perf_counter() - start
+
+
+def time_benchmark(bench: Benchmark, warmup: int, repeat: int) -> BenchmarkResult:
+    """Time `repeat` calls of the benchmark after `warmup` untimed calls."""
+    result = BenchmarkResult(name=bench.name, n_instructions=bench.n_instructions)
+    for _ in range(warmup):
+        _call(bench)
+    for _ in range(repeat):
+        result.times.append(_call(bench))
+    return result
+
+
+def find_regressions(
+    results: list[BenchmarkResult], baseline: dict[str, float], threshold: float
+) -> list[Regression]:
+    """Benchmarks whose best time is more than `threshold` slower than the baseline.
+
+    The best of the repeated runs is compared since it is the least affected by
+    other work on the machine.
+    """
+    regressions = []
+    for res in results:
+        base = baseline.get(res.name)
+        if base is not None and res.best > base * (1.0 + threshold):
+            regressions.append(Regression(res.name, base, res.best))
+    return regressions
+
+
+def save_results(results: list[BenchmarkResult], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump([r.to_dict() for r in results], file, indent=2)
+    return None
+
+
+def load_best_times(path: Path) -> dict[str, float]:
+    with open(path, "r") as file:
+        return {r["name"]: r["best"] for r in json.load(file)}
+
+
+# ---- Benchmark definitions ----
+
+
+def _count_instructions(program: Intcode, inputs: list[int]) -> int:
+    comp = IntcodeComputer(program.copy())
+    profile = comp.enable_profiling()
+    comp.run(IntcodeInput(inputs))
+    return profile.n_instructions
+
+
+_ENGINES: Final[dict[str, Callable[[Intcode], IntcodeComputer]]] = {
+    "dispatch": lambda code: IntcodeComputer(code),
+    "opcode-classes": lambda code: IntcodeComputer(
+        code, engine=IntcodeEngine.OPCODE_CLASSES
+    ),
+    "compiled": lambda code: CompiledIntcodeComputer(code),
+}
+
+
+def day_2_program() -> Intcode:
+    program = load_program(DATA_DIR / "02" / "input.txt")
+    program[1], program[2] = 12, 2
+    return program
+
+
+def counting_loop(n: int) -> Intcode:
+    """Program that counts to `n` in a loop of three instructions and outputs it."""
+    return Intcode(
+        [1101, 0, 0, 20, 1001, 20, 1, 20, 1007, 20, n, 21, 1005, 21, 4, 4, 20, 99]
+        + [0] * 4
+    )
+
+
+# Program, inputs, and label of the Intcode interpreter benchmarks. The puzzle
+# programs are short, the counting loop runs long enough to time the engines alone.
+_INTCODE_RUNS: Final[list[tuple[Callable[[], Intcode], list[int], str]]] = [
+    (day_2_program, [], "day 2"),
+    (lambda: load_program(DATA_DIR / "05" / "input.txt"), [1], "day 5 (input 1)"),
+    (lambda: load_program(DATA_DIR / "05" / "input.txt"), [5], "day 5 (input 5)"),
+    (lambda: load_program(DATA_DIR / "07" / "input.txt"), [4, 17], "day 7 (one amp)"),
+    (lambda: load_program(DATA_DIR / "09" / "input.txt"), [1], "day 9"),
+    (lambda: counting_loop(100_000), [], "counting loop (100k iterations)"),
+]
+
+
+def intcode_benchmarks() -> list[Benchmark]:
+    """Runs of Intcode programs on each engine.
+
+    The program is copied and the computer built before each timed run.
+    """
+    benchmarks = []
+    for read_program, inputs, label in _INTCODE_RUNS:
+        program = read_program()
+        n_instructions = _count_instructions(program, inputs)
+        for engine, make_computer in _ENGINES.items():
+
+            def setup(
+                program: Intcode = program,
+                inputs: list[int] = inputs,
+                make_computer: Callable[[Intcode], IntcodeComputer] = make_computer,
+            ) -> tuple[IntcodeComputer, IntcodeInput]:
+                return make_computer(program.copy()), IntcodeInput(inputs)
+
+            def run(args: tuple[IntcodeComputer, IntcodeInput]) -> None:
+                computer, computer_inputs = args
+                computer.run(computer_inputs)
+                return None
+
+            benchmarks.append(
+                Benchmark(f"intcode {label} [{engine}]", run, n_instructions, setup)
+            )
+    return benchmarks
+
+
+def amplifier_benchmarks() -> list[Benchmark]:
+    program = load_program(DATA_DIR / "07" / "input.txt")
+    return [
+        Benchmark(
+            "day 7 amplifier series search",
+            lambda: find_fastest_phase_sequence(
+                program, amp_method=run_amplifier_series, amp_phases=list(range(5))
+            ),
+        ),
+        Benchmark(
+            "day 7 amplifier feedback loop search",
+            lambda: find_fastest_phase_sequence(
+                program,
+                amp_method=run_amplifier_feedback_loop,
+                amp_phases=list(range(5, 10)),
+            ),
+        ),
+    ]
+
+
+def loader_benchmarks() -> list[Benchmark]:
+    path = DATA_DIR / "09" / "input.txt"
+    load_program(path)  # fill the cache
+    return [
+        Benchmark(
+            "load day 9 program (parse)", lambda: parse_program(path.read_text())
+        ),
+        Benchmark("load day 9 program (cached)", lambda: load_program(path)),
+    ]
+
+
+# Challenge solvers timed part by part.
+_SOLVERS: Final[list[tuple[int, str]]] = [
+    (3, "day 3 wire tracing"),
+    (4, "day 4 password scan"),
+    (6, "day 6 orbit counting"),
+    (8, "day 8 image decoding"),
+]
+
+
+def solver_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+    for day, label in _SOLVERS:
+        for part in (1, 2):
+            if (solver := get_solver(day, part)) is not None:
+                benchmarks.append(Benchmark(f"{label} (part {part})", solver))
+    return benchmarks
+
+
+def all_benchmarks() -> list[Benchmark]:
+    return (
+        intcode_benchmarks()
+        + amplifier_benchmarks()
+        + loader_benchmarks()
+        + solver_benchmarks()
+    )
+
+
+# ---- Command line ----
+
+
+def main(
+    filter: Optional[str] = typer.Option(
+        None, help="Only run benchmarks whose name contains this text."
+    ),
+    warmup: int = typer.Option(1, help="Untimed runs before timing."),
+    repeat: int = typer.Option(5, help="Timed runs per benchmark."),
+    threshold: float = typer.Option(
+        0.1,
+        help="Slowdown of the best time (vs. the baseline) counted as a regression.",
+    ),
+    output: Path = typer.Option(RESULTS_DIR / "latest.json", help="Results file."),
+    baseline: Path = typer.Option(
+        RESULTS_DIR / "baseline.json", help="Results to compare against."
+    ),
+    save_baseline: bool = typer.Option(
+        False, help="Also save the results as the new baseline."
+    ),
+) -> None:
+    benchmarks = [b for b in all_benchmarks() if filter is None or filter in b.name]
+    results = []
+    for bench in benchmarks:
+        res = time_benchmark(bench, warmup=warmup, repeat=repeat)
+        print(res)
+        results.append(res)
+
+    save_results(results, output)
+    print(f"\nresults written to {output}")
+
+    regressions: list[Regression] = []
+    if baseline.exists() and baseline != output:
+        regressions = find_regressions(results, load_best_times(baseline), threshold)
+        print(f"compared against {baseline} ({len(regressions)} regressions)")
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+    if save_baseline:
+        save_results(results, baseline)
+        print(f"baseline written to {baseline}")
+    if len(regressions) > 0:
+        raise typer.Exit(code=1)
+    return None
+
+
+if __name__ == "__main__":
+    typer.run(main)
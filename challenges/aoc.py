@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+"""Run the challenge solutions from one process."""
+
+from __future__ import annotations
+
+import contextlib
+import importlib
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Final, Optional
+
+import typer
+
+CHALLENGE_DIR: Final[Path] = Path(__file__).parent
+PARTS: Final[tuple[int, ...]] = (1, 2)
+
+
+class UnknownChallengeException(BaseException):
+    pass
+
+
+@dataclass(frozen=True)
+class Solution:
+    day: int
+    part: int
+    answer: object
+    seconds: float
+
+    def format(self, timing: bool = False) -> str:
+        label = f"day {self.day} part {self.part}"
+        if timing:
+            label += f" ({self.seconds * 1000:.1f} ms)"
+        answer = str(self.answer)
+        if "\n" in answer:
+            answer = "\n" + answer.rstrip("\n")
+        return f"{label}: {answer}"
+
+    def __str__(self) -> str:
+        return self.format()
+
+
+def available_days() -> list[int]:
+    days = []
+    for path in CHALLENGE_DIR.glob("challenge_*.py"):
+        if (m := re.fullmatch(r"challenge_(\d+)\.py", path.name)) is not None:
+            days.append(int(m.group(1)))
+    return sorted(days)
+
+
+def get_solver(day: int, part: int) -> Optional[Callable[[], object]]:
+    """The `part_N()` function of a day's challenge, if it has one."""
+    name = f"challenge_{day:02d}"
+    try:
+        module = importlib.import_module(name)
+    except ModuleNotFoundError as err:
+        if err.name != name:
+            raise
+        raise UnknownChallengeException(day) from err
+    return getattr(module, f"part_{part}", None)
+
+
+def solve_day(
+    day: int, parts: tuple[int, ...] = PARTS, quiet: bool = True
+) -> list[Solution]:
+    """Solve the parts of one day.
+
+    With `quiet`, anything the solvers print is discarded.
+    """
+    solutions: list[Solution] = []
+    for part in parts:
+        if (solver := get_solver(day, part)) is None:
+            continue
+        with contextlib.ExitStack() as stack:
+            if quiet:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            start = perf_counter()
+            answer = solver()
+            seconds = perf_counter() - start
+        solutions.append(Solution(day, part, answer, seconds))
+    return solutions
+
+
+def solve_days(
+    days: list[int],
+    parts: tuple[int, ...] = PARTS,
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
+    quiet: bool = True,
+) -> list[Solution]:
+    """Solve the parts of several days, optionally one process per day."""
+    if not parallel:
+        return [s for day in days for s in solve_day(day, parts, quiet)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(solve_day, day, parts, quiet) for day in days]
+        return [s for future in futures for s in future.result()]
+
+
+# ---- Command line ----
+
+
+def main(
+    days: Optional[list[int]] = typer.Argument(
+        None, help="Days to run (default: all of them)."
+    ),
+    part: Optional[list[int]] = typer.Option(
+        None, "--part", "-p", help="Parts to run (default: both)."
+    ),
+    parallel: bool = typer.Option(False, help="Solve the days in parallel processes."),
+    timing: bool = typer.Option(False, help="Show how long each part took."),
+    verbose: bool = typer.Option(False, help="Show the solvers' own output."),
+) -> None:
+    days = list(days) if days else available_days()
+    parts = tuple(part) if part else PARTS
+    start = perf_counter()
+    solutions = solve_days(days, parts, parallel=parallel, quiet=not verbose)
+    for solution in solutions:
+        print(solution.format(timing=timing))
+    if timing:
+        print(f"total: {(perf_counter() - start) * 1000:.1f} ms")
+    return None
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,35 +1,71 @@
 #!/usr/bin/env python3
 
-import math
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Final, Iterator, Optional
+
+import numpy as np
+
+INPUT_FILE: Final[Path] = Path(__file__).parent.parent / "data" / "01" / "input.txt"
+
+MASS_DTYPE: Final = np.int64
+
+
+def read_module_masses(path: Path = INPUT_FILE) -> list[int]:
+    module_masses: list[int] = []
+    with open(path, "r") as file:
+        for line in file:
+            module_masses.append(int(line.strip()))
+    return module_masses
+
+
+def _parse_masses(text: bytes) -> np.ndarray:
+    with warnings.catch_warnings():
+        # Older versions of NumPy only warn about text they cannot parse.
+        warnings.simplefilter("error", DeprecationWarning)
+        return np.fromstring(text.decode(), dtype=MASS_DTYPE, sep=" ")
+
+
+def read_mass_chunks(
+    path: Path = INPUT_FILE, chunk_bytes: int = 1 << 24
+) -> Iterator[np.ndarray]:
+    """Module masses, one per line, in arrays read `chunk_bytes` at a time."""
+    rest = b""
+    with open(path, "rb") as file:
+        while len(block := file.read(chunk_bytes)) > 0:
+            block = rest + block
+            # Keep the last, possibly incomplete, line for the next block.
+            end = block.rfind(b"\n") + 1
+            rest = block[end:]
+            if end > 0:
+                yield _parse_masses(block[:end])
+    if len(rest.strip()) > 0:
+        yield _parse_masses(rest)
+
 
 # ---- Part I ----
 
 
-def fuel_required(mass: float) -> float:
+def fuel_required(mass: int) -> int:
     """Calculate the fuel required for a mass."""
-    return math.floor(mass / 3.0) - 2.0
+    return mass // 3 - 2
+
 
+def fuel_required_array(masses: np.ndarray) -> np.ndarray:
+    """Vectorized `fuel_required()`."""
+    return np.asarray(masses, dtype=MASS_DTYPE) // 3 - 2
 
-# Read in puzzle input.
-module_masses: list[float] = []
-with open(Path("data", "01", "input.txt"), "r") as file:
-    for line in file:
-        module_masses.append(float(line.strip()))
 
-# Tests from examples provided.
-assert fuel_required(12) == 2
-assert fuel_required(14) == 2
-assert fuel_required(1969) == 654
-assert fuel_required(100756) == 33583
+def part_1() -> int:
+    return sum(int(fuel_required_array(m).sum()) for m in read_mass_chunks())
 
-fuel_requirements = [fuel_required(m) for m in module_masses]
-print(f"(part 1) Total fuel required: {sum(fuel_requirements)}")
 
 # ---- Part II ----
 
 
-def total_fuel_for_module(mass: float) -> float:
+def total_fuel_for_module(mass: int) -> int:
     """Calculate the total fuel required for a module including the fuel's mass."""
     fuel_mass = fuel_required(mass)
     new_mass = fuel_required(fuel_mass)
@@ -39,10 +75,170 @@ def total_fuel_for_module(mass: float) -> float:
     return fuel_mass
 
 
-# Tests from examples provided.
-assert total_fuel_for_module(14) == 2
-assert total_fuel_for_module(1969) == 966
-assert total_fuel_for_module(100756) == 50346
+def total_fuel_array(masses: np.ndarray) -> np.ndarray:
+    """Vectorized `total_fuel_for_module()`.
+
+    The fuel for the fuel is computed for all modules at once until it reaches
+    zero for every one of them.
+    """
+    total = fuel_required_array(masses)
+    fuel = total.copy()
+    while True:
+        np.floor_divide(fuel, 3, out=fuel)
+        fuel -= 2
+        np.maximum(fuel, 0, out=fuel)
+        if not fuel.any():
+            break
+        total += fuel
+    return total
+
+
+@dataclass
+class FuelLookupStats:
+    table_hits: int = 0
+    cache_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    # Fuel steps computed above the table on misses.
+    chain_steps: int = 0
+
+    @property
+    def n_lookups(self) -> int:
+        return self.table_hits + self.cache_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        if self.n_lookups == 0:
+            return 0.0
+        return (self.table_hits + self.cache_hits) / self.n_lookups
+
+    def __str__(self) -> str:
+        return (
+            f"{self.n_lookups} lookups  table hits: {self.table_hits}  "
+            f"cache hits: {self.cache_hits}  misses: {self.misses} "
+            f"({self.chain_steps} steps)  hit rate: {self.hit_rate:.1%}"
+        )
+
+
+class FuelLookup:
+    """Memoized `total_fuel_for_module()`.
+
+    The total fuel of every mass below `table_size` is precomputed, using
+    total(m) = f + max(total(f), 0) with f = fuel_required(m) < m / 3. Larger
+    masses follow their chain of fuel until it drops into the table, and their
+    results are kept in a least-recently-used cache of at most `cache_size`
+    masses.
+    """
+
+    table: np.ndarray
+    cache_size: int
+    stats: FuelLookupStats
+    _cache: OrderedDict[int, int]
+
+    def __init__(self, table_size: int = 1 << 17, cache_size: int = 1 << 16) -> None:
+        # Every mass up to 8 needs no fuel for its fuel.
+        table_size = max(table_size, 9)
+        self.table = np.empty(table_size, dtype=MASS_DTYPE)
+        self.table[:9] = fuel_required_array(np.arange(9))
+        lo = 9
+        while lo < table_size:
+            # The fuel of every mass in [lo, 3 * lo) is below lo.
+            hi = min(3 * lo, table_size)
+            fuel = fuel_required_array(np.arange(lo, hi))
+            self.table[lo:hi] = fuel + np.maximum(self.table[fuel], 0)
+            lo = hi
+        self.cache_size = cache_size
+        self.stats = FuelLookupStats()
+        self._cache = OrderedDict()
+
+    @property
+    def table_size(self) -> int:
+        return len(self.table)
+
+    def __call__(self, mass: int) -> int:
+        if 0 <= mass < self.table_size:
+            self.stats.table_hits += 1
+            return int(self.table[mass])
+        if (total := self._cache.get(mass)) is not None:
+            self.stats.cache_hits += 1
+            self._cache.move_to_end(mass)
+            return total
+        self.stats.misses += 1
+        total = self._follow_chain(mass)
+        if self.cache_size > 0:
+            self._cache[mass] = total
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.stats.evictions += 1
+        return total
+
+    def _follow_chain(self, mass: int) -> int:
+        if mass < 0:
+            return fuel_required(mass)
+        total = 0
+        while True:
+            fuel = fuel_required(mass)
+            self.stats.chain_steps += 1
+            if fuel < self.table_size:
+                # `fuel` is positive because `mass` is at least the table size.
+                return total + fuel + max(int(self.table[fuel]), 0)
+            total += fuel
+            mass = fuel
+
+    def total_fuel_array(self, masses: np.ndarray) -> np.ndarray:
+        """Vectorized lookup, stepping only the masses above the table.
+
+        The cache is not used; table hits and chain steps are counted.
+        """
+        masses = np.asarray(masses, dtype=MASS_DTYPE)
+        in_table = (masses >= 0) & (masses < self.table_size)
+        total = np.zeros(masses.shape, dtype=MASS_DTYPE)
+        total[in_table] = self.table[masses[in_table]]
+        self.stats.table_hits += int(in_table.sum())
+        if in_table.all():
+            return total
+        negative = masses < 0
+        total[negative] = fuel_required_array(masses[negative])
+        self.stats.misses += int((~in_table).sum())
+        lanes = np.flatnonzero(~in_table & ~negative)
+        mass = masses[lanes]
+        while len(lanes) > 0:
+            fuel = fuel_required_array(mass)
+            self.stats.chain_steps += len(lanes)
+            done = fuel < self.table_size
+            total[lanes[done]] += fuel[done] + np.maximum(self.table[fuel[done]], 0)
+            total[lanes[~done]] += fuel[~done]
+            lanes, mass = lanes[~done], fuel[~done]
+        return total
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        return None
+
+
+def part_2(lookup: Optional[FuelLookup] = None) -> int:
+    if lookup is None:
+        lookup = FuelLookup()
+    return sum(int(lookup.total_fuel_array(m).sum()) for m in read_mass_chunks())
+
+
+def main() -> None:
+    # Tests from examples provided.
+    assert fuel_required(12) == 2
+    assert fuel_required(14) == 2
+    assert fuel_required(1969) == 654
+    assert fuel_required(100756) == 33583
+    print(f"(part 1) Total fuel required: {part_1()}")
+
+    # Tests from examples provided.
+    assert total_fuel_for_module(14) == 2
+    assert total_fuel_for_module(1969) == 966
+    assert total_fuel_for_module(100756) == 50346
+    lookup = FuelLookup()
+    print(f"(part 2) Total fuel required: {part_2(lookup)}")
+    print(f"  fuel lookup: {lookup.stats}")
+    return None
+
 
-fuel_requirements = [total_fuel_for_module(m) for m in module_masses]
-print(f"(part 2) Total fuel required: {sum(fuel_requirements)}")
+if __name__ == "__main__":
+    main()
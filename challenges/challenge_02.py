@@ -3,6 +3,17 @@
 from pathlib import Path
 from typing import Final
 
+import numpy as np
+from intcode_batch import BatchIntcodeComputer, BatchLaneStatus
+from intcode_loader import load_program
+from intcode_symbolic import (
+    SymbolicExecutionException,
+    SymbolicIntcodeComputer,
+    solve_for_target,
+)
+
+INPUT_FILE: Final[Path] = Path(__file__).parent.parent / "data" / "02" / "input.txt"
+
 
 class UnknownOperationException(BaseException):
     pass
@@ -26,32 +37,17 @@ def run_intcode(code: list[int]) -> None:
     return
 
 
-# test input 1
-code_input = "1,9,10,3,2,3,11,0,99,30,40,50"
-test_code: list[int] = [int(x) for x in code_input.split(",")]
-test_result = [3500, 9, 10, 70, 2, 3, 11, 0, 99, 30, 40, 50]
-run_intcode(test_code)
-assert all([a == b for a, b in zip(test_code, test_result)])
-
-# test input 2
-test_code2 = [1, 1, 1, 4, 99, 5, 6, 0, 99]
-test_result2 = [30, 1, 1, 4, 2, 5, 6, 0, 99]
-run_intcode(test_code2)
-assert all([a == b for a, b in zip(test_code2, test_result2)])
+def read_initial_code(path: Path = INPUT_FILE) -> list[int]:
+    return list(load_program(path))
 
-# real input
-initial_code: list[int] = []
-with open(Path("data", "02", "input.txt"), "r") as file:
-    for line in file:
-        initial_code += [int(x) for x in line.split(",")]
 
-# manual adjustments per puzzle
-code = initial_code.copy()
-code[1] = 12
-code[2] = 2
-
-run_intcode(code)
-print(f"(part 1) value at position 0: {code[0]}")
+def part_1() -> int:
+    # manual adjustments per puzzle
+    code = read_initial_code()
+    code[1] = 12
+    code[2] = 2
+    run_intcode(code)
+    return code[0]
 
 
 # ---- Part 2 ----
@@ -76,7 +72,100 @@ def search_intcode(
     raise NoValidInputFound()
 
 
+def search_intcode_batched(
+    initial_code: list[int],
+    target: int,
+    min: int = 0,
+    max: int = 99,
+    batch_size: int = 2500,
+) -> tuple[int, int]:
+    """Same search as `search_intcode`, running the noun/verb pairs in batches.
+
+    Batches are kept small enough for their memory to stay in the CPU cache and so
+    the search can stop at the first batch with an answer.
+    """
+    values = np.arange(min, max + 1)
+    nouns, verbs = np.repeat(values, len(values)), np.tile(values, len(values))
+    for start in range(0, len(nouns), batch_size):
+        batch_nouns = nouns[start : (start + batch_size)]
+        batch_verbs = verbs[start : (start + batch_size)]
+        batch = BatchIntcodeComputer.from_program(initial_code, len(batch_nouns))
+        batch.memory[:, 1] = batch_nouns
+        batch.memory[:, 2] = batch_verbs
+        res = batch.run()
+        halted = res.statuses == BatchLaneStatus.HALTED.value
+        hits = np.flatnonzero(halted & (res.memory[:, 0] == target))
+        if len(hits) > 0:
+            return int(batch_nouns[hits[0]]), int(batch_verbs[hits[0]])
+    raise NoValidInputFound()
+
+
+def solve_intcode_symbolic(
+    initial_code: list[int],
+    target: int,
+    min: int = 0,
+    max: int = 99,
+    verbose: bool = False,
+) -> tuple[int, int]:
+    """Solve for the noun and verb from a symbolic run of the program.
+
+    Falls back to the batched search if the program can't be run or solved
+    symbolically (e.g. it branches on the noun or verb). With `verbose`, the
+    expression that was solved or the reason for the fallback is printed.
+    """
+    try:
+        res = SymbolicIntcodeComputer(initial_code, {1: "noun", 2: "verb"}).run()
+        expression = res.value_at(0)
+        if verbose:
+            print(f"value at position 0: {expression}")
+        domain = range(min, max + 1)
+        solution = solve_for_target(
+            expression, target, {"noun": domain, "verb": domain}
+        )
+    except SymbolicExecutionException as err:
+        if verbose:
+            print(f"Symbolic solver failed ({err}) -- falling back to batched search.")
+        return search_intcode_batched(initial_code, target=target, min=min, max=max)
+    if solution is None:
+        raise NoValidInputFound()
+    i, j = solution["noun"], solution["verb"]
+    code = initial_code.copy()
+    code[1], code[2] = i, j
+    run_intcode(code)
+    assert code[0] == target
+    return i, j
+
+
 TARGET_OUTPUT: Final[int] = 19690720
-noun, verb = search_intcode(initial_code.copy(), target=TARGET_OUTPUT)
-print(f"noun: {noun}  verb: {verb}")
-print(f"(part 2) 100 * noun + verb: {100 * noun + verb}")
+
+
+def part_2() -> int:
+    noun, verb = solve_intcode_symbolic(read_initial_code(), target=TARGET_OUTPUT)
+    return 100 * noun + verb
+
+
+def main() -> None:
+    # test input 1
+    code_input = "1,9,10,3,2,3,11,0,99,30,40,50"
+    test_code: list[int] = [int(x) for x in code_input.split(",")]
+    test_result = [3500, 9, 10, 70, 2, 3, 11, 0, 99, 30, 40, 50]
+    run_intcode(test_code)
+    assert all([a == b for a, b in zip(test_code, test_result)])
+
+    # test input 2
+    test_code2 = [1, 1, 1, 4, 99, 5, 6, 0, 99]
+    test_result2 = [30, 1, 1, 4, 2, 5, 6, 0, 99]
+    run_intcode(test_code2)
+    assert all([a == b for a, b in zip(test_code2, test_result2)])
+
+    print(f"(part 1) value at position 0: {part_1()}")
+    noun, verb = solve_intcode_symbolic(
+        read_initial_code(), target=TARGET_OUTPUT, verbose=True
+    )
+    print(f"Found answer -- noun: {noun}  verb: {verb}")
+    print(f"(part 2) 100 * noun + verb: {100 * noun + verb}")
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
+import statistics
 from dataclasses import dataclass
 from enum import Enum, unique
+from itertools import combinations
 from pathlib import Path
+from typing import Final, Iterator, Optional
+
+INPUT_FILE: Final[Path] = Path(__file__).parent.parent / "data" / "03" / "input.txt"
 
 
 class TooManyWiresFoundInInputException(BaseException):
@@ -32,24 +37,38 @@ class Direction(Enum):
 class Wires:
     """Collection of wire instructions."""
 
-    wire1: WireInstructions
-    wire2: WireInstructions
+    wires: list[WireInstructions]
+
+    def __len__(self) -> int:
+        return len(self.wires)
+
+    def __getitem__(self, i: int) -> WireInstructions:
+        return self.wires[i]
+
+    def __iter__(self) -> Iterator[WireInstructions]:
+        return iter(self.wires)
 
     def __str__(self) -> str:
-        s1 = ", ".join(self.wire1)
-        s2 = ", ".join(self.wire2)
-        return "Wires:" + "\n  (1) " + s1 + "\n  (2) " + s2
+        s = "Wires:"
+        for i, wire in enumerate(self.wires):
+            s += f"\n  ({i + 1}) " + ", ".join(wire)
+        return s
 
 
-def parse_input_to_two_wires(text_input: str) -> Wires:
+def parse_input_to_wires(text_input: str) -> Wires:
     wires: list[list[str]] = []
     for line in text_input.split("\n"):
         line = line.strip()
         if len(line) > 0:
             wires.append(line.split(","))
+    return Wires(wires)
+
+
+def parse_input_to_two_wires(text_input: str) -> Wires:
+    wires = parse_input_to_wires(text_input)
     if len(wires) != 2:
         raise TooManyWiresFoundInInputException(text_input)
-    return Wires(wire1=wires[0], wire2=wires[1])
+    return wires
 
 
 def get_trace_from_location(
@@ -83,106 +102,365 @@ def trace_wire(wire: WireInstructions) -> WireTrace:
     return wire_trace
 
 
-def get_wire_crosses(trace1: WireTrace, trace2: WireTrace) -> set[Coordinate]:
-    return set(trace1).intersection(trace2)
+class NoWireCrossingException(BaseException):
+    pass
 
 
-def calculate_distance_to_closest_cross(
-    trace1: WireTrace, trace2: WireTrace
-) -> tuple[int, Coordinate]:
-    crosses = list(get_wire_crosses(trace1, trace2))
-    distances = [abs(a) + abs(b) for a, b in crosses if a != 0 and b != 0]
-    idx = distances.index(min(distances))
-    return distances[idx], crosses[idx]
+# Unit step of each direction.
+_STEPS: Final[dict[Direction, Coordinate]] = {
+    Direction.L: (0, -1),
+    Direction.R: (0, 1),
+    Direction.D: (-1, 0),
+    Direction.U: (1, 0),
+}
 
 
-def find_closest_point_of_overlap_for_two_wires(wires: Wires) -> tuple[int, Coordinate]:
-    trace1 = trace_wire(wires.wire1)
-    trace2 = trace_wire(wires.wire2)
-    return calculate_distance_to_closest_cross(trace1, trace2)
+@dataclass(frozen=True)
+class Segment:
+    """Straight piece of a wire, `steps` along the wire from the origin to `start`."""
 
+    start: Coordinate
+    end: Coordinate
+    steps: int
 
-# ---- Part 1 ----
+    @property
+    def axis(self) -> int:
+        """Index of the coordinate that changes along the segment."""
+        return 1 if self.start[0] == self.end[0] else 0
 
-# Test input
-test_input1 = """
-R75,D30,R83,U83,L12,D49,R71,U7,L72
-U62,R66,U55,R34,D71,R55,D58,R83
-"""
-test_answer1 = 159
+    @property
+    def length(self) -> int:
+        return abs(self.end[0] - self.start[0]) + abs(self.end[1] - self.start[1])
 
-test_input2 = """
-R98,U47,R26,D63,R33,U87,L62,D20,R33,U53,R51
-U98,R91,D20,R16,D67,R40,U7,R15,U6,R7
-"""
-test_answer2 = 135
+    def span(self, axis: int) -> tuple[int, int]:
+        a, b = self.start[axis], self.end[axis]
+        return min(a, b), max(a, b)
 
-test_input3 = """
-R8,U5,L5,D3
-U7,R6,D4,L4
-"""
-test_answer3 = 6
-
-for i, (test_in, test_ans) in enumerate(
-    [
-        (test_input1, test_answer1),
-        (test_input2, test_answer2),
-        (test_input3, test_answer3),
+    def steps_to(self, point: Coordinate) -> int:
+        return (
+            self.steps + abs(point[0] - self.start[0]) + abs(point[1] - self.start[1])
+        )
+
+
+def wire_segments(wire: WireInstructions) -> list[Segment]:
+    segments: list[Segment] = []
+    current_pos: Coordinate = (0, 0)
+    steps = 0
+    for instruction in wire:
+        stride = int(instruction[1:])
+        if stride == 0:
+            continue
+        step = _STEPS[Direction(instruction[0])]
+        end = (current_pos[0] + step[0] * stride, current_pos[1] + step[1] * stride)
+        segments.append(Segment(current_pos, end, steps))
+        current_pos = end
+        steps += stride
+    return segments
+
+
+@dataclass(frozen=True)
+class Crossing:
+    coord: Coordinate
+    # Combined steps of both wires to their first visits of `coord`.
+    steps: int
+    wires: tuple[int, int] = (0, 1)
+
+    @property
+    def distance(self) -> int:
+        return abs(self.coord[0]) + abs(self.coord[1])
+
+
+WireCrossings = dict[Coordinate, int]
+WirePair = tuple[int, int]
+GridCell = tuple[int, int]
+
+
+def _record_crossing(
+    crossings: WireCrossings, point: Coordinate, seg1: Segment, seg2: Segment
+) -> None:
+    if point == (0, 0):
+        return None
+    steps = seg1.steps_to(point) + seg2.steps_to(point)
+    if steps < crossings.get(point, steps + 1):
+        crossings[point] = steps
+    return None
+
+
+def _overlap_crossings(seg1: Segment, seg2: Segment, crossings: WireCrossings) -> None:
+    """Crossings of two segments that run along the same line."""
+    # Overlapping segments cross at every point of the overlap, but only its ends
+    # and the points nearest the origin can be the closest or the shortest
+    # crossing (steps change linearly along it and the origin is skipped).
+    axis = seg1.axis
+    lo = max(seg1.span(axis)[0], seg2.span(axis)[0])
+    hi = min(seg1.span(axis)[1], seg2.span(axis)[1])
+    if lo > hi:
+        return None
+    value = seg1.start[1 - axis]
+    for t in {lo, hi, *(min(max(x, lo), hi) for x in (-1, 0, 1))}:
+        point = (value, t) if axis == 1 else (t, value)
+        _record_crossing(crossings, point, seg1, seg2)
+    return None
+
+
+# Segment of a wire as (index, fixed coordinate, low end, high end).
+_IndexedSegment = tuple[int, int, int, int]
+
+
+class WireBoard:
+    """Wires on one board with a grid-bucket index over their segments.
+
+    Each segment is filed under the square cells of side `cell_size` that it
+    passes through, so only segments that share a cell are checked for a crossing.
+    Segments along the same line are indexed by line. Crossings of a pair of wires
+    are computed on first request and kept.
+    """
+
+    segments: list[list[Segment]]
+    cell_size: int
+    # Cell -> wire -> segments along index 1 and along index 0 in that cell.
+    _buckets: dict[
+        GridCell, dict[int, tuple[list[_IndexedSegment], list[_IndexedSegment]]]
     ]
-):
-    test_wires = parse_input_to_two_wires(test_in)
-    ans, coord = find_closest_point_of_overlap_for_two_wires(test_wires)
-    print(f"test {i} -->  answer: {ans}  coord: {coord}")
-    assert ans == test_ans
+    # (axis, fixed coordinate) -> wire -> indices of the segments on that line.
+    _lines: dict[tuple[int, int], dict[int, list[int]]]
+    _crossings: dict[WirePair, WireCrossings]
+
+    def __init__(self, wires: Wires, cell_size: Optional[int] = None) -> None:
+        self.segments = [wire_segments(wire) for wire in wires]
+        if cell_size is None:
+            lengths = [s.length for segments in self.segments for s in segments]
+            cell_size = max(1, int(statistics.median(lengths))) if lengths else 1
+        self.cell_size = cell_size
+        self._buckets = {}
+        self._lines = {}
+        self._crossings = {}
+        for wire, segments in enumerate(self.segments):
+            for i, seg in enumerate(segments):
+                self._add(wire, i, seg)
+
+    def _add(self, wire: int, i: int, seg: Segment) -> None:
+        size = self.cell_size
+        fixed = seg.start[1 - seg.axis]
+        lo, hi = seg.span(seg.axis)
+        entry = (i, fixed, lo, hi)
+        for c in range(lo // size, hi // size + 1):
+            cell = (fixed // size, c) if seg.axis == 1 else (c, fixed // size)
+            by_wire = self._buckets.setdefault(cell, {})
+            if (lists := by_wire.get(wire)) is None:
+                lists = by_wire[wire] = ([], [])
+            lists[1 - seg.axis].append(entry)
+        line = self._lines.setdefault((seg.axis, fixed), {})
+        line.setdefault(wire, []).append(i)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def _cell_crossings(
+        self, cell: GridCell, a: int, b: int, crossings: WireCrossings
+    ) -> None:
+        # Perpendicular crossings of wires `a` and `b` in `cell`. Both segments of a
+        # crossing are filed under the cell the crossing lies in, so each crossing
+        # is found in exactly one cell.
+        bucket = self._buckets[cell]
+        if a not in bucket or b not in bucket:
+            return None
+        for w1, w2 in ((a, b), (b, a)):
+            for i, row, lo_col, hi_col in bucket[w1][0]:
+                for j, col, lo_row, hi_row in bucket[w2][1]:
+                    if lo_col <= col <= hi_col and lo_row <= row <= hi_row:
+                        _record_crossing(
+                            crossings,
+                            (row, col),
+                            self.segments[w1][i],
+                            self.segments[w2][j],
+                        )
+        return None
+
+    def _line_crossings(
+        self, line: dict[int, list[int]], a: int, b: int, crossings: WireCrossings
+    ) -> None:
+        for i in line[a]:
+            for j in line[b]:
+                _overlap_crossings(self.segments[a][i], self.segments[b][j], crossings)
+        return None
+
+    @staticmethod
+    def _pair(a: int, b: int) -> WirePair:
+        return (a, b) if a < b else (b, a)
+
+    def crossings(self, a: int, b: int) -> WireCrossings:
+        """Crossings of wires `a` and `b` (except the origin) and their steps.
+
+        Where wires overlap along a line, only the points of the overlap that can
+        be the closest or shortest crossing are included.
+        """
+        if a == b:
+            raise ValueError("A wire does not cross itself here.")
+        pair = self._pair(a, b)
+        if (cached := self._crossings.get(pair)) is not None:
+            return cached
+        crossings: WireCrossings = {}
+        # Only visit the cells and lines of the wire with fewer segments.
+        fewer = a if len(self.segments[a]) <= len(self.segments[b]) else b
+        cells: set[GridCell] = set()
+        lines: set[tuple[int, int]] = set()
+        for seg in self.segments[fewer]:
+            axis, fixed = seg.axis, seg.start[1 - seg.axis]
+            lo, hi = seg.span(axis)
+            for c in range(lo // self.cell_size, hi // self.cell_size + 1):
+                f = fixed // self.cell_size
+                cells.add((f, c) if axis == 1 else (c, f))
+            lines.add((axis, fixed))
+        for cell in cells:
+            self._cell_crossings(cell, a, b, crossings)
+        for key in lines:
+            line = self._lines[key]
+            if a in line and b in line:
+                self._line_crossings(line, a, b, crossings)
+        self._crossings[pair] = crossings
+        return crossings
+
+    def all_crossings(self) -> dict[WirePair, WireCrossings]:
+        """Crossings of every pair of wires, from one pass over the cells and lines."""
+        crossings: dict[WirePair, WireCrossings] = {
+            pair: {} for pair in combinations(range(len(self)), 2)
+        }
+        for cell, bucket in self._buckets.items():
+            for a, b in combinations(sorted(bucket), 2):
+                self._cell_crossings(cell, a, b, crossings[(a, b)])
+        for line in self._lines.values():
+            for a, b in combinations(sorted(line), 2):
+                self._line_crossings(line, a, b, crossings[(a, b)])
+        self._crossings.update(crossings)
+        return crossings
+
+    def _candidates(self, pair: Optional[WirePair]) -> list[Crossing]:
+        if pair is None:
+            found = self.all_crossings()
+        else:
+            found = {self._pair(*pair): self.crossings(*pair)}
+        candidates = [
+            Crossing(coord, steps, p)
+            for p, crossings in found.items()
+            for coord, steps in crossings.items()
+        ]
+        if len(candidates) == 0:
+            raise NoWireCrossingException(pair)
+        return candidates
+
+    def closest(self, pair: Optional[WirePair] = None) -> Crossing:
+        """Crossing closest to the origin of a pair of wires or of any two wires."""
+        return min(self._candidates(pair), key=lambda c: (c.distance, c.wires))
+
+    def shortest(self, pair: Optional[WirePair] = None) -> Crossing:
+        """Crossing with the fewest combined steps of a pair or of any two wires."""
+        return min(self._candidates(pair), key=lambda c: (c.steps, c.wires))
+
+
+def find_wire_crossings(wires: Wires, pair: WirePair = (0, 1)) -> WireCrossings:
+    return WireBoard(wires).crossings(*pair)
+
+
+def find_closest_and_shortest_crossings(
+    wires: Wires, pair: Optional[WirePair] = (0, 1)
+) -> tuple[Crossing, Crossing]:
+    """The crossing closest to the origin and the one reached in the fewest steps.
+
+    With `pair` set to None, crossings of any two of the wires are considered.
+    """
+    board = WireBoard(wires)
+    return board.closest(pair), board.shortest(pair)
 
-# Real input
-with open(Path("data", "03", "input.txt"), "r") as file:
-    wires_input = ""
-    for line in file:
-        wires_input += line
 
+def find_closest_point_of_overlap_for_two_wires(wires: Wires) -> tuple[int, Coordinate]:
+    closest, _ = find_closest_and_shortest_crossings(wires)
+    return closest.distance, closest.coord
 
-wires = parse_input_to_two_wires(wires_input)
-ans, coord = find_closest_point_of_overlap_for_two_wires(wires)
-print(f"(part 1) closest crossing of the wires was at {coord} at a distance of {ans}")
-print("")
 
-# ---- Part 2 ----
+def read_wires(path: Path = INPUT_FILE) -> Wires:
+    with open(path, "r") as file:
+        return parse_input_to_two_wires(file.read())
 
 
-def calculate_distance_to_shortest_cross(
-    trace1: WireTrace, trace2: WireTrace
-) -> tuple[int, Coordinate]:
-    crosses = list(get_wire_crosses(trace1, trace2))
-    distances: list[int] = []
-    for cross in crosses:
-        if cross == (0, 0):
-            continue
-        d1 = trace1.index(cross)
-        d2 = trace2.index(cross)
-        distances.append(d1 + d2)
-    idx = distances.index(min(distances))
-    return distances[idx], crosses[idx]
+# ---- Part 1 ----
+
+
+def part_1() -> int:
+    ans, _ = find_closest_point_of_overlap_for_two_wires(read_wires())
+    return ans
+
+
+# ---- Part 2 ----
 
 
 def find_shortest_path_for_two_wires(wires: Wires) -> tuple[int, Coordinate]:
-    trace1 = trace_wire(wires.wire1)
-    trace2 = trace_wire(wires.wire2)
-    return calculate_distance_to_shortest_cross(trace1, trace2)
+    _, shortest = find_closest_and_shortest_crossings(wires)
+    return shortest.steps, shortest.coord
 
 
-test_answer1, test_answer2, test_answer3 = 610, 410, 30
-for i, (test_in, test_ans) in enumerate(
-    [
-        (test_input1, test_answer1),
-        (test_input2, test_answer2),
-        (test_input3, test_answer3),
-    ]
-):
-    test_wires = parse_input_to_two_wires(test_in)
-    ans, coord = find_shortest_path_for_two_wires(test_wires)
-    print(f"test {i} -->  answer: {ans}  coord: {coord}")
-    assert ans == test_ans
-
-ans, coord = find_shortest_path_for_two_wires(wires)
-print(f"(part 2) shortest crossing of the wires was at {coord} at a distance of {ans}")
+def part_2() -> int:
+    ans, _ = find_shortest_path_for_two_wires(read_wires())
+    return ans
+
+
+# Example wires and their part 1 and part 2 answers.
+TEST_INPUTS: Final[list[tuple[str, int, int]]] = [
+    (
+        """
+R75,D30,R83,U83,L12,D49,R71,U7,L72
+U62,R66,U55,R34,D71,R55,D58,R83
+""",
+        159,
+        610,
+    ),
+    (
+        """
+R98,U47,R26,D63,R33,U87,L62,D20,R33,U53,R51
+U98,R91,D20,R16,D67,R40,U7,R15,U6,R7
+""",
+        135,
+        410,
+    ),
+    (
+        """
+R8,U5,L5,D3
+U7,R6,D4,L4
+""",
+        6,
+        30,
+    ),
+]
+
+
+def main() -> None:
+    for i, (test_in, test_ans, _) in enumerate(TEST_INPUTS):
+        test_wires = parse_input_to_two_wires(test_in)
+        ans, coord = find_closest_point_of_overlap_for_two_wires(test_wires)
+        print(f"test {i} -->  answer: {ans}  coord: {coord}")
+        assert ans == test_ans
+
+    # Both answers come from one pass over the real input.
+    closest, shortest = find_closest_and_shortest_crossings(read_wires())
+    print(
+        f"(part 1) closest crossing of the wires was at {closest.coord} "
+        f"at a distance of {closest.distance}"
+    )
+    print("")
+
+    for i, (test_in, _, test_ans) in enumerate(TEST_INPUTS):
+        test_wires = parse_input_to_two_wires(test_in)
+        ans, coord = find_shortest_path_for_two_wires(test_wires)
+        print(f"test {i} -->  answer: {ans}  coord: {coord}")
+        assert ans == test_ans
+
+    print(
+        f"(part 2) shortest crossing of the wires was at {shortest.coord} "
+        f"at a distance of {shortest.steps}"
+    )
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
 
 import re
+from functools import lru_cache
+from itertools import combinations_with_replacement
+from typing import Callable, Final, Iterator
+
+from password_rules import (
+    NonDecreasing,
+    PasswordValidator,
+    Rule,
+    count_matching,
+    run_of_at_least,
+    run_of_exactly,
+)
 
 # Puzzle input.
-puzzle_input = "156218-652527"
-low, high = [int(x) for x in puzzle_input.split("-")]
-print(f"range: {low} - {high}")
+PUZZLE_INPUT: Final[str] = "156218-652527"
+
+
+def parse_range(puzzle_input: str = PUZZLE_INPUT) -> tuple[int, int]:
+    low, high = [int(x) for x in puzzle_input.split("-")]
+    return low, high
 
 
 class BrokenInvariantException(BaseException):
@@ -37,25 +52,150 @@ def all_digits_increase(pswd: str) -> bool:
     return True
 
 
-# Set variable to determine which part of the puzzle to solve.
-PART = 2
-if PART == 1:
-    two_adjacent_values = two_adjacent_values_p1
-elif PART == 2:
-    two_adjacent_values = two_adjacent_values_p2
-else:
-    raise BaseException(f"Unknown puzzle part: {PART}")
-
-# Find set of all passwords.
-possible_passwords: set[int] = set()
-
-for x in range(low, high):
-    password = str(x)
-    if not all_digits_increase(password):
-        continue
-    elif not two_adjacent_values(password):
-        continue
-    possible_passwords.add(x)
-
-
-print(f"(part {PART}) number of possible passwords: {len(possible_passwords)}")
+def count_passwords(
+    low: int, high: int, two_adjacent_values: Callable[[str], bool]
+) -> int:
+    """Count the possible passwords in [low, high)."""
+    possible_passwords: set[int] = set()
+    for x in range(low, high):
+        password = str(x)
+        if not all_digits_increase(password):
+            continue
+        elif not two_adjacent_values(password):
+            continue
+        possible_passwords.add(x)
+    return len(possible_passwords)
+
+
+# ---- Counting without a scan ----
+
+Digits = tuple[int, ...]
+# Rule on the length of a run of equal digits; a password needs one such run.
+RunRule = Callable[[int], bool]
+
+
+def at_least_two(run: int) -> bool:
+    return run >= 2
+
+
+def exactly_two(run: int) -> bool:
+    return run == 2
+
+
+def to_digits(x: int) -> Digits:
+    return tuple(int(c) for c in str(x))
+
+
+def run_lengths(digits: Digits) -> list[int]:
+    runs: list[int] = []
+    for i, d in enumerate(digits):
+        if i > 0 and d == digits[i - 1]:
+            runs[-1] += 1
+        else:
+            runs.append(1)
+    return runs
+
+
+def is_password(digits: Digits, run_rule: RunRule) -> bool:
+    if any(a > b for a, b in zip(digits[:-1], digits[1:])):
+        return False
+    return any(run_rule(run) for run in run_lengths(digits))
+
+
+def non_decreasing_passwords(low: int, high: int, run_rule: RunRule) -> Iterator[int]:
+    """Passwords in [low, high), from the non-decreasing digit sequences only."""
+    if low <= 0 < high and is_password((0,), run_rule):
+        yield 0
+    for n_digits in range(len(str(low)), len(str(max(high - 1, low))) + 1):
+        # Sequences come in increasing order, and a leading 0 is not allowed.
+        for digits in combinations_with_replacement(range(1, 10), n_digits):
+            x = int("".join(str(d) for d in digits))
+            if x >= high:
+                break
+            if x >= low and any(run_rule(r) for r in run_lengths(digits)):
+                yield x
+
+
+def _count_below(bound: Digits, run_rule: RunRule) -> int:
+    """Number of passwords with as many digits as `bound` that are below it."""
+
+    @lru_cache(maxsize=None)
+    def completions(remaining: int, last: int, run: int, found: bool) -> int:
+        # Ways to append `remaining` digits after a run of `run` digits `last`.
+        if remaining == 0:
+            return int(found or run_rule(run))
+        n = completions(remaining - 1, last, run + 1, found)
+        found = found or run_rule(run)
+        for d in range(last + 1, 10):
+            n += completions(remaining - 1, d, 1, found)
+        return n
+
+    # Follow the digits of `bound`, counting the passwords that first go below it
+    # at each position. A run of length 0 of the digit 1 stands for the empty
+    # prefix (the first digit cannot be 0).
+    total = 0
+    last, run, found = 1, 0, False
+    for i, b in enumerate(bound):
+        remaining = len(bound) - i - 1
+        for d in range(last, b):
+            if d == last:
+                total += completions(remaining, last, run + 1, found)
+            else:
+                total += completions(
+                    remaining, d, 1, found or (run > 0 and run_rule(run))
+                )
+        if b < last:
+            break
+        if b == last:
+            run += 1
+        else:
+            found = found or (run > 0 and run_rule(run))
+            last, run = b, 1
+    return total
+
+
+def count_passwords_fast(low: int, high: int, run_rule: RunRule) -> int:
+    """Count the passwords in [low, high) with a digit DP over the bounds.
+
+    Only non-decreasing digit sequences are counted, by the state (last digit,
+    length of its run, rule already met), so the cost depends on the number of
+    digits and not on the size of the range.
+    """
+    total = int(low <= 0 < high and is_password((0,), run_rule))
+    for n_digits in range(len(str(low)), len(str(max(high - 1, low))) + 1):
+        lo = max(low, 10 ** (n_digits - 1))
+        hi = min(high, 10**n_digits)
+        if lo >= hi:
+            continue
+        total += _count_below(to_digits(hi - 1), run_rule) + is_password(
+            to_digits(hi - 1), run_rule
+        )
+        total -= _count_below(to_digits(lo), run_rule)
+    return total
+
+
+# The puzzle rules for the rule engine.
+PART_1_RULES: Final[list[Rule]] = [NonDecreasing(), run_of_at_least(2)]
+PART_2_RULES: Final[list[Rule]] = [NonDecreasing(), run_of_exactly(2)]
+
+
+def part_1() -> int:
+    return count_passwords_fast(*parse_range(), at_least_two)
+
+
+def part_2() -> int:
+    return count_passwords_fast(*parse_range(), exactly_two)
+
+
+def main() -> None:
+    low, high = parse_range()
+    print(f"range: {low} - {high}")
+    validators = [PasswordValidator(PART_1_RULES), PasswordValidator(PART_2_RULES)]
+    assert count_matching(validators, low, high) == [part_1(), part_2()]
+    print(f"(part 1) number of possible passwords: {part_1()}")
+    print(f"(part 2) number of possible passwords: {part_2()}")
+    return None
+
+
+if __name__ == "__main__":
+    main()
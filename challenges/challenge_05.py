@@ -1,54 +1,83 @@
 #!/usr/bin/env python3
 
 from pathlib import Path
-from typing import Optional
+from typing import Final, Optional
 
 from intcode import (
     FailedThermalEnvironmentSupervisionTerminalDiagnostic,
     Intcode,
     IntcodeComputer,
     IntcodeInput,
+    IntcodeStatus,
 )
+from intcode_loader import load_program
+from intcode_trace import IntcodeTrace
 
+INPUT_FILE: Final[Path] = Path(__file__).parent.parent / "data" / "05" / "input.txt"
 
-def run_intcode_diagnostics(code: Intcode, inputs: IntcodeInput) -> Optional[int]:
-    inst_ptr = 0
-    output: Optional[int] = None
-    nonzero_output: bool = False
-    while True:
-        comp = IntcodeComputer(code=code, verbose=True)
-        comp.set_instruction_pointer(inst_ptr)
-        res = comp(inputs=inputs)
+# Instructions kept by an opt-in trace; only the tail is ever printed.
+TRACE_CAPACITY: Final[int] = 10_000
 
-        if res.instruction.opcode_value == 99:
-            print("finished running intcode with diagnostics")
-            break
 
-        if nonzero_output:
+def print_trace_tail(trace: IntcodeTrace, n: int = 20) -> None:
+    print(f"last {min(n, len(trace))} of {trace.n_recorded} instructions:")
+    for record in trace.last(n):
+        print(f"  {record}")
+    return None
+
+
+def run_intcode_diagnostics(
+    code: Intcode, inputs: IntcodeInput, trace: bool = False
+) -> Optional[int]:
+    """Run the diagnostic program.
+
+    With `trace`, the last instructions executed are printed if a diagnostic fails.
+    """
+    computer = IntcodeComputer(code=code)
+    instr_trace: Optional[IntcodeTrace] = None
+    if trace:
+        instr_trace = computer.enable_tracing(capacity=TRACE_CAPACITY)
+    res = computer.run(inputs=inputs)
+    if res.status is not IntcodeStatus.HALTED and instr_trace is not None:
+        print_trace_tail(instr_trace)
+    assert res.status is IntcodeStatus.HALTED
+    print("finished running intcode with diagnostics")
+
+    # Every output except the diagnostic code at the end is a test that must be 0.
+    for i, output in enumerate(res.outputs[:-1]):
+        if output != 0:
+            if instr_trace is not None:
+                print_trace_tail(instr_trace)
             raise FailedThermalEnvironmentSupervisionTerminalDiagnostic(output)
+        print(f" successful diagnostic (test {i})")
 
-        if res.output is not None:
-            output = res.output
-            if output == 0:
-                print(f" successful diagnostic (instruction {inst_ptr})")
-            else:
-                nonzero_output = True
+    if len(res.outputs) == 0:
+        return None
+    return res.outputs[-1]
 
-        assert res.opcode is not None
-        inst_ptr = res.instruction_pointer + res.opcode.n_params + 1
-    return output
 
+def read_puzzle_input(path: Path = INPUT_FILE) -> Intcode:
+    return load_program(path)
 
-if __name__ == "__main__":
-    puzzle_input: Intcode = Intcode([])
-    with open(Path("data", "05", "input.txt"), "r") as file:
-        for line in file:
-            puzzle_input += [int(x) for x in line.strip().split(",")]
 
-    opcode_out = run_intcode_diagnostics(puzzle_input.copy(), inputs=IntcodeInput([1]))
+def part_1() -> Optional[int]:
+    return run_intcode_diagnostics(read_puzzle_input(), inputs=IntcodeInput([1]))
+
+
+def part_2() -> Optional[int]:
+    return run_intcode_diagnostics(read_puzzle_input(), inputs=IntcodeInput([5]))
+
+
+def main() -> None:
+    opcode_out = part_1()
     print(f"(part 1) output: {opcode_out}")
     assert opcode_out == 6069343
 
-    opcode_out = run_intcode_diagnostics(puzzle_input.copy(), inputs=IntcodeInput([5]))
+    opcode_out = part_2()
     print(f"(part 2) output: {opcode_out}")
     assert opcode_out == 3188550
+    return None
+
+
+if __name__ == "__main__":
+    main()
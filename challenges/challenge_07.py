@@ -1,41 +1,76 @@
 #!/usr/bin/env python3
 
+import asyncio
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
 from itertools import permutations
+from math import ceil, factorial, perm
 from pathlib import Path
-from typing import Callable, Sequence
+from typing import Final, Iterable, Optional, Protocol, Sequence, Union
 
-from intcode import Intcode, IntcodeComputer, IntcodeInput
+from intcode import Intcode, IntcodeComputer, IntcodeStatus
+from intcode_async import connect_ring
+from intcode_loader import CachedProgram, cache_program, load_program
+from intcode_network import IntcodeNetwork, IntcodeNetworkStatus
+
+INPUT_FILE: Final[Path] = Path(__file__).parent.parent / "data" / "07" / "input.txt"
 
 AmplifierPhaseSequence = Sequence[int]
+PrimedAmplifiers = dict[int, IntcodeComputer]
+
+
+class AmplifierMethod(Protocol):
+    def __call__(
+        self,
+        intcode: Intcode,
+        phase_sequence: AmplifierPhaseSequence,
+        primed: Optional[PrimedAmplifiers] = None,
+    ) -> int:
+        ...
+
 
-intcode_program: Intcode = Intcode([])
-with open(Path("data", "07", "input.txt"), "r") as file:
-    for line in file:
-        intcode_program += [int(x) for x in line.strip().split(",")]
+def prime_amplifiers(intcode: Intcode, phases: Iterable[int]) -> PrimedAmplifiers:
+    """Run an amplifier for each phase up to where it waits for its input signal.
+
+    The amplifier methods fork these computers instead of re-running the program
+    from the start for every phase sequence.
+    """
+    boot = IntcodeComputer(code=intcode.copy())
+    primed: PrimedAmplifiers = {}
+    for phase in phases:
+        amp = boot.fork()
+        amp.inputs.put(phase)
+        res = amp.run()
+        assert res.status is IntcodeStatus.NEEDS_INPUT and len(res.outputs) == 0
+        primed[phase] = amp
+    return primed
 
 
 def run_amplifier_series(
-    intcode: Intcode, phase_sequence: AmplifierPhaseSequence
+    intcode: Intcode,
+    phase_sequence: AmplifierPhaseSequence,
+    primed: Optional[PrimedAmplifiers] = None,
 ) -> int:
+    if primed is None:
+        primed = prime_amplifiers(intcode, phase_sequence)
     value = 0
     for phase in phase_sequence:
-        inputs = IntcodeInput([phase, value])
-        # res = run_intcode(code=intcode.copy(), inputs=inputs, verbose=False)
-        res = IntcodeComputer(code=intcode.copy())(inputs=inputs)
-        assert res.output is not None
-        value = res.output
+        amp = primed[phase].fork()
+        amp.inputs.put(value)
+        value = next(amp.stream())
     return value
 
 
 def find_fastest_phase_sequence(
     intcode: Intcode,
-    amp_method: Callable[[Intcode, AmplifierPhaseSequence], int],
+    amp_method: AmplifierMethod,
     amp_phases: list[int],
 ) -> tuple[AmplifierPhaseSequence, int]:
     best_phase_seq: AmplifierPhaseSequence = []
     max_thrust = -1
+    primed = prime_amplifiers(intcode, amp_phases)
     for phase_sequence in permutations(amp_phases):
-        amp_thrust = amp_method(intcode.copy(), phase_sequence)
+        amp_thrust = amp_method(intcode, phase_sequence, primed)
         if amp_thrust > max_thrust:
             max_thrust = amp_thrust
             best_phase_seq = list(phase_sequence)
@@ -43,95 +78,291 @@ def find_fastest_phase_sequence(
     return best_phase_seq, max_thrust
 
 
-# Test input.
-test_intcode = Intcode([3, 15, 3, 16, 1002, 16, 10, 16, 1, 16, 15, 15, 4, 15, 99, 0, 0])
-test_input_seq = [4, 3, 2, 1, 0]
-test_output = 43210
-test_res = run_amplifier_series(test_intcode, test_input_seq)
-assert test_res == test_output
-res_phase_seq, res_max_thrust = find_fastest_phase_sequence(
-    test_intcode, amp_method=run_amplifier_series, amp_phases=list(range(5))
-)
-assert all([a == b for a, b in zip(test_input_seq, res_phase_seq)])
-assert res_max_thrust == test_output
-
-# Puzzle input
-best_phase_seq, max_thrust = find_fastest_phase_sequence(
-    intcode_program.copy(), amp_method=run_amplifier_series, amp_phases=list(range(5))
-)
-print("(part 1) Series method results:")
-print(f"  sequence {best_phase_seq}")
-print(f"  max thrust of {max_thrust}")
-assert max_thrust == 21860  # correct puzzle solution
-print("")
-
 # ---- Part 2 ----
 
 
 def run_amplifier_feedback_loop(
-    intcode: Intcode, phase_sequence: AmplifierPhaseSequence
+    intcode: Intcode,
+    phase_sequence: AmplifierPhaseSequence,
+    primed: Optional[PrimedAmplifiers] = None,
 ) -> int:
-    value = 0
-    amp_codes: dict[int, IntcodeComputer] = {
-        i: IntcodeComputer(code=intcode.copy()) for i in range(len(phase_sequence))
-    }
-    halt = False
+    if primed is None:
+        primed = prime_amplifiers(intcode, phase_sequence)
+    amps = [primed[phase].fork() for phase in phase_sequence]
+    amps[0].inputs.put(0)
+    n_amps = len(amps)
+    network = IntcodeNetwork(
+        amps, wiring={i: [(i + 1) % n_amps] for i in range(n_amps)}
+    )
+    res = network.run()
+    assert res.status is IntcodeNetworkStatus.HALTED
+    return res.last_outputs[n_amps - 1]
+
 
-    for amp_i, phase in enumerate(phase_sequence):
-        inputs = IntcodeInput([phase, value])
-        int_comp = amp_codes[amp_i]
-        res = int_comp(inputs=inputs)
+async def run_amplifier_feedback_loop_async(
+    intcode: Intcode,
+    phase_sequence: AmplifierPhaseSequence,
+    primed: Optional[PrimedAmplifiers] = None,
+) -> int:
+    if primed is None:
+        primed = prime_amplifiers(intcode, phase_sequence)
+    amps = connect_ring([primed[phase].fork() for phase in phase_sequence])
+    await amps[0].inputs.put(0)
+    await asyncio.gather(*[amp.run() for amp in amps])
+    # The last amplifier's final output is left waiting for the first one.
+    return amps[0].inputs.get_nowait()
 
-        if res.output is not None:
-            value = res.output
 
-        if res.opcode is not None:
-            int_comp.set_instruction_pointer(
-                res.instruction_pointer + res.opcode.n_params + 1
-            )
+# ---- Parallel search ----
 
-    while not halt:
-        for amp_i in range(len(phase_sequence)):
-            inputs = IntcodeInput([value])
-            int_comp = amp_codes[amp_i]
-            res = int_comp(inputs=inputs)
+# Searches over fewer permutations than this are not worth starting processes for.
+PARALLEL_MIN_PERMUTATIONS: Final[int] = 5040
+# Chunks per worker, so that a slow chunk does not hold up the whole search.
+_CHUNKS_PER_WORKER: Final[int] = 4
 
-            if res.output is not None:
-                value = res.output
+# Set once in each worker process by `_init_phase_search_worker()`.
+_worker_search: Optional[
+    tuple[Intcode, AmplifierMethod, list[int], PrimedAmplifiers]
+] = None
 
-            if res.opcode is not None:
-                int_comp.set_instruction_pointer(
-                    res.instruction_pointer + res.opcode.n_params + 1
-                )
 
-            if res.instruction.opcode_value == 99:
-                halt = True
+def _nth_permutation(n_items: int, n: int) -> list[int]:
+    """Indices of the `n`-th permutation in the order of `itertools.permutations`."""
+    pool = list(range(n_items))
+    indices: list[int] = []
+    for i in reversed(range(n_items)):
+        k, n = divmod(n, factorial(i))
+        indices.append(pool.pop(k))
+    return indices
 
-    return value
+
+def _next_permutation(indices: list[int]) -> None:
+    """Advance the indices to the next permutation in lexicographic order."""
+    i = len(indices) - 2
+    while i >= 0 and indices[i] > indices[i + 1]:
+        i -= 1
+    if i < 0:
+        return None
+    j = len(indices) - 1
+    while indices[j] < indices[i]:
+        j -= 1
+    indices[i], indices[j] = indices[j], indices[i]
+    indices[i + 1 :] = reversed(indices[i + 1 :])
+    return None
+
+
+def _permuted(amp_phases: list[int], n: int) -> list[int]:
+    return [amp_phases[i] for i in _nth_permutation(len(amp_phases), n)]
+
+
+def _init_phase_search_worker(
+    intcode: Union[Intcode, CachedProgram],
+    amp_method: AmplifierMethod,
+    amp_phases: list[int],
+) -> None:
+    global _worker_search
+    if isinstance(intcode, CachedProgram):
+        intcode = intcode.load()
+    primed = prime_amplifiers(intcode, amp_phases)
+    _worker_search = (intcode, amp_method, amp_phases, primed)
+    return None
+
+
+def _search_permutations(
+    intcode: Intcode,
+    amp_method: AmplifierMethod,
+    amp_phases: list[int],
+    primed: PrimedAmplifiers,
+    start: int,
+    stop: int,
+    stop_at: Optional[int],
+) -> tuple[int, int]:
+    """Best thrust and its permutation number for permutations `start` to `stop`.
+
+    The first permutation wins ties. If `stop_at` is reached, that permutation is
+    returned right away.
+    """
+    indices = _nth_permutation(len(amp_phases), start)
+    max_thrust, best_n = -1, -1
+    for n in range(start, stop):
+        phase_sequence = [amp_phases[i] for i in indices]
+        amp_thrust = amp_method(intcode, phase_sequence, primed)
+        if amp_thrust > max_thrust:
+            max_thrust, best_n = amp_thrust, n
+            if stop_at is not None and amp_thrust >= stop_at:
+                break
+        _next_permutation(indices)
+    return max_thrust, best_n
+
+
+def _search_phase_chunk(
+    start: int, stop: int, stop_at: Optional[int]
+) -> tuple[int, int]:
+    """`_search_permutations()` in a worker process."""
+    assert _worker_search is not None
+    intcode, amp_method, amp_phases, primed = _worker_search
+    return _search_permutations(
+        intcode, amp_method, amp_phases, primed, start, stop, stop_at
+    )
+
+
+def find_fastest_phase_sequence_parallel(
+    intcode: Union[Intcode, CachedProgram],
+    amp_method: AmplifierMethod,
+    amp_phases: list[int],
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    stop_at: Optional[int] = None,
+    min_permutations: int = PARALLEL_MIN_PERMUTATIONS,
+) -> tuple[AmplifierPhaseSequence, int]:
+    """Parallel version of `find_fastest_phase_sequence()`.
+
+    The permutations are split into chunks of `chunksize` (by default, about four
+    per worker) that are searched by a pool of processes, each of which gets the
+    program once when it starts. Searches over fewer than `min_permutations`
+    permutations run in this process instead. Ties go
+    to the first permutation in `itertools.permutations` order, so the result is
+    the same as the serial search. Given a `CachedProgram`, the workers map the
+    cached program instead of each receiving a pickled copy.
+
+    If `stop_at` is given, the search is cut short at the first permutation whose
+    thrust reaches it; chunks after it that have not started are cancelled.
+    """
+    n_perms = perm(len(amp_phases))
+    if n_perms < min_permutations:
+        if isinstance(intcode, CachedProgram):
+            intcode = intcode.load()
+        primed = prime_amplifiers(intcode, amp_phases)
+        max_thrust, best_n = _search_permutations(
+            intcode, amp_method, amp_phases, primed, 0, n_perms, stop_at
+        )
+        return _permuted(amp_phases, best_n), max_thrust
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(ceil(n_perms / (_CHUNKS_PER_WORKER * max_workers)), 1)
+    chunks = [(a, min(a + chunksize, n_perms)) for a in range(0, n_perms, chunksize)]
+    results: list[Optional[tuple[int, int]]] = [None] * len(chunks)
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_phase_search_worker,
+        initargs=(intcode, amp_method, amp_phases),
+    )
+    try:
+        futures: list[Future[tuple[int, int]]] = [
+            executor.submit(_search_phase_chunk, a, b, stop_at) for a, b in chunks
+        ]
+        for i, future in enumerate(futures):
+            if future.cancelled():
+                continue
+            result = results[i] = future.result()
+            if stop_at is not None and result[0] >= stop_at:
+                for later_future in futures[i + 1 :]:
+                    later_future.cancel()
+                break
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    max_thrust, best_n = max(
+        (r for r in results if r is not None), key=lambda r: (r[0], -r[1])
+    )
+    return _permuted(amp_phases, best_n), max_thrust
+
+
+def read_intcode_program(path: Path = INPUT_FILE) -> Intcode:
+    return load_program(path)
+
+
+def part_1() -> int:
+    _, max_thrust = find_fastest_phase_sequence_parallel(
+        cache_program(INPUT_FILE),
+        amp_method=run_amplifier_series,
+        amp_phases=list(range(5)),
+    )
+    return max_thrust
+
+
+def part_2() -> int:
+    _, max_thrust = find_fastest_phase_sequence_parallel(
+        cache_program(INPUT_FILE),
+        amp_method=run_amplifier_feedback_loop,
+        amp_phases=list(range(5, 10)),
+    )
+    return max_thrust
+
+
+def main() -> None:
+    program = cache_program(INPUT_FILE)
+
+    # ---- Part 1 ----
+
+    # Test input.
+    test_intcode = Intcode(
+        [3, 15, 3, 16, 1002, 16, 10, 16, 1, 16, 15, 15, 4, 15, 99, 0, 0]
+    )
+    test_input_seq = [4, 3, 2, 1, 0]
+    test_output = 43210
+    test_res = run_amplifier_series(test_intcode, test_input_seq)
+    assert test_res == test_output
+    res_phase_seq, res_max_thrust = find_fastest_phase_sequence(
+        test_intcode, amp_method=run_amplifier_series, amp_phases=list(range(5))
+    )
+    assert all([a == b for a, b in zip(test_input_seq, res_phase_seq)])
+    assert res_max_thrust == test_output
+
+    res_phase_seq, res_max_thrust = find_fastest_phase_sequence_parallel(
+        test_intcode, amp_method=run_amplifier_series, amp_phases=list(range(5))
+    )
+    assert list(res_phase_seq) == test_input_seq and res_max_thrust == test_output
+
+    # Puzzle input
+    best_phase_seq, max_thrust = find_fastest_phase_sequence_parallel(
+        program,
+        amp_method=run_amplifier_series,
+        amp_phases=list(range(5)),
+    )
+    print("(part 1) Series method results:")
+    print(f"  sequence {best_phase_seq}")
+    print(f"  max thrust of {max_thrust}")
+    assert max_thrust == 21860  # correct puzzle solution
+    print("")
+
+    # ---- Part 2 ----
+
+    # Test input.
+    test_intcode_str = """
+    3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5
+    """
+    test_intcode = Intcode([int(x) for x in test_intcode_str.strip().split(",")])
+    test_input_seq = [9, 8, 7, 6, 5]
+    test_output = 139629729
+    test_res = run_amplifier_feedback_loop(test_intcode, test_input_seq)
+    assert test_res == test_output
+    test_res = asyncio.run(
+        run_amplifier_feedback_loop_async(test_intcode, test_input_seq)
+    )
+    assert test_res == test_output
+    res_phase_seq, res_max_thrust = find_fastest_phase_sequence(
+        test_intcode,
+        amp_method=run_amplifier_feedback_loop,
+        amp_phases=list(range(5, 10)),
+    )
+    assert all([a == b for a, b in zip(test_input_seq, res_phase_seq)])
+    assert res_max_thrust == test_output
+
+    # Puzzle input
+    best_phase_seq, max_thrust = find_fastest_phase_sequence_parallel(
+        program,
+        amp_method=run_amplifier_feedback_loop,
+        amp_phases=list(range(5, 10)),
+    )
+    print("(part 2) Feedback Loop method results:")
+    print(f"  sequence {best_phase_seq}")
+    print(f"  max thrust of {max_thrust}")
+    assert max_thrust == 2645740  # correct puzzle solution
+    return None
 
 
-# Test input.
-test_intcode_str = """
-3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5
-"""
-test_intcode = Intcode([int(x) for x in test_intcode_str.strip().split(",")])
-test_input_seq = [9, 8, 7, 6, 5]
-test_output = 139629729
-test_res = run_amplifier_feedback_loop(test_intcode, test_input_seq)
-assert test_res == test_output
-res_phase_seq, res_max_thrust = find_fastest_phase_sequence(
-    test_intcode, amp_method=run_amplifier_feedback_loop, amp_phases=list(range(5, 10))
-)
-assert all([a == b for a, b in zip(test_input_seq, res_phase_seq)])
-assert res_max_thrust == test_output
-
-# Puzzle input
-best_phase_seq, max_thrust = find_fastest_phase_sequence(
-    intcode_program.copy(),
-    amp_method=run_amplifier_feedback_loop,
-    amp_phases=list(range(5, 10)),
-)
-print("(part 2) Feedback Loop method results:")
-print(f"  sequence {best_phase_seq}")
-print(f"  max thrust of {max_thrust}")
-assert max_thrust == 2645740  # correct puzzle solution
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
 
 from pathlib import Path
+from typing import Final
 
 import numpy as np
 
-encoded_image_data: list[int] = []
-with open(Path("data", "08", "input.txt"), "r") as file:
-    for line in file:
-        encoded_image_data += [int(x) for x in line.strip()]
+INPUT_FILE: Final[Path] = Path(__file__).parent.parent / "data" / "08" / "input.txt"
+
+IMAGE_HEIGHT: Final[int] = 6
+IMAGE_WIDTH: Final[int] = 25
+
+
+def read_encoded_image_data(path: Path = INPUT_FILE) -> list[int]:
+    encoded_image_data: list[int] = []
+    with open(path, "r") as file:
+        for line in file:
+            encoded_image_data += [int(x) for x in line.strip()]
+    return encoded_image_data
+
+
+def read_image() -> np.ndarray:
+    return convert_digital_sending_network_to_layered_image(
+        read_encoded_image_data(), height=IMAGE_HEIGHT, width=IMAGE_WIDTH
+    )
 
 
 # ---- Part 1 ----
@@ -20,24 +35,18 @@ def convert_digital_sending_network_to_layered_image(
     return img
 
 
-# Test image to confirm getting right shape of image.
-test_input = [int(x) for x in "123456789012"]
-test_img = convert_digital_sending_network_to_layered_image(test_input, 2, 3)
+def layer_checksum(img: np.ndarray) -> tuple[int, int, int]:
+    """Layer with the fewest 0s and its numbers of 1s and 2s."""
+    num_zeros = np.sum(img == 0, axis=(1, 2))
+    idx = np.where(num_zeros == np.min(num_zeros))[0][0]
+    num_ones = np.sum(img[idx] == 1)
+    num_twos = np.sum(img[idx] == 2)
+    return int(idx), int(num_ones), int(num_twos)
 
-IMAGE_HEIGHT = 6
-IMAGE_WIDTH = 25
 
-img = convert_digital_sending_network_to_layered_image(
-    encoded_image_data, height=IMAGE_HEIGHT, width=IMAGE_WIDTH
-)
-print(img.shape)
-num_zeros = np.sum(img == 0, axis=(1, 2))
-idx = np.where(num_zeros == np.min(num_zeros))[0][0]
-num_ones = np.sum(img[idx] == 1)
-num_twos = np.sum(img[idx] == 2)
-ans = num_ones * num_twos
-print(f"(part 1) layer {idx} -> {num_ones} x {num_twos} = {ans}")
-assert ans == 1206
+def part_1() -> int:
+    _, num_ones, num_twos = layer_checksum(read_image())
+    return num_ones * num_twos
 
 
 # ---- Part 2 ----
@@ -75,11 +84,34 @@ def develop_image(img: np.ndarray) -> str:
     return dev_img
 
 
-decoded_img = decode_image(img, height=IMAGE_HEIGHT, width=IMAGE_WIDTH)
-print(develop_image(decoded_img))  # "EJRGP"
-# ◻︎◻︎◻︎◻︎◼︎◼︎◼︎◻︎◻︎◼︎◻︎◻︎◻︎◼︎◼︎◼︎◻︎◻︎◼︎◼︎◻︎◻︎◻︎◼︎◼︎
-# ◻︎◼︎◼︎◼︎◼︎◼︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎
-# ◻︎◻︎◻︎◼︎◼︎◼︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎
-# ◻︎◼︎◼︎◼︎◼︎◼︎◼︎◼︎◻︎◼︎◻︎◻︎◻︎◼︎◼︎◻︎◼︎◻︎◻︎◼︎◻︎◻︎◻︎◼︎◼︎
-# ◻︎◼︎◼︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◼︎◼︎
-# ◻︎◻︎◻︎◻︎◼︎◼︎◻︎◻︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎◼︎◻︎◻︎◻︎◼︎◻︎◼︎◼︎◼︎◼︎
+def part_2() -> str:
+    decoded_img = decode_image(read_image(), height=IMAGE_HEIGHT, width=IMAGE_WIDTH)
+    return develop_image(decoded_img)
+
+
+def main() -> None:
+    # Test image to confirm getting right shape of image.
+    test_input = [int(x) for x in "123456789012"]
+    test_img = convert_digital_sending_network_to_layered_image(test_input, 2, 3)
+    assert test_img.shape == (2, 2, 3)
+
+    img = read_image()
+    print(img.shape)
+    idx, num_ones, num_twos = layer_checksum(img)
+    ans = num_ones * num_twos
+    print(f"(part 1) layer {idx} -> {num_ones} x {num_twos} = {ans}")
+    assert ans == 1206
+
+    decoded_img = decode_image(img, height=IMAGE_HEIGHT, width=IMAGE_WIDTH)
+    print(develop_image(decoded_img))  # "EJRGP"
+    # ◻︎◻︎◻︎◻︎◼︎◼︎◼︎◻︎◻︎◼︎◻︎◻︎◻︎◼︎◼︎◼︎◻︎◻︎◼︎◼︎◻︎◻︎◻︎◼︎◼︎
+    # ◻︎◼︎◼︎◼︎◼︎◼︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎
+    # ◻︎◻︎◻︎◼︎◼︎◼︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎
+    # ◻︎◼︎◼︎◼︎◼︎◼︎◼︎◼︎◻︎◼︎◻︎◻︎◻︎◼︎◼︎◻︎◼︎◻︎◻︎◼︎◻︎◻︎◻︎◼︎◼︎
+    # ◻︎◼︎◼︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◻︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎◻︎◼︎◼︎◼︎◼︎
+    # ◻︎◻︎◻︎◻︎◼︎◼︎◻︎◻︎◼︎◼︎◻︎◼︎◼︎◻︎◼︎◼︎◻︎◻︎◻︎◼︎◻︎◼︎◼︎◼︎◼︎
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,23 @@
 """Intcode computer."""
+
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+from array import array
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from operator import index
+from pathlib import Path
+from time import perf_counter
 from typing import (
     Any,
+    Callable,
+    Final,
+    Generator,
     Iterable,
+    Iterator,
     Optional,
     Protocol,
     SupportsIndex,
@@ -13,6 +26,8 @@ from typing import (
     runtime_checkable,
 )
 
+from intcode_trace import IntcodeTrace
+
 
 class UnknownOperationException(BaseException):
     pass
@@ -29,7 +44,101 @@ class FailedThermalEnvironmentSupervisionTerminalDiagnostic(BaseException):
 ParameterModes = tuple[int, int, int]
 
 
-class Intcode(list[int]):
+@dataclass(frozen=True)
+class OperandLayout:
+    """Number of parameters of an opcode and which one (if any) is written to."""
+
+    n_params: int
+    write_param: Optional[int] = None
+
+
+OPERAND_LAYOUTS: Final[dict[int, OperandLayout]] = {
+    1: OperandLayout(n_params=3, write_param=2),
+    2: OperandLayout(n_params=3, write_param=2),
+    3: OperandLayout(n_params=1, write_param=0),
+    4: OperandLayout(n_params=1),
+    5: OperandLayout(n_params=2),
+    6: OperandLayout(n_params=2),
+    7: OperandLayout(n_params=3, write_param=2),
+    8: OperandLayout(n_params=3, write_param=2),
+    9: OperandLayout(n_params=1),
+    99: OperandLayout(n_params=0),
+}
+
+
+# Memory beyond the program image is allocated in pages of `_PAGE_SIZE` cells.
+_PAGE_BITS: Final[int] = 10
+_PAGE_SIZE: Final[int] = 1 << _PAGE_BITS
+_PAGE_MASK: Final[int] = _PAGE_SIZE - 1
+
+# Cells holding values outside of the 64-bit range store this marker in their array
+# and the actual value in `Intcode._big`.
+_BIG_MARKER: Final[int] = -(2**63)
+_INT64_MAX: Final[int] = 2**63 - 1
+
+
+class Intcode:
+    """Intcode memory.
+
+    The program image is stored in a dense `array("q")` and addresses past it in
+    sparse pages that are only allocated when written to. Reading an address that
+    was never written returns 0 and only grows the logical length of the memory.
+
+    Copies share the image and pages with the original until either side writes to
+    them (copy-on-write), so copying only costs a copy of the page table. The image
+    can also be a read-only `memoryview` of a mapped file (see `intcode_loader`),
+    which is always treated as shared.
+    """
+
+    _image: Union[array[int], memoryview]
+    _pages: dict[int, array[int]]
+    _big: dict[int, int]
+    _length: int
+    _image_shared: bool
+    _shared_pages: set[int]
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        self._image = array("q")
+        self._pages = {}
+        self._big = {}
+        self._length = 0
+        self._image_shared = False
+        self._shared_pages = set()
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        for address in range(self._length):
+            yield self.read(address)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Intcode, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Intcode({list(self)})"
+
+    def _ensure_length_atleast(self, x: int) -> None:
+        if x >= self._length:
+            self._length = x + 1
+
+    def _address(self, i: int) -> int:
+        # Negative addresses count back from the end like list indices.
+        if i < 0:
+            i += self._length
+            if i < 0:
+                raise IndexError("Intcode address out of range")
+        return i
+
+    def _slice_addresses(self, s: slice) -> range:
+        bounds = [a for a in (s.start, s.stop) if a is not None]
+        if len(bounds) > 0:
+            self._ensure_length_atleast(max(bounds))
+        return range(*s.indices(self._length))
+
     @overload
     def __getitem__(self, i: SupportsIndex) -> int:
         ...
@@ -39,19 +148,9 @@ class Intcode(list[int]):
         ...
 
     def __getitem__(self, i: Union[SupportsIndex, slice]) -> Union[int, list[int]]:
-        self._extend_based_on_index(i)
-        return super().__getitem__(i)
-
-    def _ensure_length_atleast(self, x: int) -> None:
-        if x >= len(self):
-            self.extend([0] * (x + 1 - len(self)))
-
-    def _extend_based_on_index(self, i: Union[SupportsIndex, slice]) -> None:
-        if isinstance(i, SupportsIndex):
-            self._ensure_length_atleast(x=int(i))
-        elif isinstance(i, slice):
-            x = max([a for a in (i.start, i.stop, i.stop) if a is not None])
-            self._ensure_length_atleast(x=x)
+        if isinstance(i, slice):
+            return [self.read(a) for a in self._slice_addresses(i)]
+        return self.read(index(i))
 
     @overload
     def __setitem__(self, i: SupportsIndex, o: int) -> None:
@@ -63,32 +162,145 @@ class Intcode(list[int]):
 
     def __setitem__(self, *args: Any) -> None:
         assert len(args) == 2
-        idx = args[0]
-        if isinstance(idx, (SupportsIndex, slice)):
-            self._extend_based_on_index(idx)
+        idx, value = args
+        if not isinstance(idx, slice):
+            self.write(index(idx), value)
+            return None
+        addresses = self._slice_addresses(idx)
+        values = list(value)
+        if len(values) != len(addresses):
+            raise ValueError("Slice assignment cannot change the size of Intcode.")
+        for address, v in zip(addresses, values):
+            self.write(address, v)
+        return None
 
-        super().__setitem__(*args)
+    def read(self, address: int) -> int:
+        """Read a single address without the index type checks of `__getitem__`."""
+        if 0 <= address < len(self._image):
+            value = self._image[address]
+        elif address >= 0:
+            if address >= self._length:
+                self._ensure_length_atleast(address)
+            page = self._pages.get(address >> _PAGE_BITS)
+            value = 0 if page is None else page[address & _PAGE_MASK]
+        else:
+            return self.read(self._address(address))
+        if value == _BIG_MARKER:
+            return self._big[address]
+        return value
+
+    def write(self, address: int, value: int) -> None:
+        """Write a single address without the index type checks of `__setitem__`."""
+        if address < 0:
+            address = self._address(address)
+        if address < len(self._image):
+            if self._image_shared:
+                self._own_image()
+            cells, offset = self._image, address
+        else:
+            if address >= self._length:
+                self._ensure_length_atleast(address)
+            page_index = address >> _PAGE_BITS
+            page = self._pages.get(page_index)
+            if page is None:
+                page = array("q", bytes(8 * _PAGE_SIZE))
+                self._pages[page_index] = page
+            elif page_index in self._shared_pages:
+                page = array("q", page)
+                self._pages[page_index] = page
+                self._shared_pages.discard(page_index)
+            cells, offset = page, address & _PAGE_MASK
+        if _BIG_MARKER < value <= _INT64_MAX:
+            cells[offset] = value
+            if self._big:
+                self._big.pop(address, None)
+        else:
+            cells[offset] = _BIG_MARKER
+            self._big[address] = value
         return None
 
+    def extend(self, values: Iterable[int]) -> None:
+        values = list(values)
+        start = self._length
+        self._ensure_length_atleast(start + len(values) - 1)
+        if len(self._image) == start and not self._pages:
+            # Values appended right after the image become part of it.
+            if self._image_shared:
+                self._own_image()
+            assert isinstance(self._image, array)
+            try:
+                if _BIG_MARKER not in values:
+                    self._image.extend(array("q", values))
+                    return None
+            except OverflowError:
+                pass
+            self._image.frombytes(bytes(8 * len(values)))
+        for address, value in enumerate(values, start=start):
+            self.write(address, value)
+        return None
+
+    def __iadd__(self, values: Iterable[int]) -> Intcode:
+        self.extend(values)
+        return self
+
+    def _own_image(self) -> None:
+        self._image = array("q", self._image)
+        self._image_shared = False
+        return None
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        if isinstance(self._image, memoryview):
+            # A mapped image cannot be pickled, so send its values instead.
+            state["_image"] = array("q", self._image)
+            state["_image_shared"] = False
+        return state
+
     def __copy__(self) -> Intcode:
-        return Intcode(super().copy())
+        new = Intcode()
+        new._image = self._image
+        new._pages = self._pages.copy()
+        new._big = self._big.copy()
+        new._length = self._length
+        self._image_shared = new._image_shared = True
+        self._shared_pages = set(self._pages)
+        new._shared_pages = set(self._pages)
+        return new
 
     def copy(self) -> Intcode:
         return self.__copy__()
 
 
 class IntcodeInput:
+    """Queue of inputs for an Intcode program."""
+
+    _queue: deque[int]
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        self._queue = deque(values)
 
-    _values: list[int]
+    @property
+    def _values(self) -> list[int]:
+        return list(self._queue)
 
-    def __init__(self, values: list[int]) -> None:
-        self._values = values
+    def __len__(self) -> int:
+        return len(self._queue)
 
     def get(self) -> int:
-        return self._values.pop(0)
+        return self._queue.popleft()
+
+    def try_get(self) -> Optional[int]:
+        """Get the next input or `None` if the queue is empty."""
+        if len(self._queue) == 0:
+            return None
+        return self._queue.popleft()
 
     def put(self, value: int) -> None:
-        self._values.append(value)
+        self._queue.append(value)
+        return None
+
+    def put_many(self, values: Iterable[int]) -> None:
+        self._queue.extend(values)
         return None
 
 
@@ -347,7 +559,7 @@ def make_opcode(
     op: int, params: list[int], code: Intcode, modes: ParameterModes, rel_base: int
 ) -> Opcode:
 
-    if op not in set(list(range(1, 10)) + [99]):
+    if op not in OPERAND_LAYOUTS:
         raise UnknownOperationException(op)
 
     opcode_values: list[int] = []
@@ -392,6 +604,7 @@ class Instruction:
     instruction: str
     opcode_value: int
     modes: tuple[int, int, int]
+    layout: Optional[OperandLayout]
 
     def __init__(self, instruction: int) -> None:
         self.instruction = str(instruction).rjust(5, "0")
@@ -400,12 +613,143 @@ class Instruction:
         assert len(_modes) == 3
         assert all([m in {0, 1, 2} for m in _modes])
         self.modes = _modes[2], _modes[1], _modes[0]
+        self.layout = OPERAND_LAYOUTS.get(self.opcode_value)
         return None
 
     def __str__(self) -> str:
         return f"[{self.instruction}] - op: {self.opcode_value}  modes: {self.modes}"
 
 
+# ---- Dispatch engine ----
+#
+# Plain functions over the memory, instruction pointer, parameter modes and relative
+# base that return the next instruction pointer. Every address they write is passed
+# to `invalidate` (the computer's `_invalidate()`). Opcodes 3, 4, and 99 interact with
+# the inputs and the run loop so they are handled in `IntcodeComputer._run_dispatch`.
+
+_DispatchHandler = Callable[
+    [Intcode, Callable[[int], None], int, ParameterModes, int], int
+]
+
+
+def _dispatch_add(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    m1, m2, _ = modes
+    a, b, out_pos = code.read(ptr + 1), code.read(ptr + 2), code.read(ptr + 3)
+    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+    b = b if m2 == 1 else code.read(b + rel_base if m2 == 2 else b)
+    code.write(out_pos, a + b)
+    invalidate(out_pos)
+    return ptr + 4
+
+
+def _dispatch_multiply(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    m1, m2, _ = modes
+    a, b, out_pos = code.read(ptr + 1), code.read(ptr + 2), code.read(ptr + 3)
+    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+    b = b if m2 == 1 else code.read(b + rel_base if m2 == 2 else b)
+    code.write(out_pos, a * b)
+    invalidate(out_pos)
+    return ptr + 4
+
+
+def _dispatch_jump_if_true(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    m1, m2, _ = modes
+    a, b = code.read(ptr + 1), code.read(ptr + 2)
+    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+    b = b if m2 == 1 else code.read(b + rel_base if m2 == 2 else b)
+    return b if a != 0 else ptr + 3
+
+
+def _dispatch_jump_if_false(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    m1, m2, _ = modes
+    a, b = code.read(ptr + 1), code.read(ptr + 2)
+    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+    b = b if m2 == 1 else code.read(b + rel_base if m2 == 2 else b)
+    return b if a == 0 else ptr + 3
+
+
+def _dispatch_less_than(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    m1, m2, _ = modes
+    a, b, out_pos = code.read(ptr + 1), code.read(ptr + 2), code.read(ptr + 3)
+    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+    b = b if m2 == 1 else code.read(b + rel_base if m2 == 2 else b)
+    code.write(out_pos, 1 if a < b else 0)
+    invalidate(out_pos)
+    return ptr + 4
+
+
+def _dispatch_equals(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    m1, m2, _ = modes
+    a, b, out_pos = code.read(ptr + 1), code.read(ptr + 2), code.read(ptr + 3)
+    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+    b = b if m2 == 1 else code.read(b + rel_base if m2 == 2 else b)
+    code.write(out_pos, 1 if a == b else 0)
+    invalidate(out_pos)
+    return ptr + 4
+
+
+def _dispatch_relative_base(
+    code: Intcode,
+    invalidate: Callable[[int], None],
+    ptr: int,
+    modes: ParameterModes,
+    rel_base: int,
+) -> int:
+    # Like `Opcode9`, the operand is read but the relative base is not changed.
+    m1 = modes[0]
+    a = code.read(ptr + 1)
+    if m1 != 1:
+        code.read(a + rel_base if m1 == 2 else a)
+    return ptr + 2
+
+
+_DISPATCH_TABLE: Final[dict[int, _DispatchHandler]] = {
+    1: _dispatch_add,
+    2: _dispatch_multiply,
+    5: _dispatch_jump_if_true,
+    6: _dispatch_jump_if_false,
+    7: _dispatch_less_than,
+    8: _dispatch_equals,
+    9: _dispatch_relative_base,
+}
+
+
 @dataclass
 class IntcodeResult:
     instruction_pointer: int
@@ -430,18 +774,199 @@ class IntcodeResult:
         return s
 
 
+@unique
+class IntcodeEngine(Enum):
+    """Execution engines of the Intcode computer."""
+
+    OPCODE_CLASSES = "opcode-classes"
+    DISPATCH = "dispatch"
+
+
+@dataclass(frozen=True)
+class IntcodeSnapshot:
+    """State of an Intcode computer that can be restored any number of times."""
+
+    code: Intcode
+    instruction_pointer: int
+    relative_base: int
+    inputs: tuple[int, ...]
+    decode_cache: dict[int, Instruction]
+
+
+@unique
+class IntcodeStatus(Enum):
+    """Reason the Intcode computer stopped running."""
+
+    OUTPUT = "output"
+    HALTED = "halted"
+    NEEDS_INPUT = "needs-input"
+
+
+@dataclass
+class IntcodeRunResult:
+    outputs: list[int]
+    status: IntcodeStatus
+
+    def __str__(self) -> str:
+        return f"status: {self.status.value}  outputs: {self.outputs}"
+
+
+@dataclass
+class IntcodeProfile:
+    """Execution profile of an Intcode computer."""
+
+    opcode_counts: Counter[int] = field(default_factory=Counter)
+    instruction_counts: Counter[int] = field(default_factory=Counter)
+    reads: Counter[int] = field(default_factory=Counter)
+    writes: Counter[int] = field(default_factory=Counter)
+    memory_growth: list[tuple[int, int]] = field(default_factory=list)
+    run_times: list[float] = field(default_factory=list)
+
+    @property
+    def n_instructions(self) -> int:
+        return sum(self.opcode_counts.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "n_instructions": self.n_instructions,
+            "total_time": sum(self.run_times),
+            "run_times": self.run_times,
+            "opcode_counts": {str(k): v for k, v in sorted(self.opcode_counts.items())},
+            "instruction_counts": {
+                str(k): v for k, v in sorted(self.instruction_counts.items())
+            },
+            "reads": {str(k): v for k, v in sorted(self.reads.items())},
+            "writes": {str(k): v for k, v in sorted(self.writes.items())},
+            "memory_growth": [list(g) for g in self.memory_growth],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def hot_addresses(self, n: int = 10) -> str:
+        """Report of the most executed instructions and most accessed addresses."""
+        lines = [
+            f"instructions: {self.n_instructions}  time: {sum(self.run_times):.6f}s",
+            "",
+            f"{'address':>8} {'executed':>10} {'reads':>10} {'writes':>10}",
+        ]
+        totals = self.instruction_counts + self.reads + self.writes
+        for address, _ in totals.most_common(n):
+            lines.append(
+                f"{address:>8} {self.instruction_counts[address]:>10} "
+                f"{self.reads[address]:>10} {self.writes[address]:>10}"
+            )
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.hot_addresses()
+
+
+@contextmanager
+def _profiled_memory(code: Intcode, profile: IntcodeProfile) -> Iterator[None]:
+    """Count the reads, writes, and growth of the memory while in the context.
+
+    The counting functions shadow the methods on the instance only, so the memory is
+    not slowed down at all outside of the context.
+    """
+    read, write = code.read, code.write
+    ensure_length_atleast = code._ensure_length_atleast
+
+    def counted_read(address: int) -> int:
+        profile.reads[address] += 1
+        return read(address)
+
+    def counted_write(address: int, value: int) -> None:
+        profile.writes[address] += 1
+        return write(address, value)
+
+    def recorded_ensure_length_atleast(x: int) -> None:
+        old_length = len(code)
+        ensure_length_atleast(x)
+        if len(code) != old_length:
+            profile.memory_growth.append((old_length, len(code)))
+        return None
+
+    setattr(code, "read", counted_read)
+    setattr(code, "write", counted_write)
+    setattr(code, "_ensure_length_atleast", recorded_ensure_length_atleast)
+    try:
+        yield
+    finally:
+        for name in ("read", "write", "_ensure_length_atleast"):
+            delattr(code, name)
+
+
 class IntcodeComputer:
+    """Intcode computer.
+
+    Decoded instructions are cached by address. Writes by the opcodes invalidate the
+    cache, but changes made to `code` from outside need `clear_decode_cache()`.
+
+    The dispatch engine is used by default. The opcode class engine builds an `Opcode`
+    object per instruction and is always used when `verbose` is set.
+
+    Calling the computer runs until the first output and leaves the instruction
+    pointer on the output instruction. `run()` keeps going until the program halts
+    or needs an input that is not available, and `stream()` lazily yields the outputs
+    one at a time. Both leave the instruction pointer on the next instruction to
+    execute. All read from `inputs` unless another input queue is passed.
+
+    `enable_profiling()` and `enable_tracing()` switch the dispatch engine to an
+    instrumented copy of its loop that fills in `profile` and records each executed
+    instruction to `trace`. The regular loop has no such checks at all.
+    """
 
     code: Intcode
+    engine: IntcodeEngine
+    inputs: IntcodeInput
+    profile: Optional[IntcodeProfile]
+    trace: Optional[IntcodeTrace]
     _verbose: bool
     _instr_ptr: int
     _relative_base: int
-
-    def __init__(self, code: Intcode, verbose: bool = False) -> None:
+    _decode_cache: dict[int, Instruction]
+
+    def __init__(
+        self,
+        code: Intcode,
+        verbose: bool = False,
+        engine: IntcodeEngine = IntcodeEngine.DISPATCH,
+    ) -> None:
         self.code = code
+        self.engine = engine
+        self.inputs = IntcodeInput([])
+        self.profile = None
+        self.trace = None
         self._verbose = verbose
         self._instr_ptr = 0
         self._relative_base = 0
+        self._decode_cache = {}
+
+    def _decode(self, ptr: int) -> Instruction:
+        instruction = self._decode_cache.get(ptr)
+        if instruction is None:
+            instruction = Instruction(self.code[ptr])
+            self._decode_cache[ptr] = instruction
+        return instruction
+
+    def _invalidate(self, address: int) -> None:
+        """Forget anything decoded from an address that was written.
+
+        Every write made by the program goes through here, whichever loop runs it.
+        """
+        self._decode_cache.pop(address, None)
+        return None
+
+    def _invalidate_written(self, instruction: Instruction, params: list[int]) -> None:
+        if instruction.layout is None or instruction.layout.write_param is None:
+            return None
+        self._invalidate(params[instruction.layout.write_param])
+        return None
+
+    def clear_decode_cache(self) -> None:
+        self._decode_cache.clear()
+        return None
 
     def _update_instruction_pointer(self, op: Opcode, op_res: OperationResult) -> None:
         if op_res.instruction_pointer is not None:
@@ -449,20 +974,148 @@ class IntcodeComputer:
         else:
             self._instr_ptr += op.n_params + 1
 
+    @property
+    def _uses_opcode_classes(self) -> bool:
+        return self._verbose or self.engine is IntcodeEngine.OPCODE_CLASSES
+
+    def enable_profiling(self) -> IntcodeProfile:
+        """Start recording a profile of the dispatch engine (keeps an existing one)."""
+        if self.profile is None:
+            self.profile = IntcodeProfile()
+        return self.profile
+
+    def disable_profiling(self) -> Optional[IntcodeProfile]:
+        """Stop profiling and return the recorded profile."""
+        profile, self.profile = self.profile, None
+        return profile
+
+    def enable_tracing(
+        self, capacity: int = 1_000_000, path: Union[str, Path, None] = None
+    ) -> IntcodeTrace:
+        """Record the last `capacity` instructions executed by the dispatch engine.
+
+        With a `path`, the trace is kept in a memory-mapped file.
+        """
+        if self.trace is None:
+            self.trace = IntcodeTrace(capacity=capacity, path=path)
+        return self.trace
+
+    def disable_tracing(self) -> Optional[IntcodeTrace]:
+        """Stop tracing and return the recorded trace."""
+        trace, self.trace = self.trace, None
+        return trace
+
+    def _dispatch_loop(
+        self,
+    ) -> Callable[
+        [IntcodeInput, list[int], bool, bool],
+        tuple[IntcodeStatus, Optional[Instruction], int],
+    ]:
+        if self.profile is None and self.trace is None:
+            return self._run_dispatch
+        return self._run_dispatch_instrumented
+
     def __call__(self, inputs: Optional[IntcodeInput] = None) -> IntcodeResult:
         if inputs is None:
-            inputs = IntcodeInput([])
-        output: Optional[int] = None
+            inputs = self.inputs
+        outputs: list[int] = []
+        if self._uses_opcode_classes:
+            _, opcode = self._run_opcode_classes(
+                inputs, outputs, stop_at_output=True, wait_for_input=False
+            )
+        else:
+            _, last_instruction, last_ptr = self._dispatch_loop()(
+                inputs, outputs, True, False
+            )
+            opcode = self._rebuild_opcode(last_instruction, last_ptr)
+        return IntcodeResult(
+            instruction_pointer=self._instr_ptr,
+            output=outputs[0] if len(outputs) > 0 else None,
+            instruction=self._decode(self._instr_ptr),
+            opcode=opcode,
+        )
+
+    def run(self, inputs: Optional[IntcodeInput] = None) -> IntcodeRunResult:
+        """Run until the program halts or needs an input that is not available."""
+        if inputs is None:
+            inputs = self.inputs
+        outputs: list[int] = []
+        status = self._execute(
+            inputs, outputs, stop_at_output=False, wait_for_input=True
+        )
+        return IntcodeRunResult(outputs=outputs, status=status)
+
+    def stream(
+        self,
+        inputs: Optional[IntcodeInput] = None,
+        source: Optional[Iterator[int]] = None,
+    ) -> Generator[int, Optional[int], IntcodeStatus]:
+        """Lazily yield the outputs of the program.
+
+        A value passed to `send()` is added to the inputs. When the inputs run out,
+        the next one is taken from `source` (e.g. the stream of another computer). The
+        generator returns the status once the program halts or no input is left.
+        """
+        if inputs is None:
+            inputs = self.inputs
+        outputs: list[int] = []
+        while True:
+            status = self._execute(
+                inputs, outputs, stop_at_output=True, wait_for_input=True
+            )
+            if status is IntcodeStatus.OUTPUT:
+                # Step past the output instruction before handing over the value.
+                self._instr_ptr += OPERAND_LAYOUTS[4].n_params + 1
+                value = yield outputs.pop()
+                if value is not None:
+                    inputs.put(value)
+            elif status is IntcodeStatus.NEEDS_INPUT and source is not None:
+                try:
+                    inputs.put(next(source))
+                except StopIteration:
+                    return status
+            else:
+                return status
+
+    def _execute(
+        self,
+        inputs: IntcodeInput,
+        outputs: list[int],
+        stop_at_output: bool,
+        wait_for_input: bool,
+    ) -> IntcodeStatus:
+        if self._uses_opcode_classes:
+            status, _ = self._run_opcode_classes(
+                inputs, outputs, stop_at_output, wait_for_input
+            )
+        else:
+            status, _, _ = self._dispatch_loop()(
+                inputs, outputs, stop_at_output, wait_for_input
+            )
+        return status
+
+    def _run_opcode_classes(
+        self,
+        inputs: IntcodeInput,
+        outputs: list[int],
+        stop_at_output: bool,
+        wait_for_input: bool,
+    ) -> tuple[IntcodeStatus, Optional[Opcode]]:
         operation: Optional[Opcode] = None
         while True:
-            instruction = Instruction(self.code[self._instr_ptr])
+            instruction = self._decode(self._instr_ptr)
             if self._verbose:
                 print(f"instruction: {instruction}")
 
             if instruction.opcode_value == 99:
                 if self._verbose:
                     print("found completion operation (op 99)")
-                break
+                return IntcodeStatus.HALTED, operation
+
+            if instruction.opcode_value == 3 and wait_for_input and len(inputs) == 0:
+                if self._verbose:
+                    print("waiting for input (op 3)")
+                return IntcodeStatus.NEEDS_INPUT, operation
 
             params = self.code[(self._instr_ptr + 1) : (self._instr_ptr + 4)]
             operation = make_opcode(
@@ -473,19 +1126,189 @@ class IntcodeComputer:
                 rel_base=self._relative_base,
             )
             op_res = operation(code=self.code, inputs=inputs, inst_ptr=self._instr_ptr)
+            self._invalidate_written(instruction, params)
             if op_res.output is not None:
-                output = op_res.output
-                break
+                outputs.append(op_res.output)
+                if stop_at_output:
+                    return IntcodeStatus.OUTPUT, operation
 
             self._update_instruction_pointer(op=operation, op_res=op_res)
 
-        return IntcodeResult(
+    def _run_dispatch(
+        self,
+        inputs: IntcodeInput,
+        outputs: list[int],
+        stop_at_output: bool,
+        wait_for_input: bool,
+    ) -> tuple[IntcodeStatus, Optional[Instruction], int]:
+        code = self.code
+        cache = self._decode_cache
+        decode = self._decode
+        invalidate = self._invalidate
+        handlers = _DISPATCH_TABLE
+        rel_base = self._relative_base
+        ptr = self._instr_ptr
+        last_instruction: Optional[Instruction] = None
+        last_ptr = ptr
+        try:
+            while True:
+                instruction = cache.get(ptr) or decode(ptr)
+                op = instruction.opcode_value
+                if op == 99:
+                    return IntcodeStatus.HALTED, last_instruction, last_ptr
+                elif op == 4:
+                    a, m1 = code.read(ptr + 1), instruction.modes[0]
+                    a = a if m1 == 1 else code.read(a + rel_base if m1 == 2 else a)
+                    outputs.append(a)
+                    last_instruction, last_ptr = instruction, ptr
+                    if stop_at_output:
+                        return IntcodeStatus.OUTPUT, last_instruction, last_ptr
+                    ptr += 2
+                    continue
+                elif op == 3:
+                    if wait_for_input and len(inputs) == 0:
+                        return IntcodeStatus.NEEDS_INPUT, last_instruction, last_ptr
+                    out_pos = code.read(ptr + 1)
+                    code.write(out_pos, inputs.get())
+                    invalidate(out_pos)
+                    last_instruction, last_ptr = instruction, ptr
+                    ptr += 2
+                    continue
+                handler = handlers.get(op)
+                if handler is None:
+                    raise UnknownOperationException(op)
+                last_instruction, last_ptr = instruction, ptr
+                ptr = handler(code, invalidate, ptr, instruction.modes, rel_base)
+        finally:
+            self._instr_ptr = ptr
+
+    def _run_dispatch_instrumented(
+        self,
+        inputs: IntcodeInput,
+        outputs: list[int],
+        stop_at_output: bool,
+        wait_for_input: bool,
+    ) -> tuple[IntcodeStatus, Optional[Instruction], int]:
+        # Same loop as `_run_dispatch` with the profile counters and trace records.
+        profile, trace = self.profile, self.trace
+        code = self.code
+        cache = self._decode_cache
+        decode = self._decode
+        invalidate = self._invalidate
+        handlers = _DISPATCH_TABLE
+        rel_base = self._relative_base
+        ptr = self._instr_ptr
+        last_instruction: Optional[Instruction] = None
+        last_ptr = ptr
+        status: Optional[IntcodeStatus] = None
+        # Reads for the trace go around the profile's counters.
+        trace_read = code.read
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                if profile is not None:
+                    stack.enter_context(_profiled_memory(code, profile))
+                read, write = code.read, code.write
+                while status is None:
+                    instruction = cache.get(ptr) or decode(ptr)
+                    op = instruction.opcode_value
+                    if op == 3 and wait_for_input and len(inputs) == 0:
+                        return IntcodeStatus.NEEDS_INPUT, last_instruction, last_ptr
+                    if profile is not None:
+                        profile.opcode_counts[op] += 1
+                        profile.instruction_counts[ptr] += 1
+                    if trace is not None:
+                        layout = instruction.layout
+                        n_params = 0 if layout is None else layout.n_params
+                        params = [trace_read(ptr + i + 1) for i in range(n_params)]
+                        instr_ptr = ptr
+
+                    if op == 99:
+                        status = IntcodeStatus.HALTED
+                    elif op == 4:
+                        a, m1 = read(ptr + 1), instruction.modes[0]
+                        a = a if m1 == 1 else read(a + rel_base if m1 == 2 else a)
+                        outputs.append(a)
+                        last_instruction, last_ptr = instruction, ptr
+                        if stop_at_output:
+                            status = IntcodeStatus.OUTPUT
+                        else:
+                            ptr += 2
+                    elif op == 3:
+                        out_pos = read(ptr + 1)
+                        write(out_pos, inputs.get())
+                        invalidate(out_pos)
+                        last_instruction, last_ptr = instruction, ptr
+                        ptr += 2
+                    elif (handler := handlers.get(op)) is not None:
+                        last_instruction, last_ptr = instruction, ptr
+                        ptr = handler(
+                            code, invalidate, ptr, instruction.modes, rel_base
+                        )
+
+                    if trace is not None:
+                        out_address: Optional[int] = None
+                        if layout is not None and layout.write_param is not None:
+                            out_address = params[layout.write_param]
+                        trace.append(
+                            instr_ptr,
+                            op,
+                            instruction.modes,
+                            params,
+                            out_address,
+                            None if out_address is None else trace_read(out_address),
+                        )
+                    if op not in handlers and op not in (3, 4, 99):
+                        raise UnknownOperationException(op)
+            return status, last_instruction, last_ptr
+        finally:
+            self._instr_ptr = ptr
+            if profile is not None:
+                profile.run_times.append(perf_counter() - start)
+            if trace is not None:
+                trace.flush()
+
+    def _rebuild_opcode(
+        self, instruction: Optional[Instruction], ptr: int
+    ) -> Optional[Opcode]:
+        # The dispatch engine does not build `Opcode` objects while running, so the
+        # last one executed is rebuilt from the current memory for the result.
+        if instruction is None:
+            return None
+        return make_opcode(
+            instruction.opcode_value,
+            params=self.code[(ptr + 1) : (ptr + 4)],
+            code=self.code,
+            modes=instruction.modes,
+            rel_base=self._relative_base,
+        )
+
+    def snapshot(self) -> IntcodeSnapshot:
+        return IntcodeSnapshot(
+            code=self.code.copy(),
             instruction_pointer=self._instr_ptr,
-            output=output,
-            instruction=instruction,
-            opcode=operation,
+            relative_base=self._relative_base,
+            inputs=tuple(self.inputs._queue),
+            decode_cache=self._decode_cache.copy(),
         )
 
+    def restore(self, snapshot: IntcodeSnapshot) -> None:
+        self.code = snapshot.code.copy()
+        self.inputs = IntcodeInput(snapshot.inputs)
+        self._instr_ptr = snapshot.instruction_pointer
+        self._relative_base = snapshot.relative_base
+        self._decode_cache = snapshot.decode_cache.copy()
+        return None
+
+    def fork(self) -> IntcodeComputer:
+        """Copy of the computer that shares memory pages until either one writes."""
+        new = type(self)(self.code.copy(), verbose=self._verbose, engine=self.engine)
+        new.inputs = IntcodeInput(self.inputs._queue)
+        new._instr_ptr = self._instr_ptr
+        new._relative_base = self._relative_base
+        new._decode_cache = self._decode_cache.copy()
+        return new
+
     def set_instruction_pointer(self, new_ptr: int) -> None:
         assert new_ptr >= 0
         self._instr_ptr = new_ptr
@@ -0,0 +1,55 @@
+"""asyncio front-end for Intcode computers."""
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from intcode import IntcodeComputer, IntcodeStatus
+
+
+class AsyncIntcodeComputer:
+    """Run an Intcode computer as an asyncio task.
+
+    Inputs are awaited from the `inputs` queue and outputs are put onto the `outputs`
+    queue. The computer runs in batches with `IntcodeComputer.run()` and only awaits
+    when it needs an input, so there is no per-instruction overhead. The queues
+    should be created inside the running event loop.
+    """
+
+    computer: IntcodeComputer
+    inputs: asyncio.Queue[int]
+    outputs: asyncio.Queue[int]
+
+    def __init__(
+        self,
+        computer: IntcodeComputer,
+        inputs: Optional[asyncio.Queue[int]] = None,
+        outputs: Optional[asyncio.Queue[int]] = None,
+    ) -> None:
+        self.computer = computer
+        self.inputs = asyncio.Queue() if inputs is None else inputs
+        self.outputs = asyncio.Queue() if outputs is None else outputs
+
+    async def run(self) -> IntcodeStatus:
+        """Run the program until it halts."""
+        while True:
+            res = self.computer.run()
+            for value in res.outputs:
+                await self.outputs.put(value)
+            if res.status is IntcodeStatus.HALTED:
+                return res.status
+            self.computer.inputs.put(await self.inputs.get())
+            # Take any other waiting inputs too so the next batch runs longer.
+            while not self.inputs.empty():
+                self.computer.inputs.put(self.inputs.get_nowait())
+
+
+def connect_ring(computers: list[IntcodeComputer]) -> list[AsyncIntcodeComputer]:
+    """Connect the computers in a loop, each one's outputs feeding the next one."""
+    queues: list[asyncio.Queue[int]] = [asyncio.Queue() for _ in computers]
+    return [
+        AsyncIntcodeComputer(
+            comp, inputs=queues[i], outputs=queues[(i + 1) % len(queues)]
+        )
+        for i, comp in enumerate(computers)
+    ]
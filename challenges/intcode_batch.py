@@ -0,0 +1,248 @@
+"""Run many Intcode machines in lockstep with NumPy."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from typing import Final, Optional, Sequence
+
+import numpy as np
+from intcode import Instruction
+
+_INT64_MIN: Final[int] = np.iinfo(np.int64).min
+
+
+@unique
+class BatchLaneStatus(Enum):
+    """State of one machine (lane) in a batch."""
+
+    RUNNING = 0
+    HALTED = 1
+    NEEDS_INPUT = 2
+    FAULT = 3
+
+
+@dataclass
+class BatchRunResult:
+    memory: np.ndarray
+    statuses: np.ndarray
+    instruction_pointers: np.ndarray
+    outputs: list[list[int]] = field(default_factory=list)
+    n_steps: int = 0
+
+    def lanes(self, status: BatchLaneStatus) -> np.ndarray:
+        """Indices of the lanes that finished with `status`."""
+        return np.flatnonzero(self.statuses == status.value)
+
+    def __str__(self) -> str:
+        counts = {s.name.lower(): len(self.lanes(s)) for s in BatchLaneStatus}
+        return f"steps: {self.n_steps}  lanes: {counts}"
+
+
+class BatchIntcodeComputer:
+    """Batch of Intcode machines stepped together with NumPy.
+
+    Each row of `memory` is the memory of one machine (a lane) and every lane has
+    its own instruction pointer. On each step, all running lanes execute one
+    instruction: the lanes are grouped by instruction and each group is updated with
+    masked array operations. A lane retires when it halts, runs out of inputs, or
+    faults (unknown opcode, address outside of its row, or an overflow of the int64
+    memory); the other lanes keep running.
+
+    Like `IntcodeComputer`, opcode 9 does not move the relative base, so relative
+    addresses are read as positions. Inputs for opcode 3 are taken in order from
+    the lane's row of `inputs`. Outputs are collected per lane.
+    """
+
+    memory: np.ndarray
+    inputs: np.ndarray
+
+    def __init__(self, memory: np.ndarray, inputs: Optional[np.ndarray] = None) -> None:
+        if memory.ndim != 2:
+            raise ValueError("Memory must be a 2-D array with one row per lane.")
+        n_lanes = memory.shape[0]
+        self.memory = np.ascontiguousarray(memory, dtype=np.int64).copy()
+        # Flat view of the memory for indexing with `lane * width + address`.
+        self._flat = self.memory.reshape(-1)
+        if inputs is None:
+            inputs = np.zeros((n_lanes, 0), dtype=np.int64)
+        if inputs.ndim != 2 or inputs.shape[0] != n_lanes:
+            raise ValueError("Inputs must be a 2-D array with one row per lane.")
+        self.inputs = inputs.astype(np.int64, copy=True)
+        self._ptrs = np.zeros(n_lanes, dtype=np.int64)
+        self._input_ptrs = np.zeros(n_lanes, dtype=np.int64)
+        self._statuses = np.full(n_lanes, BatchLaneStatus.RUNNING.value, dtype=np.int8)
+        self._outputs: list[list[int]] = [[] for _ in range(n_lanes)]
+        self._n_steps = 0
+
+    @classmethod
+    def from_program(
+        cls,
+        program: Sequence[int],
+        n_lanes: int,
+        extra_memory: int = 0,
+        inputs: Optional[np.ndarray] = None,
+    ) -> BatchIntcodeComputer:
+        """Batch of `n_lanes` copies of one program, padded with `extra_memory`."""
+        row = np.zeros(len(program) + extra_memory, dtype=np.int64)
+        row[: len(program)] = program
+        return cls(np.tile(row, (n_lanes, 1)), inputs=inputs)
+
+    @property
+    def n_lanes(self) -> int:
+        return self.memory.shape[0]
+
+    def _fault(self, lanes: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Retire the lanes where `mask` is set and return the remaining lanes."""
+        self._statuses[lanes[mask]] = BatchLaneStatus.FAULT.value
+        return lanes[~mask]
+
+    def _operands(
+        self, lanes: np.ndarray, instruction: Instruction, n_reads: int
+    ) -> tuple[np.ndarray, list[np.ndarray]]:
+        """Read the first `n_reads` operands of `instruction` in each of `lanes`.
+
+        Lanes that would read outside of their memory are faulted and dropped.
+        """
+        flat, width = self._flat, self.memory.shape[1]
+        rows = lanes * width
+        ptrs = self._ptrs[lanes]
+        ok = ptrs + n_reads < width
+        params = []
+        for i in range(n_reads):
+            param = flat.take(rows + np.minimum(ptrs + i + 1, width - 1))
+            if instruction.modes[i] != 1:
+                ok &= (param >= 0) & (param < width)
+            params.append(param)
+        if not ok.all():
+            lanes, rows = self._fault(lanes, ~ok), rows[ok]
+            params = [p[ok] for p in params]
+
+        values = []
+        for mode, param in zip(instruction.modes, params):
+            values.append(param if mode == 1 else flat.take(rows + param))
+        return lanes, values
+
+    def _write(self, lanes: np.ndarray, param_idx: int, values: np.ndarray) -> None:
+        flat, width = self._flat, self.memory.shape[1]
+        rows = lanes * width
+        ptrs = self._ptrs[lanes]
+        ok = ptrs + param_idx + 1 < width
+        out = flat.take(rows + np.minimum(ptrs + param_idx + 1, width - 1))
+        ok &= (out >= 0) & (out < width)
+        if not ok.all():
+            self._fault(lanes, ~ok)
+            lanes, rows, out, values = lanes[ok], rows[ok], out[ok], values[ok]
+        flat[rows + out] = values
+        self._ptrs[lanes] += param_idx + 2
+        return None
+
+    def _step_arithmetic(self, lanes: np.ndarray, instruction: Instruction) -> None:
+        lanes, (a, b) = self._operands(lanes, instruction, 2)
+        op = instruction.opcode_value
+        overflow: Optional[np.ndarray] = None
+        if op == 1:
+            res = a + b
+            # Signed overflow: the result's sign differs from both operands' signs.
+            overflow = ((a ^ res) & (b ^ res)) < 0
+        elif op == 2:
+            res = a * b
+            # The product wrapped if dividing it by one operand does not give back
+            # the other. Only MIN // -1 wraps itself, so it is checked on its own.
+            with np.errstate(over="ignore"):
+                overflow = (b != 0) & (res // np.where(b == 0, 1, b) != a)
+            overflow |= (b == -1) & (a == _INT64_MIN)
+        elif op == 7:
+            res = (a < b).astype(np.int64)
+        else:
+            res = (a == b).astype(np.int64)
+        if overflow is not None and overflow.any():
+            lanes, res = self._fault(lanes, overflow), res[~overflow]
+        self._write(lanes, 2, res)
+        return None
+
+    def _step_jump(self, lanes: np.ndarray, instruction: Instruction) -> None:
+        lanes, (a, target) = self._operands(lanes, instruction, 2)
+        jump = (a != 0) if instruction.opcode_value == 5 else (a == 0)
+        self._ptrs[lanes] = np.where(jump, target, self._ptrs[lanes] + 3)
+        return None
+
+    def _step_input(self, lanes: np.ndarray) -> None:
+        has_input = self._input_ptrs[lanes] < self.inputs.shape[1]
+        self._statuses[lanes[~has_input]] = BatchLaneStatus.NEEDS_INPUT.value
+        lanes = lanes[has_input]
+        values = self.inputs[lanes, self._input_ptrs[lanes]]
+        self._input_ptrs[lanes] += 1
+        self._write(lanes, 0, values)
+        return None
+
+    def _step_output(self, lanes: np.ndarray, instruction: Instruction) -> None:
+        lanes, (a,) = self._operands(lanes, instruction, 1)
+        for lane, value in zip(lanes.tolist(), a.tolist()):
+            self._outputs[lane].append(value)
+        self._ptrs[lanes] += 2
+        return None
+
+    def _step_relative_base(self, lanes: np.ndarray, instruction: Instruction) -> None:
+        # The operand is read (and checked) but the relative base is not changed.
+        lanes, _ = self._operands(lanes, instruction, 1)
+        self._ptrs[lanes] += 2
+        return None
+
+    def _step_group(self, lanes: np.ndarray, instruction_value: int) -> None:
+        """Execute one instruction word on all of the lanes that are at it."""
+        try:
+            instruction = Instruction(instruction_value)
+        except AssertionError:
+            self._fault(lanes, np.ones(len(lanes), dtype=bool))
+            return None
+        op = instruction.opcode_value
+        if op == 99:
+            self._statuses[lanes] = BatchLaneStatus.HALTED.value
+        elif op in (1, 2, 7, 8):
+            self._step_arithmetic(lanes, instruction)
+        elif op in (5, 6):
+            self._step_jump(lanes, instruction)
+        elif op == 3:
+            self._step_input(lanes)
+        elif op == 4:
+            self._step_output(lanes, instruction)
+        elif op == 9:
+            self._step_relative_base(lanes, instruction)
+        else:
+            self._fault(lanes, np.ones(len(lanes), dtype=bool))
+        return None
+
+    def step(self) -> int:
+        """Run one instruction on every running lane and return how many ran."""
+        lanes = np.flatnonzero(self._statuses == BatchLaneStatus.RUNNING.value)
+        if len(lanes) == 0:
+            return 0
+        width = self.memory.shape[1]
+        ptrs = self._ptrs[lanes]
+        in_range = (ptrs >= 0) & (ptrs < width)
+        if not in_range.all():
+            lanes, ptrs = self._fault(lanes, ~in_range), ptrs[in_range]
+        instrs = self._flat.take(lanes * width + ptrs)
+
+        # Group the lanes by instruction word so the parameter modes are the same in
+        # each group. Lanes of a parameter sweep usually all run the same one.
+        if len(instrs) > 0 and (instrs == instrs[0]).all():
+            self._step_group(lanes, int(instrs[0]))
+        else:
+            for value in np.unique(instrs).tolist():
+                self._step_group(lanes[instrs == value], value)
+        self._n_steps += 1
+        return len(lanes)
+
+    def run(self, max_steps: Optional[int] = None) -> BatchRunResult:
+        """Step the batch until no lane is running (or after `max_steps` steps)."""
+        n = 0
+        while (max_steps is None or n < max_steps) and self.step() > 0:
+            n += 1
+        return BatchRunResult(
+            memory=self.memory,
+            statuses=self._statuses.copy(),
+            instruction_pointers=self._ptrs.copy(),
+            outputs=self._outputs,
+            n_steps=self._n_steps,
+        )
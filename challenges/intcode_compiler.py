@@ -0,0 +1,270 @@
+"""Compile Intcode basic blocks into Python functions."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Final, Optional
+
+from intcode import (
+    _DISPATCH_TABLE,
+    Instruction,
+    Intcode,
+    IntcodeComputer,
+    IntcodeEngine,
+    IntcodeInput,
+    IntcodeSnapshot,
+    IntcodeStatus,
+    UnknownOperationException,
+)
+
+# A compiled block is called with the memory's `read` and `write`, the relative base,
+# the set of watched addresses and the invalidation callback. It returns the address
+# of the next instruction.
+BlockFunction = Callable[
+    [
+        Callable[[int], int],
+        Callable[[int, int], None],
+        int,
+        "set[int]",
+        Callable[[int], None],
+    ],
+    int,
+]
+
+# Opcodes that are compiled into blocks. Input, output, and halt are left to the
+# interpreter loop because they have to be able to stop the run.
+_COMPILED_OPCODES: Final[frozenset[int]] = frozenset({1, 2, 5, 6, 7, 8, 9})
+_JUMP_OPCODES: Final[frozenset[int]] = frozenset({5, 6})
+# Number of times an address has to be reached before a block is compiled from it.
+# Code that only runs once is cheaper to interpret than to compile.
+_COMPILE_THRESHOLD: Final[int] = 2
+
+
+@dataclass(frozen=True)
+class CompiledBlock:
+    start: int
+    stop: int
+    function: BlockFunction
+    last_instruction: Instruction
+    last_ptr: int
+    source: str
+
+
+def _operand(param: int, mode: int) -> str:
+    if mode == 1:
+        return repr(param)
+    elif mode == 2:
+        return f"read({param} + rb)"
+    return f"read({param})"
+
+
+def _write_lines(out_pos: int, value: str, next_ptr: int) -> list[str]:
+    return [
+        f"    write({out_pos}, {value})",
+        f"    if {out_pos} in watched:",
+        f"        invalidate({out_pos})",
+        f"        return {next_ptr}",
+    ]
+
+
+class CompiledIntcodeComputer(IntcodeComputer):
+    """Intcode computer that compiles basic blocks into Python functions.
+
+    A block is the run of instructions from an address up to a jump (opcodes 5 and
+    6) or an instruction that is left to the interpreter (input, output, and halt).
+    It is compiled with `compile()` once it is reached a second time and its operands
+    are baked in as constants. If the program writes into a compiled block, the block is
+    dropped, and the written instruction is interpreted from then on.
+
+    With this computer `IntcodeResult.opcode` on halting is the last instruction of
+    the last block that ran. While profiling or tracing is enabled, the instrumented
+    loop of `IntcodeComputer` interprets every instruction instead, so a profile
+    counts each instruction but times the interpreter, not the compiled blocks.
+    """
+
+    _blocks: dict[int, Optional[CompiledBlock]]
+    _heat: dict[int, int]
+    # Starts of the compiled blocks covering each address. Blocks can overlap when a
+    # jump lands in the middle of one.
+    _block_of: dict[int, set[int]]
+    _watched: set[int]
+    _dirty: set[int]
+
+    def __init__(
+        self,
+        code: Intcode,
+        verbose: bool = False,
+        engine: IntcodeEngine = IntcodeEngine.DISPATCH,
+    ) -> None:
+        super().__init__(code, verbose=verbose, engine=engine)
+        self._reset_compiled()
+
+    def _reset_compiled(self) -> None:
+        self._blocks = {}
+        self._heat = {}
+        self._block_of = {}
+        self._watched = set()
+        self._dirty = set()
+        return None
+
+    def clear_decode_cache(self) -> None:
+        super().clear_decode_cache()
+        self._reset_compiled()
+        return None
+
+    def restore(self, snapshot: IntcodeSnapshot) -> None:
+        super().restore(snapshot)
+        self._reset_compiled()
+        return None
+
+    def _invalidate(self, address: int) -> None:
+        """Forget decoded and compiled code covering an address that was written.
+
+        This overrides the hook every loop of `IntcodeComputer` calls on a write, so
+        runs with the opcode classes, profiling, or tracing keep the blocks correct.
+        """
+        self._decode_cache.pop(address, None)
+        self._watched.discard(address)
+        starts = self._block_of.pop(address, None)
+        if starts is None:
+            return None
+        self._dirty.add(address)
+        for start in starts:
+            block = self._blocks.pop(start)
+            assert block is not None
+            for cell in range(block.start, block.stop):
+                if (covering := self._block_of.get(cell)) is None:
+                    continue
+                covering.discard(start)
+                if len(covering) == 0:
+                    del self._block_of[cell]
+                    self._watched.discard(cell)
+        return None
+
+    def _compile_block(self, start: int) -> Optional[CompiledBlock]:
+        code = self.code
+        lines = ["def block(read, write, rb, watched, invalidate):"]
+        ptr = start
+        last: Optional[tuple[Instruction, int]] = None
+        while True:
+            try:
+                instruction = Instruction(code.read(ptr))
+            except AssertionError:
+                break
+            op = instruction.opcode_value
+            if op not in _COMPILED_OPCODES:
+                break
+            assert instruction.layout is not None
+            stop = ptr + instruction.layout.n_params + 1
+            if any(cell in self._dirty for cell in range(ptr, stop)):
+                break
+            params = [code.read(p) for p in range(ptr + 1, stop)]
+            args = [_operand(p, m) for p, m in zip(params, instruction.modes)]
+            lines.append(f"    # {ptr}: {instruction}")
+            if op == 1:
+                lines += _write_lines(params[2], f"{args[0]} + {args[1]}", stop)
+            elif op == 2:
+                lines += _write_lines(params[2], f"{args[0]} * {args[1]}", stop)
+            elif op == 5:
+                lines += [f"    if {args[0]} != 0:", f"        return {args[1]}"]
+            elif op == 6:
+                lines += [f"    if {args[0]} == 0:", f"        return {args[1]}"]
+            elif op == 7:
+                value = f"1 if {args[0]} < {args[1]} else 0"
+                lines += _write_lines(params[2], value, stop)
+            elif op == 8:
+                value = f"1 if {args[0]} == {args[1]} else 0"
+                lines += _write_lines(params[2], value, stop)
+            elif op == 9 and instruction.modes[0] != 1:
+                # Like `Opcode9`, the operand is read but the relative base is kept.
+                lines.append(f"    {args[0]}")
+            last = (instruction, ptr)
+            ptr = stop
+            if op in _JUMP_OPCODES:
+                break
+
+        if last is None:
+            self._blocks[start] = None
+            return None
+
+        lines.append(f"    return {ptr}")
+        source = "\n".join(lines) + "\n"
+        namespace: dict[str, BlockFunction] = {}
+        exec(compile(source, f"<intcode block {start}>", "exec"), namespace)
+        block = CompiledBlock(
+            start=start,
+            stop=ptr,
+            function=namespace["block"],
+            last_instruction=last[0],
+            last_ptr=last[1],
+            source=source,
+        )
+        self._blocks[start] = block
+        for cell in range(start, ptr):
+            self._block_of.setdefault(cell, set()).add(start)
+            self._watched.add(cell)
+        return block
+
+    def _run_dispatch(
+        self,
+        inputs: IntcodeInput,
+        outputs: list[int],
+        stop_at_output: bool,
+        wait_for_input: bool,
+    ) -> tuple[IntcodeStatus, Optional[Instruction], int]:
+        code = self.code
+        read, write = code.read, code.write
+        blocks = self._blocks
+        heat = self._heat
+        watched = self._watched
+        invalidate = self._invalidate
+        compile_block = self._compile_block
+        rel_base = self._relative_base
+        ptr = self._instr_ptr
+        last_instruction: Optional[Instruction] = None
+        last_ptr = ptr
+        try:
+            while True:
+                if ptr in blocks:
+                    block = blocks[ptr]
+                elif heat.get(ptr, 0) + 1 >= _COMPILE_THRESHOLD:
+                    block = compile_block(ptr)
+                else:
+                    heat[ptr] = heat.get(ptr, 0) + 1
+                    block = None
+                if block is not None:
+                    ptr = block.function(read, write, rel_base, watched, invalidate)
+                    last_instruction, last_ptr = block.last_instruction, block.last_ptr
+                    continue
+
+                # Not compiled: input, output, halt, or code written at runtime.
+                instruction = self._decode(ptr)
+                watched.add(ptr)
+                op = instruction.opcode_value
+                if op == 99:
+                    return IntcodeStatus.HALTED, last_instruction, last_ptr
+                elif op == 4:
+                    a, m1 = read(ptr + 1), instruction.modes[0]
+                    a = a if m1 == 1 else read(a + rel_base if m1 == 2 else a)
+                    outputs.append(a)
+                    last_instruction, last_ptr = instruction, ptr
+                    if stop_at_output:
+                        return IntcodeStatus.OUTPUT, last_instruction, last_ptr
+                    ptr += 2
+                    continue
+                elif op == 3:
+                    if wait_for_input and len(inputs) == 0:
+                        return IntcodeStatus.NEEDS_INPUT, last_instruction, last_ptr
+                    out_pos = read(ptr + 1)
+                    write(out_pos, inputs.get())
+                    if out_pos in watched:
+                        invalidate(out_pos)
+                    last_instruction, last_ptr = instruction, ptr
+                    ptr += 2
+                    continue
+                handler = _DISPATCH_TABLE.get(op)
+                if handler is None:
+                    raise UnknownOperationException(op)
+                last_instruction, last_ptr = instruction, ptr
+                ptr = handler(code, invalidate, ptr, instruction.modes, rel_base)
+        finally:
+            self._instr_ptr = ptr
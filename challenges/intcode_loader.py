@@ -0,0 +1,144 @@
+"""Load Intcode programs through a cache of parsed, memory-mapped images."""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final, Optional, Union
+
+from intcode import Intcode
+
+DEFAULT_CACHE_DIR: Final[Path] = Path(__file__).parent.parent / ".cache" / "intcode"
+
+# Header: magic, number of cells in the image, number of overflow entries.
+_MAGIC: Final[bytes] = b"ICPROG01"
+_HEADER: Final[struct.Struct] = struct.Struct("=8sQQ")
+# Overflow entry: address and length of the value's signed little-endian bytes.
+_OVERFLOW: Final[struct.Struct] = struct.Struct("=qQ")
+
+# Programs already mapped by this process, by cache file.
+_loaded: dict[Path, Intcode] = {}
+
+
+class ProgramCacheException(BaseException):
+    pass
+
+
+def parse_program(text: str) -> Intcode:
+    """Parse comma-separated Intcode text."""
+    text = text.strip()
+    if len(text) == 0:
+        return Intcode()
+    return Intcode([int(x) for x in text.split(",")])
+
+
+def program_key(data: bytes) -> str:
+    """Cache key of a program's source text."""
+    return hashlib.sha256(_MAGIC + data).hexdigest()
+
+
+def _write_cache_file(path: Path, program: Intcode) -> None:
+    image = array("q", program._image)
+    chunks = [_HEADER.pack(_MAGIC, len(image), len(program._big)), image.tobytes()]
+    for address, value in sorted(program._big.items()):
+        value_bytes = value.to_bytes(
+            (value.bit_length() + 8) // 8, "little", signed=True
+        )
+        chunks.append(_OVERFLOW.pack(address, len(value_bytes)) + value_bytes)
+    # Write to a temporary file first so other processes never map a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(b"".join(chunks))
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return None
+
+
+def _map_cache_file(path: Path) -> Intcode:
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < _HEADER.size:
+            raise ProgramCacheException(f"Truncated program cache file: {path}")
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, n_cells, n_big = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ProgramCacheException(f"Not a program cache file: {path}")
+    end = _HEADER.size + 8 * n_cells
+    if end > len(buffer):
+        raise ProgramCacheException(f"Truncated program cache file: {path}")
+    program = Intcode()
+    # The image is a read-only view of the file that is shared like the image of
+    # a copy: the first write gives the program its own array.
+    program._image = memoryview(buffer)[_HEADER.size : end].cast("q")
+    program._image_shared = True
+    program._length = n_cells
+    offset = end
+    for _ in range(n_big):
+        if offset + _OVERFLOW.size > len(buffer):
+            raise ProgramCacheException(f"Truncated program cache file: {path}")
+        address, n_bytes = _OVERFLOW.unpack_from(buffer, offset)
+        offset += _OVERFLOW.size
+        if offset + n_bytes > len(buffer):
+            raise ProgramCacheException(f"Truncated program cache file: {path}")
+        value_bytes = buffer[offset : offset + n_bytes]
+        program._big[address] = int.from_bytes(value_bytes, "little", signed=True)
+        offset += n_bytes
+    if offset != len(buffer):
+        raise ProgramCacheException(f"Unexpected data in program cache file: {path}")
+    return program
+
+
+def _mapped_program(path: Path) -> Intcode:
+    if (program := _loaded.get(path)) is None:
+        program = _loaded[path] = _map_cache_file(path)
+    return program
+
+
+@dataclass(frozen=True)
+class CachedProgram:
+    """Handle to a parsed program in the cache.
+
+    The handle is cheap to pickle, so process-pool workers can be given it instead
+    of the program and map the same file read-only with `load()`.
+    """
+
+    path: Path
+
+    def load(self) -> Intcode:
+        """Copy of the program, mapping the cache file on first use."""
+        return _mapped_program(self.path).copy()
+
+
+def cache_program(
+    source: Union[str, Path], cache_dir: Optional[Path] = None
+) -> CachedProgram:
+    """Parse a program file into the cache unless it is already there.
+
+    A cache file that cannot be mapped, such as a truncated one, is replaced.
+    """
+    data = Path(source).read_bytes()
+    path = (DEFAULT_CACHE_DIR if cache_dir is None else cache_dir) / (
+        program_key(data) + ".icp"
+    )
+    if path.exists():
+        try:
+            _mapped_program(path)
+            return CachedProgram(path)
+        except ProgramCacheException:
+            pass
+    _write_cache_file(path, parse_program(data.decode()))
+    return CachedProgram(path)
+
+
+def load_program(source: Union[str, Path], cache_dir: Optional[Path] = None) -> Intcode:
+    """Load a program file, parsing it only if it is not in the cache."""
+    return cache_program(source, cache_dir=cache_dir).load()
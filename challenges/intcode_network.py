@@ -0,0 +1,92 @@
+"""Cooperative scheduler for networks of Intcode computers."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from typing import Optional
+
+from intcode import IntcodeComputer, IntcodeStatus
+
+# Node -> nodes that receive its outputs as inputs.
+Wiring = dict[int, list[int]]
+
+
+@unique
+class IntcodeNetworkStatus(Enum):
+    """Reason an Intcode network stopped running."""
+
+    HALTED = "halted"
+    DEADLOCK = "deadlock"
+
+
+@dataclass
+class IntcodeNetworkResult:
+    status: IntcodeNetworkStatus
+    node_statuses: list[IntcodeStatus]
+    last_outputs: dict[int, int] = field(default_factory=dict)
+    n_runs: int = 0
+
+    def __str__(self) -> str:
+        return f"status: {self.status.value}  runs: {self.n_runs}"
+
+
+class IntcodeNetwork:
+    """Network of Intcode computers whose outputs feed each other's inputs.
+
+    Each computer runs until it blocks. Its outputs are then queued on the computers
+    it is wired to, and only those that were waiting for input are scheduled to run
+    again. The network stops when every computer has halted or when the remaining
+    ones are all waiting for input that will never arrive (deadlock).
+    """
+
+    computers: list[IntcodeComputer]
+    wiring: Wiring
+
+    def __init__(self, computers: list[IntcodeComputer], wiring: Wiring) -> None:
+        for src, dests in wiring.items():
+            for node in [src, *dests]:
+                if not 0 <= node < len(computers):
+                    raise IndexError(f"Unknown node in wiring: {node}")
+        self.computers = computers
+        self.wiring = wiring
+
+    def run(self) -> IntcodeNetworkResult:
+        n_nodes = len(self.computers)
+        statuses: list[Optional[IntcodeStatus]] = [None] * n_nodes
+        last_outputs: dict[int, int] = {}
+        ready = deque(range(n_nodes))
+        scheduled = set(ready)
+        n_runs = 0
+
+        while len(ready) > 0:
+            node = ready.popleft()
+            scheduled.discard(node)
+            res = self.computers[node].run()
+            n_runs += 1
+            statuses[node] = res.status
+            if len(res.outputs) == 0:
+                continue
+
+            last_outputs[node] = res.outputs[-1]
+            for dest in self.wiring.get(node, []):
+                self.computers[dest].inputs.put_many(res.outputs)
+                if (
+                    dest not in scheduled
+                    and statuses[dest] is IntcodeStatus.NEEDS_INPUT
+                ):
+                    ready.append(dest)
+                    scheduled.add(dest)
+
+        node_statuses = [s for s in statuses if s is not None]
+        assert len(node_statuses) == n_nodes
+        if all(s is IntcodeStatus.HALTED for s in node_statuses):
+            status = IntcodeNetworkStatus.HALTED
+        else:
+            status = IntcodeNetworkStatus.DEADLOCK
+        return IntcodeNetworkResult(
+            status=status,
+            node_statuses=node_statuses,
+            last_outputs=last_outputs,
+            n_runs=n_runs,
+        )
@@ -0,0 +1,283 @@
+"""Symbolic execution of Intcode programs."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+from intcode import Instruction, UnknownOperationException
+
+
+class SymbolicExecutionException(BaseException):
+    pass
+
+
+class SymbolicBranchException(SymbolicExecutionException):
+    pass
+
+
+class SymbolicAddressException(SymbolicExecutionException):
+    pass
+
+
+class UnsolvableExpressionException(SymbolicExecutionException):
+    pass
+
+
+# A monomial is a sorted tuple of (symbol, power) pairs; `()` is the constant term.
+Monomial = tuple[tuple[str, int], ...]
+
+
+def _multiply_monomials(a: Monomial, b: Monomial) -> Monomial:
+    powers = dict(a)
+    for symbol, power in b:
+        powers[symbol] = powers.get(symbol, 0) + power
+    return tuple(sorted(powers.items()))
+
+
+def _degree(m: Monomial) -> int:
+    return sum(power for _, power in m)
+
+
+class Polynomial:
+    """Polynomial with integer coefficients over named symbols."""
+
+    terms: dict[Monomial, int]
+
+    def __init__(self, terms: Optional[Mapping[Monomial, int]] = None) -> None:
+        self.terms = {}
+        if terms is not None:
+            self.terms = {m: c for m, c in terms.items() if c != 0}
+
+    @classmethod
+    def constant(cls, value: int) -> Polynomial:
+        return cls({(): value})
+
+    @classmethod
+    def symbol(cls, name: str) -> Polynomial:
+        return cls({((name, 1),): 1})
+
+    @property
+    def is_constant(self) -> bool:
+        return all(m == () for m in self.terms)
+
+    @property
+    def value(self) -> int:
+        """Value of a constant polynomial."""
+        if not self.is_constant:
+            raise ValueError(f"Polynomial is not constant: {self}")
+        return self.terms.get((), 0)
+
+    @property
+    def symbols(self) -> set[str]:
+        return {s for m in self.terms for s, _ in m}
+
+    def degree(self, symbol: str) -> int:
+        return max((dict(m).get(symbol, 0) for m in self.terms), default=0)
+
+    def split(self, symbol: str) -> dict[int, Polynomial]:
+        """Coefficients (polynomials in the other symbols) by power of `symbol`."""
+        parts: dict[int, dict[Monomial, int]] = {}
+        for m, c in self.terms.items():
+            powers = dict(m)
+            power = powers.pop(symbol, 0)
+            parts.setdefault(power, {})[tuple(sorted(powers.items()))] = c
+        return {power: Polynomial(terms) for power, terms in parts.items()}
+
+    def evaluate(self, values: Mapping[str, int]) -> int:
+        total = 0
+        for m, c in self.terms.items():
+            for symbol, power in m:
+                c *= values[symbol] ** power
+            total += c
+        return total
+
+    def __add__(self, other: Polynomial) -> Polynomial:
+        terms = self.terms.copy()
+        for m, c in other.terms.items():
+            terms[m] = terms.get(m, 0) + c
+        return Polynomial(terms)
+
+    def __mul__(self, other: Polynomial) -> Polynomial:
+        terms: dict[Monomial, int] = {}
+        for (m1, c1), (m2, c2) in product(self.terms.items(), other.terms.items()):
+            m = _multiply_monomials(m1, m2)
+            terms[m] = terms.get(m, 0) + c1 * c2
+        return Polynomial(terms)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Polynomial):
+            return self.terms == other.terms
+        return NotImplemented
+
+    def __str__(self) -> str:
+        if len(self.terms) == 0:
+            return "0"
+        parts = []
+        # Highest degree terms first and the constant last.
+        for m, c in sorted(self.terms.items(), key=lambda t: (-_degree(t[0]), t[0])):
+            factors = [s if p == 1 else f"{s}^{p}" for s, p in m]
+            if c != 1 or len(factors) == 0:
+                factors.insert(0, str(c))
+            parts.append("*".join(factors))
+        return " + ".join(parts)
+
+    def __repr__(self) -> str:
+        return f"Polynomial({self})"
+
+
+@dataclass
+class SymbolicRunResult:
+    memory: dict[int, Polynomial]
+    outputs: list[Polynomial] = field(default_factory=list)
+    n_instructions: int = 0
+
+    def value_at(self, address: int) -> Polynomial:
+        return self.memory.get(address, Polynomial())
+
+
+class SymbolicIntcodeComputer:
+    """Run an Intcode program with some memory cells replaced by symbols.
+
+    Arithmetic (opcodes 1 and 2) builds polynomials in the symbols. Reading memory at
+    a symbolic address gives a new opaque symbol (`@[address]`), so such a value can
+    be carried around and overwritten, but an expression that still contains one
+    cannot be solved. Instructions, write addresses, jumps, and comparisons must be
+    concrete; otherwise a `SymbolicExecutionException` is raised.
+
+    Like `IntcodeComputer`, opcode 9 does not move the relative base.
+    """
+
+    memory: dict[int, Polynomial]
+
+    def __init__(self, code: Sequence[int], symbols: Mapping[int, str]) -> None:
+        self.memory = {i: Polynomial.constant(v) for i, v in enumerate(code)}
+        for address, name in symbols.items():
+            self.memory[address] = Polynomial.symbol(name)
+
+    def _cell(self, address: int) -> Polynomial:
+        return self.memory.get(address, Polynomial())
+
+    def _read(self, address: Polynomial) -> Polynomial:
+        if not address.is_constant:
+            return Polynomial.symbol(f"@[{address}]")
+        return self._cell(address.value)
+
+    def _concrete(
+        self,
+        value: Polynomial,
+        exception: type[SymbolicExecutionException] = SymbolicBranchException,
+    ) -> int:
+        if not value.is_constant:
+            raise exception(f"Symbolic value where a concrete one is needed: {value}")
+        return value.value
+
+    def run(
+        self, inputs: Optional[Iterable[int]] = None, max_instructions: int = 1_000_000
+    ) -> SymbolicRunResult:
+        """Run the program until it halts."""
+        input_values = list(inputs) if inputs is not None else []
+        outputs: list[Polynomial] = []
+        ptr = 0
+        for n in range(max_instructions):
+            instruction_value = self._concrete(self._cell(ptr))
+            try:
+                instruction = Instruction(instruction_value)
+            except AssertionError:
+                raise UnknownOperationException(instruction_value)
+            op = instruction.opcode_value
+            if op == 99:
+                return SymbolicRunResult(self.memory, outputs, n)
+            if instruction.layout is None:
+                raise UnknownOperationException(op)
+
+            params = [
+                self._cell(ptr + i + 1) for i in range(instruction.layout.n_params)
+            ]
+            args = [
+                p if m == 1 else self._read(p)
+                for p, m in zip(params, instruction.modes)
+            ]
+            next_ptr = ptr + instruction.layout.n_params + 1
+            result: Optional[Polynomial] = None
+            if op == 1:
+                result = args[0] + args[1]
+            elif op == 2:
+                result = args[0] * args[1]
+            elif op == 3:
+                if len(input_values) == 0:
+                    raise SymbolicExecutionException(
+                        "Program asked for more input than it was given."
+                    )
+                result = Polynomial.constant(input_values.pop(0))
+            elif op == 4:
+                outputs.append(args[0])
+            elif op in (5, 6):
+                if (self._concrete(args[0]) != 0) == (op == 5):
+                    next_ptr = self._concrete(args[1], SymbolicAddressException)
+            elif op == 7:
+                a, b = self._concrete(args[0]), self._concrete(args[1])
+                result = Polynomial.constant(int(a < b))
+            elif op == 8:
+                a, b = self._concrete(args[0]), self._concrete(args[1])
+                result = Polynomial.constant(int(a == b))
+
+            if result is not None:
+                assert instruction.layout.write_param is not None
+                out = params[instruction.layout.write_param]
+                self.memory[self._concrete(out, SymbolicAddressException)] = result
+            ptr = next_ptr
+        raise SymbolicExecutionException(
+            f"Program did not halt within {max_instructions} instructions."
+        )
+
+
+Domain = Union[range, Sequence[int]]
+
+
+def solve_for_target(
+    expression: Polynomial, target: int, domains: Mapping[str, Domain]
+) -> Optional[dict[str, int]]:
+    """Smallest assignment (in the order of `domains`) where `expression == target`.
+
+    Symbols that appear linearly are solved for directly, so only the other symbols
+    are enumerated. Returns `None` if there is no solution in the domains.
+    """
+    unknown = expression.symbols - set(domains)
+    if len(unknown) > 0:
+        raise UnsolvableExpressionException(
+            f"Expression has symbols without a domain: {sorted(unknown)}"
+        )
+    names = list(domains)
+    used = [s for s in names if s in expression.symbols]
+    linear = [s for s in used if expression.degree(s) == 1]
+    solve_for = linear[-1] if len(linear) > 0 else None
+    enumerated = [s for s in used if s != solve_for]
+    parts = expression.split(solve_for) if solve_for is not None else {}
+    slope_expr, offset_expr = parts.get(1, Polynomial()), parts.get(0, Polynomial())
+
+    solutions: list[tuple[int, ...]] = []
+    for values in product(*(domains[s] for s in enumerated)):
+        assignment = {s: min(domains[s]) for s in names}
+        assignment.update(zip(enumerated, values))
+        if solve_for is None:
+            if expression.evaluate(assignment) == target:
+                solutions.append(tuple(assignment[s] for s in names))
+            continue
+        slope = slope_expr.evaluate(assignment)
+        offset = offset_expr.evaluate(assignment)
+        if slope == 0:
+            if offset != target:
+                continue
+        elif (target - offset) % slope != 0:
+            continue
+        else:
+            x = (target - offset) // slope
+            if x not in domains[solve_for]:
+                continue
+            assignment[solve_for] = x
+        solutions.append(tuple(assignment[s] for s in names))
+
+    if len(solutions) == 0:
+        return None
+    return dict(zip(names, min(solutions)))
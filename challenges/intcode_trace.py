@@ -0,0 +1,213 @@
+"""Binary ring-buffer traces of Intcode execution."""
+from __future__ import annotations
+
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final, Iterator, MutableSequence, Optional, Sequence, Union
+
+# Header: magic, capacity in records, number of records ever appended.
+_MAGIC: Final[bytes] = b"ICTRACE1"
+_HEADER: Final[struct.Struct] = struct.Struct("<8sQQ")
+# Record: pointer, opcode, packed modes, flags, number of parameters, three
+# parameters, written address, and written value.
+_RECORD: Final[struct.Struct] = struct.Struct("<qBBBBqqqqq")
+
+_HAS_WRITE: Final[int] = 1
+_TRUNCATED: Final[int] = 2
+_INT64_MIN: Final[int] = -(2**63)
+_INT64_MAX: Final[int] = 2**63 - 1
+
+
+class TraceFormatException(BaseException):
+    pass
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    index: int
+    instruction_pointer: int
+    opcode: int
+    modes: tuple[int, int, int]
+    params: tuple[int, ...]
+    write_address: Optional[int]
+    write_value: Optional[int]
+    truncated: bool = False
+
+    def __str__(self) -> str:
+        s = f"#{self.index} [{self.instruction_pointer}] op: {self.opcode}"
+        s += f"  modes: {self.modes}  params: {self.params}"
+        if self.write_address is not None:
+            s += f"  [{self.write_address}] <- {self.write_value}"
+        return s
+
+
+def _wrap(value: int) -> tuple[int, bool]:
+    if _INT64_MIN <= value <= _INT64_MAX:
+        return value, False
+    return (value - _INT64_MIN) % 2**64 + _INT64_MIN, True
+
+
+class IntcodeTrace:
+    """Fixed-size ring buffer of binary instruction records.
+
+    Only the last `capacity` records are kept. With a `path`, the buffer is a
+    memory-mapped file that can be read back with `IntcodeTrace.open()` after the
+    process is gone; the record count in its header is updated by `flush()`.
+    Values that do not fit in 64 bits are stored wrapped and flagged `truncated`.
+    """
+
+    capacity: int
+    path: Optional[Path]
+    _buffer: Union[bytearray, mmap.mmap]
+    _count: int
+    _writable: bool
+
+    def __init__(
+        self, capacity: int = 1_000_000, path: Union[str, Path, None] = None
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("Trace capacity must be positive.")
+        self.capacity = capacity
+        self.path = None if path is None else Path(path)
+        self._count = 0
+        self._writable = True
+        size = _HEADER.size + capacity * _RECORD.size
+        if self.path is None:
+            self._buffer = bytearray(size)
+        else:
+            with open(self.path, "w+b") as file:
+                file.truncate(size)
+                self._buffer = mmap.mmap(file.fileno(), size)
+        self.flush()
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> IntcodeTrace:
+        """Open a trace file written by a previous run (read-only)."""
+        trace = cls.__new__(cls)
+        trace.path = Path(path)
+        trace._writable = False
+        with open(trace.path, "rb") as file:
+            trace._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, trace.capacity, trace._count = _HEADER.unpack_from(trace._buffer)
+        if magic != _MAGIC:
+            raise TraceFormatException(f"Not an Intcode trace: {path}")
+        return trace
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def n_recorded(self) -> int:
+        """Number of records appended, including ones that were overwritten."""
+        return self._count
+
+    def append(
+        self,
+        instruction_pointer: int,
+        opcode: int,
+        modes: Sequence[int],
+        params: Sequence[int],
+        write_address: Optional[int] = None,
+        write_value: Optional[int] = None,
+    ) -> None:
+        flags, truncated = 0, False
+        p = [0, 0, 0]
+        for i, param in enumerate(params):
+            p[i], t = _wrap(param)
+            truncated |= t
+        address, value = 0, 0
+        if write_address is not None and write_value is not None:
+            flags |= _HAS_WRITE
+            address = write_address
+            value, t = _wrap(write_value)
+            truncated |= t
+        if truncated:
+            flags |= _TRUNCATED
+        offset = _HEADER.size + (self._count % self.capacity) * _RECORD.size
+        _RECORD.pack_into(
+            self._buffer,
+            offset,
+            instruction_pointer,
+            opcode,
+            modes[0] | modes[1] << 2 | modes[2] << 4,
+            flags,
+            len(params),
+            *p,
+            address,
+            value,
+        )
+        self._count += 1
+        return None
+
+    def flush(self) -> None:
+        _HEADER.pack_into(self._buffer, 0, _MAGIC, self.capacity, self._count)
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+        return None
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap) and not self._buffer.closed:
+            if self._writable:
+                self.flush()
+            self._buffer.close()
+        return None
+
+    def _record(self, index: int) -> TraceRecord:
+        offset = _HEADER.size + (index % self.capacity) * _RECORD.size
+        ptr, op, modes, flags, n_params, *params, address, value = _RECORD.unpack_from(
+            self._buffer, offset
+        )
+        has_write = bool(flags & _HAS_WRITE)
+        return TraceRecord(
+            index=index,
+            instruction_pointer=ptr,
+            opcode=op,
+            modes=(modes & 3, modes >> 2 & 3, modes >> 4 & 3),
+            params=tuple(params[:n_params]),
+            write_address=address if has_write else None,
+            write_value=value if has_write else None,
+            truncated=bool(flags & _TRUNCATED),
+        )
+
+    def records(self) -> Iterator[TraceRecord]:
+        """Records from the oldest kept to the newest."""
+        for index in range(self._count - len(self), self._count):
+            yield self._record(index)
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        return self.records()
+
+    def last(self, n: int) -> list[TraceRecord]:
+        start = max(self._count - min(n, len(self)), 0)
+        return [self._record(i) for i in range(start, self._count)]
+
+    def filter(
+        self,
+        opcode: Optional[int] = None,
+        instruction_pointer: Optional[int] = None,
+        address: Optional[int] = None,
+    ) -> Iterator[TraceRecord]:
+        """Records matching all of the given opcode, pointer, and written address."""
+        for record in self.records():
+            if opcode is not None and record.opcode != opcode:
+                continue
+            if (
+                instruction_pointer is not None
+                and record.instruction_pointer != instruction_pointer
+            ):
+                continue
+            if address is not None and record.write_address != address:
+                continue
+            yield record
+
+    def replay(self, memory: MutableSequence[int]) -> None:
+        """Apply the recorded writes in order to `memory`.
+
+        `memory` must be in the state it was in before the oldest kept record.
+        """
+        for record in self.records():
+            if record.write_address is not None and record.write_value is not None:
+                memory[record.write_address] = record.write_value
+        return None
@@ -0,0 +1,165 @@
+"""Orbit maps as arrays of parents with depths from one breadth-first search."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Final, Iterable, Optional
+
+import numpy as np
+
+CENTER_OF_MASS: Final[str] = "COM"
+
+INDEX_DTYPE: Final = np.int64
+
+
+class OrbitMapException(BaseException):
+    pass
+
+
+class UnknownBodyException(BaseException):
+    pass
+
+
+def parse_orbits(lines: Iterable[str]) -> list[tuple[str, str]]:
+    """Parse "A)B" lines into (center, orbiter) pairs, skipping blank lines."""
+    orbits: list[tuple[str, str]] = []
+    for line in lines:
+        if len(line := line.strip()) == 0:
+            continue
+        center, sep, orbiter = line.partition(")")
+        if sep != ")":
+            raise OrbitMapException(f"Not an orbit: {line!r}")
+        orbits.append((center, orbiter))
+    return orbits
+
+
+class OrbitGraph:
+    """Bodies indexed by integers, each with the index of the body it orbits.
+
+    The depth of every body, its number of direct and indirect orbits, is found in
+    a single iterative breadth-first search from the center of mass the first time
+    it is needed, and kept for later queries.
+    """
+
+    names: list[str]
+    index: dict[str, int]
+    parents: np.ndarray
+    root: int
+    _depths: Optional[np.ndarray]
+
+    def __init__(
+        self, orbits: Iterable[tuple[str, str]], root: str = CENTER_OF_MASS
+    ) -> None:
+        self.names, self.index = [], {}
+        centers: list[int] = []
+        orbiters: list[int] = []
+        for center, orbiter in orbits:
+            centers.append(self._intern(center))
+            orbiters.append(self._intern(orbiter))
+        if root not in self.index:
+            raise UnknownBodyException(root)
+        self.root = self.index[root]
+        self.parents = np.full(len(self.names), -1, dtype=INDEX_DTYPE)
+        orbiter_ids = np.asarray(orbiters, dtype=INDEX_DTYPE)
+        if len(np.unique(orbiter_ids)) != len(orbiter_ids):
+            counts = np.bincount(orbiter_ids)
+            body = self.names[int(np.argmax(counts))]
+            raise OrbitMapException(f"{body} orbits more than one body.")
+        self.parents[orbiter_ids] = centers
+        if self.parents[self.root] >= 0:
+            raise OrbitMapException(f"The center of mass {root} orbits another body.")
+        self._depths = None
+
+    def _intern(self, name: str) -> int:
+        if (i := self.index.get(name)) is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], root: str = CENTER_OF_MASS) -> OrbitGraph:
+        return cls(parse_orbits(lines), root=root)
+
+    @classmethod
+    def from_file(cls, path: Path, root: str = CENTER_OF_MASS) -> OrbitGraph:
+        with open(path, "r") as file:
+            return cls.from_lines(file, root=root)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    def body(self, name: str) -> int:
+        if (i := self.index.get(name)) is None:
+            raise UnknownBodyException(name)
+        return i
+
+    # ---- Depths ----
+
+    @property
+    def depths(self) -> np.ndarray:
+        """Depth of every body below the root, by index."""
+        if self._depths is None:
+            self._depths = self._search_depths()
+        return self._depths
+
+    def _search_depths(self) -> np.ndarray:
+        # Children of each body, in a flat array grouped by parent.
+        n = len(self.names)
+        has_parent = self.parents >= 0
+        bodies = np.flatnonzero(has_parent)
+        order = np.argsort(self.parents[bodies], kind="stable")
+        children = bodies[order]
+        offsets = np.zeros(n + 1, dtype=INDEX_DTYPE)
+        np.cumsum(np.bincount(self.parents[bodies], minlength=n), out=offsets[1:])
+        # The queue grows while it is read, so the search needs no recursion and
+        # costs the same however deep the map is.
+        child_list, offset_list = children.tolist(), offsets.tolist()
+        depth_list = [-1] * n
+        depth_list[self.root] = 0
+        queue = [self.root]
+        for body in queue:
+            depth = depth_list[body] + 1
+            for child in child_list[offset_list[body] : offset_list[body + 1]]:
+                depth_list[child] = depth
+                queue.append(child)
+        depths = np.array(depth_list, dtype=INDEX_DTYPE)
+        if (depths < 0).any():
+            unreached = self.names[int(np.argmax(depths < 0))]
+            raise OrbitMapException(f"{unreached} does not orbit the center of mass.")
+        return depths
+
+    def depth(self, name: str) -> int:
+        return int(self.depths[self.body(name)])
+
+    def total_orbits(self) -> int:
+        """Number of direct and indirect orbits of all bodies."""
+        return int(self.depths.sum())
+
+    def clear_cache(self) -> None:
+        self._depths = None
+        return None
+
+    # ---- Paths ----
+
+    def common_center(self, a: str, b: str) -> str:
+        """The deepest body that both bodies orbit, directly or indirectly."""
+        i, j = self.body(a), self.body(b)
+        depths = self.depths
+        while depths[i] > depths[j]:
+            i = int(self.parents[i])
+        while depths[j] > depths[i]:
+            j = int(self.parents[j])
+        while i != j:
+            i, j = int(self.parents[i]), int(self.parents[j])
+        return self.names[i]
+
+    def transfers(self, a: str, b: str) -> int:
+        """Orbital transfers to move from the body `a` orbits to the one `b` orbits."""
+        for name in (a, b):
+            if self.parents[self.body(name)] < 0:
+                raise OrbitMapException(f"{name} does not orbit anything.")
+        center = self.depth(self.common_center(a, b))
+        return self.depth(a) + self.depth(b) - 2 * center - 2
@@ -0,0 +1,223 @@
+"""Declarative password rules compiled into single-pass validators."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from itertools import combinations_with_replacement
+from typing import Final, Iterable, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+DIGIT_DTYPE: Final = np.int8
+
+
+# ---- Rules ----
+
+
+@dataclass(frozen=True)
+class NonDecreasing:
+    """Digits never decrease from left to right."""
+
+
+@dataclass(frozen=True)
+class ForbiddenDigits:
+    digits: frozenset[int]
+
+
+@unique
+class Quantifier(Enum):
+    ANY = "any"
+    ALL = "all"
+
+
+@dataclass(frozen=True)
+class RunLength:
+    """Any or all runs of equal digits have a length in [min_length, max_length]."""
+
+    quantifier: Quantifier
+    min_length: int = 1
+    max_length: Optional[int] = None
+
+    def accepts(self, run: int) -> bool:
+        return self.min_length <= run and (
+            self.max_length is None or run <= self.max_length
+        )
+
+
+Rule = Union[NonDecreasing, ForbiddenDigits, RunLength]
+
+
+def run_of_exactly(k: int) -> RunLength:
+    return RunLength(Quantifier.ANY, k, k)
+
+
+def run_of_at_least(k: int) -> RunLength:
+    return RunLength(Quantifier.ANY, k)
+
+
+def runs_of_at_most(k: int) -> RunLength:
+    return RunLength(Quantifier.ALL, 1, k)
+
+
+def forbidden_digits(digits: Iterable[int]) -> ForbiddenDigits:
+    return ForbiddenDigits(frozenset(digits))
+
+
+class UnknownRuleException(BaseException):
+    pass
+
+
+# ---- Validators ----
+
+
+@dataclass
+class PasswordValidator:
+    """A set of rules compiled into one pass over the digits.
+
+    Call it on the digits of one password, or use `mask()` on a matrix with one
+    candidate per row to check a batch with NumPy, one column at a time.
+    """
+
+    rules: Sequence[Rule]
+    non_decreasing: bool = field(init=False)
+    forbidden: np.ndarray = field(init=False, repr=False)
+    any_runs: list[RunLength] = field(init=False, repr=False)
+    all_runs: list[RunLength] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.non_decreasing = False
+        self.forbidden = np.zeros(10, dtype=bool)
+        self.any_runs, self.all_runs = [], []
+        for rule in self.rules:
+            if isinstance(rule, NonDecreasing):
+                self.non_decreasing = True
+            elif isinstance(rule, ForbiddenDigits):
+                self.forbidden[list(rule.digits)] = True
+            elif isinstance(rule, RunLength):
+                if rule.quantifier is Quantifier.ANY:
+                    self.any_runs.append(rule)
+                else:
+                    self.all_runs.append(rule)
+            else:
+                raise UnknownRuleException(rule)
+        return None
+
+    def __call__(self, digits: Sequence[int]) -> bool:
+        found = [False] * len(self.any_runs)
+        prev, run = -1, 0
+        for d in [*digits, -1]:
+            if d >= 0:
+                if self.forbidden[d] or (self.non_decreasing and d < prev):
+                    return False
+                if d == prev:
+                    run += 1
+                    continue
+            # A run has just ended.
+            if run > 0:
+                if not all(r.accepts(run) for r in self.all_runs):
+                    return False
+                for i, r in enumerate(self.any_runs):
+                    found[i] = found[i] or r.accepts(run)
+            prev, run = d, 1
+        return all(found)
+
+    def check(self, x: int) -> bool:
+        return self([int(c) for c in str(x)])
+
+    def mask(self, digits: np.ndarray) -> np.ndarray:
+        """Which rows of a digit matrix pass every rule."""
+        n_rows, n_digits = digits.shape
+        ok = np.ones(n_rows, dtype=bool)
+        if self.forbidden.any():
+            ok &= ~self.forbidden[digits].any(axis=1)
+        if self.non_decreasing and n_digits > 1:
+            ok &= (digits[:, 1:] >= digits[:, :-1]).all(axis=1)
+        if not self.any_runs and not self.all_runs:
+            return ok
+        found = np.zeros((len(self.any_runs), n_rows), dtype=bool)
+        run = np.ones(n_rows, dtype=np.int32)
+        for j in range(n_digits):
+            if j < n_digits - 1:
+                ends = digits[:, j] != digits[:, j + 1]
+            else:
+                ends = np.ones(n_rows, dtype=bool)
+            for i, r in enumerate(self.any_runs):
+                found[i] |= ends & _accepts(r, run)
+            for r in self.all_runs:
+                ok &= ~ends | _accepts(r, run)
+            run = np.where(ends, 1, run + 1)
+        return ok & found.all(axis=0)
+
+
+def _accepts(rule: RunLength, run: np.ndarray) -> np.ndarray:
+    accepted = run >= rule.min_length
+    if rule.max_length is not None:
+        accepted &= run <= rule.max_length
+    return accepted
+
+
+# ---- Counting over ranges ----
+
+
+def digit_matrix(numbers: np.ndarray, n_digits: int) -> np.ndarray:
+    """The last `n_digits` digits of each number, one number per row."""
+    powers = 10 ** np.arange(n_digits - 1, -1, -1, dtype=np.int64)
+    return (numbers[:, None] // powers % 10).astype(DIGIT_DTYPE)
+
+
+def non_decreasing_matrix(n_digits: int) -> np.ndarray:
+    """Non-decreasing digits of every `n_digits`-digit number, in increasing order."""
+    # Only a single digit can be 0 without being a leading 0.
+    combos = combinations_with_replacement(range(int(n_digits > 1), 10), n_digits)
+    flat = np.fromiter((d for c in combos for d in c), dtype=DIGIT_DTYPE)
+    return flat.reshape(-1, n_digits)
+
+
+def _from_digits(digits: np.ndarray) -> np.ndarray:
+    powers = 10 ** np.arange(digits.shape[1] - 1, -1, -1, dtype=np.int64)
+    return digits.astype(np.int64) @ powers
+
+
+def candidate_batches(
+    low: int, high: int, non_decreasing: bool = False, batch_size: int = 1 << 18
+) -> Iterator[np.ndarray]:
+    """Digit matrices of the numbers in [low, high), by number of digits.
+
+    With `non_decreasing`, only numbers with non-decreasing digits are produced.
+    """
+    for n_digits in range(len(str(low)), len(str(max(high - 1, low))) + 1):
+        lo = max(low, 10 ** (n_digits - 1) if n_digits > 1 else 0)
+        hi = min(high, 10**n_digits)
+        if lo >= hi:
+            continue
+        if non_decreasing:
+            candidates = non_decreasing_matrix(n_digits)
+            values = _from_digits(candidates)
+            keep = (values >= lo) & (values < hi)
+            for start in range(0, len(candidates), batch_size):
+                batch = candidates[start : start + batch_size]
+                yield batch[keep[start : start + batch_size]]
+            continue
+        for start in range(lo, hi, batch_size):
+            numbers = np.arange(start, min(start + batch_size, hi), dtype=np.int64)
+            yield digit_matrix(numbers, n_digits)
+
+
+def count_matching(
+    validators: Sequence[PasswordValidator],
+    low: int,
+    high: int,
+    batch_size: int = 1 << 18,
+) -> list[int]:
+    """Count the passwords in [low, high) of several rule sets in one sweep.
+
+    Each batch of candidates is built once and checked by every validator. If all
+    of them require non-decreasing digits, only those candidates are built.
+    """
+    non_decreasing = len(validators) > 0 and all(v.non_decreasing for v in validators)
+    counts = [0] * len(validators)
+    for batch in candidate_batches(low, high, non_decreasing, batch_size):
+        for i, validator in enumerate(validators):
+            counts[i] += int(validator.mask(batch).sum())
+    return counts
@@ -0,0 +1,48 @@
+"""Test the challenge runner."""
+
+import importlib
+import sys
+
+import pytest
+from aoc import UnknownChallengeException, available_days, solve_day, solve_days
+
+
+def test_challenges_import_without_side_effects(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for day in available_days():
+        # The modules other tests already imported are put back afterwards.
+        monkeypatch.delitem(sys.modules, f"challenge_{day:02d}", raising=False)
+        importlib.import_module(f"challenge_{day:02d}")
+    assert capsys.readouterr().out == ""
+
+
+def test_solve_day() -> None:
+    solutions = solve_day(1)
+    assert [(s.day, s.part) for s in solutions] == [(1, 1), (1, 2)]
+    assert [s.answer for s in solutions] == [3515171, 5269882]
+    assert all(s.seconds >= 0 for s in solutions)
+
+
+def test_day_2_solvers_do_not_print(capsys: pytest.CaptureFixture[str]) -> None:
+    solutions = solve_day(2, quiet=False)
+    assert [s.answer for s in solutions] == [8017076, 3146]
+    assert capsys.readouterr().out == ""
+
+
+def test_solve_days_skips_missing_parts() -> None:
+    solutions = solve_days([9, 2], parts=(2,))
+    assert [(s.day, s.part, s.answer) for s in solutions] == [(2, 2, 3146)]
+
+
+def test_solve_days_in_parallel_keeps_order() -> None:
+    serial = solve_days([2, 1])
+    parallel = solve_days([2, 1], parallel=True, max_workers=2)
+    assert [(s.day, s.part, s.answer) for s in parallel] == [
+        (s.day, s.part, s.answer) for s in serial
+    ]
+
+
+def test_unknown_day() -> None:
+    with pytest.raises(UnknownChallengeException):
+        solve_day(31)
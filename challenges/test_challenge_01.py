@@ -0,0 +1,55 @@
+"""Test the vectorized fuel calculations of day 1."""
+
+from pathlib import Path
+
+import numpy as np
+from challenge_01 import (
+    FuelLookup,
+    fuel_required,
+    fuel_required_array,
+    read_mass_chunks,
+    read_module_masses,
+    total_fuel_array,
+    total_fuel_for_module,
+)
+
+
+def test_arrays_match_scalar_functions() -> None:
+    rng = np.random.default_rng(1)
+    masses = np.concatenate([np.arange(0, 50), rng.integers(0, 10**12, size=1000)])
+    fuel = fuel_required_array(masses)
+    total = total_fuel_array(masses)
+    assert fuel.dtype == np.int64 and total.dtype == np.int64
+    assert fuel.tolist() == [fuel_required(int(m)) for m in masses]
+    assert total.tolist() == [total_fuel_for_module(int(m)) for m in masses]
+
+
+def test_mass_chunks_match_whole_file(tmp_path: Path) -> None:
+    path = tmp_path / "masses.txt"
+    masses = list(range(1, 2000, 7))
+    # No newline after the last mass.
+    path.write_text("\n".join(str(m) for m in masses))
+    chunks = list(read_mass_chunks(path, chunk_bytes=64))
+    assert len(chunks) > 1
+    assert np.concatenate(chunks).tolist() == masses == read_module_masses(path)
+
+
+def test_fuel_lookup_matches_total_fuel() -> None:
+    lookup = FuelLookup(table_size=100, cache_size=10)
+    rng = np.random.default_rng(2)
+    masses = [-20, -1, 0, 8, 9, 99, 100, 101, 300, *rng.integers(0, 10**9, 200)]
+    expected = [total_fuel_for_module(int(m)) for m in masses]
+    assert [lookup(int(m)) for m in masses] == expected
+    assert lookup.total_fuel_array(np.array(masses)).tolist() == expected
+
+
+def test_fuel_lookup_stats() -> None:
+    lookup = FuelLookup(table_size=1000, cache_size=2)
+    for mass in [5, 999, 10**6, 10**6, 2 * 10**6, 3 * 10**6, 10**6]:
+        lookup(mass)
+    stats = lookup.stats
+    assert (stats.table_hits, stats.cache_hits, stats.misses) == (2, 1, 4)
+    assert stats.evictions == 2 and stats.hit_rate == 3 / 7
+    # Fuel steps until the chain drops below 1000: 7 for 10**6 and 2 * 10**6, 8
+    # for 3 * 10**6.
+    assert stats.chain_steps == 7 + 7 + 8 + 7
@@ -0,0 +1,109 @@
+"""Test the segment-based wire crossings of day 3."""
+
+import random
+from itertools import combinations
+
+import pytest
+from challenge_03 import (
+    TEST_INPUTS,
+    NoWireCrossingException,
+    TooManyWiresFoundInInputException,
+    WireBoard,
+    Wires,
+    find_closest_and_shortest_crossings,
+    find_wire_crossings,
+    parse_input_to_two_wires,
+    parse_input_to_wires,
+    trace_wire,
+    wire_segments,
+)
+
+
+def _brute_force(wires: Wires, a: int = 0, b: int = 1) -> tuple[int, int]:
+    trace1, trace2 = trace_wire(wires[a]), trace_wire(wires[b])
+    crosses = set(trace1).intersection(trace2) - {(0, 0)}
+    distance = min(abs(a) + abs(b) for a, b in crosses)
+    steps = min(trace1.index(c) + trace2.index(c) for c in crosses)
+    return distance, steps
+
+
+def _random_wire(rng: random.Random, n_moves: int) -> list[str]:
+    return [f"{rng.choice('LRUD')}{rng.randint(0, 6)}" for _ in range(n_moves)]
+
+
+def test_examples() -> None:
+    for text, closest_distance, shortest_steps in TEST_INPUTS:
+        closest, shortest = find_closest_and_shortest_crossings(
+            parse_input_to_two_wires(text)
+        )
+        assert closest.distance == closest_distance
+        assert shortest.steps == shortest_steps
+
+
+def test_wire_segments() -> None:
+    segments = wire_segments(["R8", "U5", "L0", "L5", "D3"])
+    assert [(s.start, s.end, s.steps) for s in segments] == [
+        ((0, 0), (0, 8), 0),
+        ((0, 8), (5, 8), 8),
+        ((5, 8), (5, 3), 13),
+        ((5, 3), (2, 3), 18),
+    ]
+    assert [s.axis for s in segments] == [1, 0, 1, 0]
+    assert segments[2].steps_to((5, 6)) == 15
+
+
+def test_collinear_overlap() -> None:
+    wires = Wires([["U3", "R10"], ["R2", "U3", "R5", "L9"]])
+    assert find_wire_crossings(wires)[(3, 0)] == 3 + 17
+    assert _brute_force(wires) == (3, 5 + 5)
+    closest, shortest = find_closest_and_shortest_crossings(wires)
+    assert (closest.distance, shortest.steps) == (3, 10)
+
+
+def test_matches_brute_force_on_random_wires() -> None:
+    rng = random.Random(3)
+    for _ in range(300):
+        wires = Wires([_random_wire(rng, 12), _random_wire(rng, 12)])
+        trace1, trace2 = trace_wire(wires[0]), trace_wire(wires[1])
+        expected = set(trace1).intersection(trace2) - {(0, 0)}
+        crossings = find_wire_crossings(wires)
+        assert set(crossings) <= expected
+        if len(expected) == 0:
+            with pytest.raises(NoWireCrossingException):
+                find_closest_and_shortest_crossings(wires)
+            continue
+        closest, shortest = find_closest_and_shortest_crossings(wires)
+        assert (closest.distance, shortest.steps) == _brute_force(wires)
+
+
+def test_parse_many_wires() -> None:
+    text = "R8,U5\nU7,R6\n\nL2,D1\n"
+    wires = parse_input_to_wires(text)
+    assert len(wires) == 3 and wires[2] == ["L2", "D1"]
+    with pytest.raises(TooManyWiresFoundInInputException):
+        parse_input_to_two_wires(text)
+
+
+def test_board_queries_match_brute_force() -> None:
+    rng = random.Random(20)
+    for _ in range(30):
+        wires = Wires([_random_wire(rng, 10) for _ in range(4)])
+        boards = [WireBoard(wires, cell_size=size) for size in (None, 1, 3, 50)]
+        expected = {}
+        for a, b in combinations(range(4), 2):
+            trace_a, trace_b = trace_wire(wires[a]), trace_wire(wires[b])
+            if set(trace_a).intersection(trace_b) - {(0, 0)}:
+                expected[(a, b)] = _brute_force(wires, a, b)
+                for board in boards:
+                    closest, shortest = board.closest((b, a)), board.shortest((a, b))
+                    assert (closest.distance, shortest.steps) == expected[(a, b)]
+                    assert closest.wires == shortest.wires == (a, b)
+        all_crossings = WireBoard(wires).all_crossings()
+        for board in boards:
+            for (a, b), crossings in all_crossings.items():
+                assert board.crossings(a, b) == crossings
+        if len(expected) == 0:
+            continue
+        for board in boards:
+            assert board.closest().distance == min(d for d, _ in expected.values())
+            assert board.shortest().steps == min(s for _, s in expected.values())
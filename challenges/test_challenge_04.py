@@ -0,0 +1,64 @@
+"""Test the day 4 password counters."""
+
+import random
+
+from challenge_04 import (
+    at_least_two,
+    count_passwords,
+    count_passwords_fast,
+    exactly_two,
+    is_password,
+    non_decreasing_passwords,
+    run_lengths,
+    to_digits,
+    two_adjacent_values_p1,
+    two_adjacent_values_p2,
+)
+
+
+def test_run_lengths() -> None:
+    assert run_lengths((1, 1, 2, 3, 3, 3)) == [2, 1, 3]
+    assert run_lengths(()) == []
+
+
+def test_counters_match_scan() -> None:
+    for low, high in [(0, 100_000), (156218, 200_000), (111, 112), (5, 5)]:
+        for run_rule, string_rule in [
+            (at_least_two, two_adjacent_values_p1),
+            (exactly_two, two_adjacent_values_p2),
+        ]:
+            expected = [
+                x
+                for x in range(low, high)
+                if all(a <= b for a, b in zip(str(x), str(x)[1:]))
+                and string_rule(str(x))
+            ]
+            assert count_passwords(low, high, string_rule) == len(expected)
+            assert list(non_decreasing_passwords(low, high, run_rule)) == expected
+            assert count_passwords_fast(low, high, run_rule) == len(expected)
+
+
+def test_fast_counter_on_random_bounds() -> None:
+    rng = random.Random(4)
+    for _ in range(25):
+        low = rng.randint(0, 10**8)
+        high = low + rng.randint(0, 10 ** rng.randint(1, 7))
+        for run_rule in (at_least_two, exactly_two, lambda r: r >= 3):
+            assert count_passwords_fast(low, high, run_rule) == sum(
+                1 for _ in non_decreasing_passwords(low, high, run_rule)
+            )
+
+
+def test_fast_counter_rules_true_for_empty_run() -> None:
+    # Rules that hold for a run of length 0 must not count the empty prefix.
+    rules = [lambda r: r % 2 == 0, lambda r: r <= 1, lambda r: r != 2, at_least_two]
+    for low, high in [(0, 10_000), (100, 1000), (111111, 130000)]:
+        for run_rule in rules:
+            expected = sum(
+                is_password(to_digits(x), run_rule) for x in range(low, high)
+            )
+            assert count_passwords_fast(low, high, run_rule) == expected
+            assert sum(1 for _ in non_decreasing_passwords(low, high, run_rule)) == (
+                expected
+            )
+    assert count_passwords_fast(111111, 999999, lambda r: r % 2 == 0) == 2306
@@ -0,0 +1,23 @@
+"""Test the day 5 diagnostics runner."""
+
+import pytest
+from challenge_05 import read_puzzle_input, run_intcode_diagnostics
+from intcode import (
+    FailedThermalEnvironmentSupervisionTerminalDiagnostic,
+    Intcode,
+    IntcodeInput,
+)
+
+
+@pytest.mark.parametrize("trace", [False, True])
+def test_diagnostics_with_and_without_trace(trace: bool) -> None:
+    code = read_puzzle_input()
+    assert run_intcode_diagnostics(code, IntcodeInput([5]), trace=trace) == 3188550
+
+
+def test_failed_diagnostic_prints_trace(capsys: pytest.CaptureFixture[str]) -> None:
+    # Outputs a failed test (1) before the diagnostic code.
+    code = Intcode([104, 1, 104, 0, 99])
+    with pytest.raises(FailedThermalEnvironmentSupervisionTerminalDiagnostic):
+        run_intcode_diagnostics(code, IntcodeInput([]), trace=True)
+    assert "last 3 of 3 instructions" in capsys.readouterr().out
@@ -0,0 +1,87 @@
+"""Test the day 7 phase sequence searches."""
+
+from itertools import permutations
+
+import pytest
+from challenge_07 import (
+    AmplifierMethod,
+    _next_permutation,
+    _nth_permutation,
+    find_fastest_phase_sequence,
+    find_fastest_phase_sequence_parallel,
+    run_amplifier_feedback_loop,
+    run_amplifier_series,
+)
+from intcode import Intcode
+
+SERIES_PROGRAM = Intcode(
+    [3, 15, 3, 16, 1002, 16, 10, 16, 1, 16, 15, 15, 4, 15, 99, 0, 0]
+)
+# Outputs the input signal plus 1 for any phase, so every sequence ties.
+TIED_PROGRAM = Intcode([3, 11, 3, 12, 1001, 12, 1, 12, 4, 12, 99, 0, 0])
+FEEDBACK_PROGRAM = Intcode(
+    [
+        *(3, 26, 1001, 26, -4, 26, 3, 27, 1002, 27, 2, 27, 1, 27, 26),
+        *(27, 4, 27, 1001, 28, -1, 28, 1005, 28, 6, 99, 0, 0, 5),
+    ]
+)
+
+
+@pytest.mark.parametrize("n_items", [1, 3, 5])
+def test_permutation_order(n_items: int) -> None:
+    expected = [list(p) for p in permutations(range(n_items))]
+    assert [_nth_permutation(n_items, n) for n in range(len(expected))] == expected
+    indices = _nth_permutation(n_items, 0)
+    stepped = []
+    for _ in expected:
+        stepped.append(indices.copy())
+        _next_permutation(indices)
+    assert stepped == expected
+
+
+@pytest.mark.parametrize(
+    "program, amp_method, amp_phases",
+    [
+        (SERIES_PROGRAM, run_amplifier_series, list(range(5))),
+        (TIED_PROGRAM, run_amplifier_series, [3, 1, 4, 0, 2]),
+        (FEEDBACK_PROGRAM, run_amplifier_feedback_loop, list(range(5, 10))),
+    ],
+)
+@pytest.mark.parametrize("min_permutations", [0, 1000])
+def test_parallel_matches_serial(
+    program: Intcode,
+    amp_method: AmplifierMethod,
+    amp_phases: list[int],
+    min_permutations: int,
+) -> None:
+    expected = find_fastest_phase_sequence(program, amp_method, amp_phases)
+    result = find_fastest_phase_sequence_parallel(
+        program,
+        amp_method,
+        amp_phases,
+        max_workers=2,
+        min_permutations=min_permutations,
+    )
+    assert (list(result[0]), result[1]) == expected
+
+
+@pytest.mark.parametrize("min_permutations", [0, 1000])
+def test_parallel_stops_at_thrust(min_permutations: int) -> None:
+    # The search ends at the first sequence that reaches the thrust, not the best.
+    stop_at = 30000
+    thrusts = [
+        (list(p), run_amplifier_series(SERIES_PROGRAM, p))
+        for p in permutations(range(5))
+    ]
+    expected = next(t for t in thrusts if t[1] >= stop_at)
+    assert expected[1] < max(thrust for _, thrust in thrusts)
+    phases, thrust = find_fastest_phase_sequence_parallel(
+        SERIES_PROGRAM,
+        run_amplifier_series,
+        list(range(5)),
+        max_workers=2,
+        chunksize=7,
+        stop_at=stop_at,
+        min_permutations=min_permutations,
+    )
+    assert (list(phases), thrust) == expected
@@ -1,7 +1,13 @@
 """Test Intcode computer."""
 
+import json
+from pathlib import Path
+
 import intcode
-from intcode import Intcode, IntcodeInput
+import pytest
+from intcode import Intcode, IntcodeComputer, IntcodeEngine, IntcodeInput
+
+DATA_DIR = Path(__file__).parent.parent / "data"
 
 
 def test_opcode1() -> None:
@@ -24,6 +30,27 @@ def test_opcode9() -> None:
     assert res.relative_base == 10
 
 
+# ---- IntcodeInput ----
+
+
+def test_intcode_input_queue() -> None:
+    inputs = IntcodeInput([1, 2])
+    inputs.put(3)
+    inputs.put_many(range(4, 7))
+    assert len(inputs) == 6
+    assert inputs._values == [1, 2, 3, 4, 5, 6]
+    assert [inputs.get() for _ in range(6)] == [1, 2, 3, 4, 5, 6]
+    assert len(inputs) == 0
+
+
+def test_intcode_input_try_get_empty() -> None:
+    inputs = IntcodeInput([7])
+    assert inputs.try_get() == 7
+    assert inputs.try_get() is None
+    with pytest.raises(IndexError):
+        inputs.get()
+
+
 # ---- Intcode ----
 
 
@@ -57,3 +84,237 @@ def test_set_item_beyond_intcode() -> None:
     code[100] = -3
     assert code[100] == -3
     assert len(code) == 101
+
+
+def test_read_beyond_does_not_allocate() -> None:
+    code = Intcode([9, 5, 1, 8, 11, 29])
+    assert code[100000] == 0
+    assert len(code) == 100001
+    assert code._pages == {}
+
+
+def test_write_far_allocates_one_page() -> None:
+    code = Intcode([9, 5, 1, 8, 11, 29])
+    code[1_000_000] = 4
+    code[1_000_001] = 5
+    assert code[1_000_000] == 4 and code[1_000_001] == 5
+    assert len(code._pages) == 1
+
+
+def test_values_beyond_64_bits() -> None:
+    big = 1125899906842624 * 2**20
+    code = Intcode([104, big, 99])
+    assert code[1] == big
+    code[2000] = -big
+    assert code[2000] == -big
+    code[1] = 3
+    assert code == [104, 3, 99] + [0] * 1997 + [-big]
+    assert list(code._big) == [2000]
+
+
+def test_copy_intcode_is_independent() -> None:
+    code = Intcode([9, 5, 1, 8, 11, 29])
+    code[5000] = 1
+    new_code = code.copy()
+    new_code[0] = -1
+    new_code[5000] = -1
+    assert code[0] == 9 and code[5000] == 1
+    assert new_code[0] == -1 and new_code[5000] == -1
+
+
+def test_copy_intcode_shares_pages_until_written() -> None:
+    code = Intcode([9, 5, 1, 8, 11, 29])
+    code[5000] = 1
+    code[9000] = 2
+    new_code = code.copy()
+    assert new_code._image is code._image
+    new_code[9000] = 3
+    assert new_code._image is code._image
+    assert new_code._pages[5000 >> 10] is code._pages[5000 >> 10]
+    assert new_code._pages[9000 >> 10] is not code._pages[9000 >> 10]
+    assert code[9000] == 2
+
+
+# ---- IntcodeComputer ----
+
+
+def test_decode_cache_is_reused() -> None:
+    comp = IntcodeComputer(Intcode([1101, 1, 2, 5, 99, 0]))
+    comp()
+    assert set(comp._decode_cache) == {0, 4}
+    assert comp.code[5] == 3
+
+
+def test_decode_cache_invalidated_by_write() -> None:
+    # The second pass rewrites the instruction at address 0 from `104` to `4`.
+    comp = IntcodeComputer(Intcode([104, 6, 1101, 4, 0, 0, 1105, 1, 0]))
+    res = comp()
+    assert res.output == 6
+    comp.set_instruction_pointer(2)
+    res = comp()
+    assert res.output == 1105
+
+
+def _read_program(day: str) -> Intcode:
+    with open(DATA_DIR / day / "input.txt", "r") as file:
+        return Intcode([int(x) for x in file.read().strip().split(",")])
+
+
+def _run_to_halt(comp: IntcodeComputer, inputs: IntcodeInput) -> list[int]:
+    outputs: list[int] = []
+    while True:
+        res = comp(inputs=inputs)
+        if res.instruction.opcode_value == 99:
+            return outputs
+        assert res.output is not None and res.opcode is not None
+        outputs.append(res.output)
+        comp.set_instruction_pointer(res.instruction_pointer + res.opcode.n_params + 1)
+
+
+def _strip_trailing_zeros(code: Intcode) -> list[int]:
+    values = list(code)
+    while values and values[-1] == 0:
+        values.pop()
+    return values
+
+
+@pytest.mark.parametrize(
+    "day, inputs",
+    [
+        ("02", []),
+        ("05", [1]),
+        ("05", [5]),
+        ("07", [0, 0]),
+        ("07", [4, 17]),
+        ("09", [1]),
+    ],
+)
+def test_engine_parity(day: str, inputs: list[int]) -> None:
+    program = _read_program(day)
+    results = []
+    for engine in IntcodeEngine:
+        comp = IntcodeComputer(program.copy(), engine=engine)
+        outputs = _run_to_halt(comp, IntcodeInput(inputs.copy()))
+        results.append((outputs, comp._instr_ptr, _strip_trailing_zeros(comp.code)))
+    assert results[0] == results[1]
+
+
+def test_verbose_uses_opcode_classes(capsys: pytest.CaptureFixture[str]) -> None:
+    comp = IntcodeComputer(Intcode([1101, 1, 2, 5, 99, 0]), verbose=True)
+    res = comp()
+    assert "found completion operation" in capsys.readouterr().out
+    assert isinstance(res.opcode, intcode.Opcode1)
+
+
+@pytest.mark.parametrize("engine", list(IntcodeEngine))
+def test_run_until_blocked(engine: IntcodeEngine) -> None:
+    # Echo each input back twice until the program reads a 0.
+    comp = IntcodeComputer(
+        Intcode([3, 11, 4, 11, 4, 11, 1005, 11, 0, 99, 0, 0]), engine=engine
+    )
+    res = comp.run()
+    assert res.status is intcode.IntcodeStatus.NEEDS_INPUT
+    assert res.outputs == []
+
+    comp.inputs.put(5)
+    res = comp.run()
+    assert res.status is intcode.IntcodeStatus.NEEDS_INPUT
+    assert res.outputs == [5, 5]
+
+    res = comp.run(inputs=IntcodeInput([7, 0]))
+    assert res.status is intcode.IntcodeStatus.HALTED
+    assert res.outputs == [7, 7, 0, 0]
+    assert comp.run().outputs == []
+
+
+ECHO_TWICE_PROGRAM = [3, 11, 4, 11, 4, 11, 1005, 11, 0, 99, 0, 0]
+
+
+@pytest.mark.parametrize("engine", list(IntcodeEngine))
+def test_stream_outputs_with_send(engine: IntcodeEngine) -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM), engine=engine)
+    outputs = comp.stream(IntcodeInput([4]))
+    assert next(outputs) == 4
+    assert outputs.send(0) == 4
+    assert next(outputs) == 0
+    assert next(outputs) == 0
+    with pytest.raises(StopIteration) as stop:
+        next(outputs)
+    assert stop.value.value is intcode.IntcodeStatus.HALTED
+
+
+def test_stream_stops_without_input() -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    assert list(comp.stream(IntcodeInput([2]))) == [2, 2]
+    assert list(comp.stream(IntcodeInput([3, 0]))) == [3, 3, 0, 0]
+
+
+def test_stream_piped_into_another_computer() -> None:
+    upstream = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    downstream = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    source = upstream.stream(IntcodeInput([1, 2, 0]))
+    outputs = downstream.stream(source=source)
+    assert next(outputs) == 1
+    assert list(outputs) == [1, 1, 1, 2, 2, 2, 2, 0, 0]
+
+
+def test_snapshot_and_restore() -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    comp.inputs.put_many([4, 0])
+    snapshot = comp.snapshot()
+    assert comp.run().outputs == [4, 4, 0, 0]
+    for _ in range(2):
+        comp.restore(snapshot)
+        assert comp.run().outputs == [4, 4, 0, 0]
+
+
+def test_fork_is_independent() -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    comp.inputs.put(3)
+    assert comp.run().outputs == [3, 3]
+    comp.inputs.put(5)
+    fork = comp.fork()
+    fork.inputs.put(0)
+    assert fork.run().outputs == [5, 5, 0, 0]
+    assert comp.code[11] == 3
+    comp.inputs.put(0)
+    assert comp.run().outputs == [5, 5, 0, 0]
+
+
+def test_profile_counts_instructions_and_memory() -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    profile = comp.enable_profiling()
+    comp.inputs.put(2)
+    assert comp.run().outputs == [2, 2]
+    # The input instruction that blocked the run is not counted.
+    assert profile.opcode_counts == {3: 1, 4: 2, 5: 1}
+    comp.inputs.put(0)
+    assert comp.run().outputs == [0, 0]
+    assert profile.n_instructions == 9
+    assert profile.instruction_counts[0] == 2
+    assert profile.writes == {11: 2}
+    assert profile.reads[11] == 6
+    assert len(profile.run_times) == 2
+    assert json.loads(profile.to_json())["opcode_counts"]["4"] == 4
+    assert profile.hot_addresses(1).splitlines()[-1].split() == ["11", "0", "6", "2"]
+
+
+def test_profile_records_memory_growth() -> None:
+    comp = IntcodeComputer(Intcode([1101, 1, 2, 2000, 99]))
+    profile = comp.enable_profiling()
+    comp.run()
+    assert profile.memory_growth == [(5, 2001)]
+
+
+def test_disabled_profile_leaves_memory_untouched() -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    comp.enable_profiling()
+    comp.inputs.put_many([1, 0])
+    comp.run()
+    assert "read" not in vars(comp.code)
+    profile = comp.disable_profiling()
+    assert profile is not None and comp.profile is None
+    comp.restore(IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM)).snapshot())
+    comp.inputs.put_many([1, 0])
+    comp.run()
+    assert profile.n_instructions == 9
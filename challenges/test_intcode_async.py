@@ -0,0 +1,43 @@
+"""Test asyncio front-end for Intcode computers."""
+
+import asyncio
+
+from intcode import Intcode, IntcodeComputer, IntcodeStatus
+from intcode_async import AsyncIntcodeComputer, connect_ring
+
+# Day 7 feedback loop example with phase sequence 9,8,7,6,5.
+FEEDBACK_PROGRAM = [
+    int(x)
+    for x in (
+        "3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,"
+        "99,0,0,5"
+    ).split(",")
+]
+
+# Reads a value and writes it back out until it reads a 0.
+ECHO_PROGRAM = [3, 9, 4, 9, 1005, 9, 0, 99, 0, 0]
+
+
+def test_async_computer_echo() -> None:
+    async def echo() -> list[int]:
+        comp = AsyncIntcodeComputer(IntcodeComputer(Intcode(ECHO_PROGRAM)))
+        task = asyncio.create_task(comp.run())
+        for value in [3, 2, 1, 0]:
+            await comp.inputs.put(value)
+        assert await task is IntcodeStatus.HALTED
+        return [comp.outputs.get_nowait() for _ in range(comp.outputs.qsize())]
+
+    assert asyncio.run(echo()) == [3, 2, 1, 0]
+
+
+def test_ring_of_async_computers() -> None:
+    async def feedback_loop() -> int:
+        computers = [IntcodeComputer(Intcode(FEEDBACK_PROGRAM)) for _ in range(5)]
+        for comp, phase in zip(computers, [9, 8, 7, 6, 5]):
+            comp.inputs.put(phase)
+        machines = connect_ring(computers)
+        await machines[0].inputs.put(0)
+        await asyncio.gather(*[m.run() for m in machines])
+        return machines[0].inputs.get_nowait()
+
+    assert asyncio.run(feedback_loop()) == 139629729
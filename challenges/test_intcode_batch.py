@@ -0,0 +1,77 @@
+"""Test the batched Intcode executor."""
+
+import numpy as np
+from intcode import IntcodeComputer, IntcodeInput
+from intcode_batch import BatchIntcodeComputer, BatchLaneStatus
+from test_intcode import _read_program
+
+
+def test_batch_matches_computer_day05() -> None:
+    program = list(_read_program("05"))
+    inputs = np.array([[1], [5], [8]])
+    batch = BatchIntcodeComputer.from_program(program, 3, inputs=inputs)
+    res = batch.run()
+    assert (res.statuses == BatchLaneStatus.HALTED.value).all()
+    for lane, value in enumerate(inputs[:, 0].tolist()):
+        comp = IntcodeComputer(_read_program("05"))
+        assert res.outputs[lane] == comp.run(IntcodeInput([value])).outputs
+
+
+def test_batch_day02_sweep() -> None:
+    program = list(_read_program("02"))
+    batch = BatchIntcodeComputer.from_program(program, 100)
+    batch.memory[:, 1] = 12
+    batch.memory[:, 2] = np.arange(100)
+    res = batch.run()
+    for verb in (0, 2, 57, 99):
+        comp = IntcodeComputer(_read_program("02"))
+        comp.code[1], comp.code[2] = 12, verb
+        comp.run()
+        assert res.memory[verb].tolist() == list(comp.code)
+
+
+def test_batch_lanes_retire_independently() -> None:
+    # Lane 0 halts, lane 1 hits an unknown opcode, lane 2 loops until its counter
+    # reaches 3 and then runs into an empty cell, lane 3 waits for an input.
+    memory = np.array(
+        [
+            [1101, 1, 1, 12, 99, 0, 0, 0, 0, 0, 0, 0, 0],
+            [1101, 1, 1, 12, 42, 0, 0, 0, 0, 0, 0, 0, 0],
+            [1001, 12, 1, 12, 1007, 12, 3, 11, 1005, 11, 0, 0, 0],
+            [3, 12, 99, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        ]
+    )
+    res = BatchIntcodeComputer(memory).run()
+    assert res.statuses.tolist() == [
+        BatchLaneStatus.HALTED.value,
+        BatchLaneStatus.FAULT.value,
+        BatchLaneStatus.FAULT.value,
+        BatchLaneStatus.NEEDS_INPUT.value,
+    ]
+    assert res.memory[:, 12].tolist() == [2, 2, 3, 0]
+    assert res.instruction_pointers.tolist() == [4, 4, 11, 0]
+    assert len(res.lanes(BatchLaneStatus.FAULT)) == 2
+
+
+def test_batch_multiply_overflow_is_exact() -> None:
+    int64_min, int64_max = -(2**63), 2**63 - 1
+    # (a, b, whether a * b fits in an int64).
+    cases = [
+        (int64_max, 1, True),
+        (-(2**62), 2, True),
+        (int64_min, 1, True),
+        (0, int64_min, True),
+        (3037000499, 3037000499, True),
+        (3037000500, 3037000500, False),
+        (2**62 + 1, 2, False),
+        (int64_min, -1, False),
+        (-1, int64_min, False),
+    ]
+    memory = np.array([[1102, a, b, 5, 99, 0] for a, b, _ in cases])
+    res = BatchIntcodeComputer(memory).run()
+    for lane, (a, b, fits) in enumerate(cases):
+        if fits:
+            assert res.statuses[lane] == BatchLaneStatus.HALTED.value
+            assert res.memory[lane, 5] == a * b
+        else:
+            assert res.statuses[lane] == BatchLaneStatus.FAULT.value
@@ -0,0 +1,149 @@
+"""Test the Intcode basic-block compiler."""
+
+import pytest
+from intcode import (
+    Intcode,
+    IntcodeComputer,
+    IntcodeEngine,
+    IntcodeInput,
+    IntcodeStatus,
+)
+from intcode_compiler import CompiledIntcodeComputer
+from test_intcode import _read_program, _run_to_halt, _strip_trailing_zeros
+
+# Runs the loop twice; the first pass patches the add at address 4 into a multiply.
+SELF_MODIFYING_PROGRAM = [
+    *(1001, 100, 1, 100),
+    *(1101, 2, 3, 101),
+    *(1101, 0, 1102, 4),
+    *(1007, 100, 2, 102),
+    *(1005, 102, 0),
+    *(4, 101),
+    99,
+]
+
+# Jumps to 27, 27, 23, 23 and then 27 again. The block compiled from 23 overlaps the
+# one from 27, and the patch of address 29 before the last jump has to drop both.
+OVERLAPPING_BLOCKS_PROGRAM = [
+    *(1007, 103, 2, 105),
+    *(1008, 103, 4, 106),
+    *(1, 105, 106, 105),
+    *(1002, 105, 4, 105),
+    *(1001, 105, 23, 105),
+    *(105, 1, 105),
+    *(1001, 100, 1, 100),
+    *(1101, 0, 7, 101),
+    *(4, 101),
+    *(1001, 103, 1, 103),
+    *(1008, 103, 5, 107),
+    *(1005, 107, 58),
+    *(1008, 103, 4, 108),
+    *(1006, 108, 0),
+    *(1101, 0, 16, 29),
+    *(1105, 1, 0),
+    99,
+    *([0] * 51),
+]
+
+# Counts up by the immediate at address 7 and outputs the counter. Once the counter
+# reaches 4 the immediate is patched to 5 a single time: outputs 1, 2, 3, 4, 9, 14.
+PATCHED_IMMEDIATE_PROGRAM = [
+    *(1106, 0, 5, 0, 0),
+    *(1001, 40, 1, 40),
+    *(4, 40),
+    *(1007, 40, 4, 41),
+    *(1005, 41, 5),
+    *(1008, 40, 4, 41),
+    *(1006, 41, 29),
+    *(1101, 0, 5, 7),
+    *(1007, 40, 10, 41),
+    *(1005, 41, 5),
+    99,
+    *([0] * 5),
+]
+
+
+@pytest.mark.parametrize(
+    "day, inputs",
+    [
+        ("02", []),
+        ("05", [1]),
+        ("05", [5]),
+        ("07", [0, 0]),
+        ("07", [4, 17]),
+        ("09", [1]),
+    ],
+)
+def test_compiled_parity(day: str, inputs: list[int]) -> None:
+    program = _read_program(day)
+    results = []
+    for cls in (IntcodeComputer, CompiledIntcodeComputer):
+        comp = cls(program.copy())
+        outputs = _run_to_halt(comp, IntcodeInput(inputs.copy()))
+        results.append((outputs, comp._instr_ptr, _strip_trailing_zeros(comp.code)))
+    assert results[0] == results[1]
+
+
+def test_compiled_loop_only_compiles_repeated_code() -> None:
+    # Count to 100 in a loop, then output the counter.
+    program = [1101, 0, 0, 20, 1001, 20, 1, 20, 1007, 20, 100, 21, 1005, 21, 4]
+    comp = CompiledIntcodeComputer(Intcode(program + [4, 20, 99]))
+    assert comp.run().outputs == [100]
+    compiled = {start for start, block in comp._blocks.items() if block is not None}
+    assert compiled == {4}
+
+
+def test_compiled_self_modifying_code() -> None:
+    comp = CompiledIntcodeComputer(Intcode(SELF_MODIFYING_PROGRAM))
+    res = comp.run()
+    assert res.status is IntcodeStatus.HALTED
+    assert res.outputs == [6]
+    assert comp._dirty == {4}
+    assert IntcodeComputer(Intcode(SELF_MODIFYING_PROGRAM)).run().outputs == [6]
+
+
+def test_compiled_overlapping_blocks_are_invalidated() -> None:
+    comp = CompiledIntcodeComputer(Intcode(OVERLAPPING_BLOCKS_PROGRAM))
+    expected = IntcodeComputer(Intcode(OVERLAPPING_BLOCKS_PROGRAM)).run().outputs
+    assert expected == [7, 7, 7, 7, 16]
+    assert comp.run().outputs == expected
+    assert comp._dirty == {29}
+
+
+def test_compiled_opcode_classes_invalidate_blocks() -> None:
+    comp = CompiledIntcodeComputer(Intcode(PATCHED_IMMEDIATE_PROGRAM))
+    stream = comp.stream()
+    outputs = [next(stream) for _ in range(4)]
+    assert 5 in comp._blocks
+    comp.engine = IntcodeEngine.OPCODE_CLASSES
+    outputs.append(next(stream))
+    comp.engine = IntcodeEngine.DISPATCH
+    outputs += list(stream)
+    assert outputs == [1, 2, 3, 4, 9, 14]
+    assert IntcodeComputer(Intcode(PATCHED_IMMEDIATE_PROGRAM)).run().outputs == outputs
+
+
+def test_compiled_profiled_write_invalidates_blocks() -> None:
+    comp = CompiledIntcodeComputer(Intcode(PATCHED_IMMEDIATE_PROGRAM))
+    stream = comp.stream()
+    outputs = [next(stream) for _ in range(4)]
+    assert 5 in comp._blocks
+    profile = comp.enable_profiling()
+    outputs.append(next(stream))
+    comp.disable_profiling()
+    outputs += list(stream)
+    assert outputs == [1, 2, 3, 4, 9, 14]
+    assert profile.writes[7] == 1
+
+
+def test_compiled_fork_and_restore() -> None:
+    comp = CompiledIntcodeComputer(Intcode([3, 9, 1001, 9, 5, 9, 4, 9, 99, 0]))
+    snapshot = comp.snapshot()
+    fork = comp.fork()
+    assert isinstance(fork, CompiledIntcodeComputer)
+    assert comp.run(IntcodeInput([1])).outputs == [6]
+    assert len(comp._heat) > 0
+    comp.restore(snapshot)
+    assert len(comp._heat) == 0 and len(comp._blocks) == 0
+    assert comp.run(IntcodeInput([2])).outputs == [7]
+    assert fork.run(IntcodeInput([3])).outputs == [8]
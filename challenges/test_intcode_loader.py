@@ -0,0 +1,89 @@
+"""Test the cached Intcode program loader."""
+
+import pickle
+from pathlib import Path
+
+import pytest
+from intcode import Intcode, IntcodeComputer, IntcodeInput
+from intcode_loader import (
+    CachedProgram,
+    ProgramCacheException,
+    cache_program,
+    load_program,
+)
+from test_intcode import DATA_DIR, ECHO_TWICE_PROGRAM, _read_program
+
+
+def _write_program(path: Path, values: list[int]) -> Path:
+    path.write_text(",".join(str(x) for x in values) + "\n")
+    return path
+
+
+def test_loaded_program_matches_parsed(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    program = load_program(DATA_DIR / "09" / "input.txt", cache_dir=cache_dir)
+    assert program == _read_program("09")
+    assert len(list(cache_dir.iterdir())) == 1
+    res = IntcodeComputer(program).run(IntcodeInput([1]))
+    assert (
+        res.outputs
+        == IntcodeComputer(_read_program("09")).run(IntcodeInput([1])).outputs
+    )
+
+
+def test_big_values_round_trip(tmp_path: Path) -> None:
+    values = [104, 2**70, 104, -(2**63), 104, -(2**80) + 3, 99]
+    source = _write_program(tmp_path / "big.txt", values)
+    program = load_program(source, cache_dir=tmp_path / "cache")
+    assert list(program) == values
+
+
+def test_cache_is_reused_and_keyed_by_content(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    source = _write_program(tmp_path / "prog.txt", ECHO_TWICE_PROGRAM)
+    first = cache_program(source, cache_dir=cache_dir)
+    mtime = first.path.stat().st_mtime_ns
+    assert cache_program(source, cache_dir=cache_dir) == first
+    assert first.path.stat().st_mtime_ns == mtime
+
+    _write_program(source, [99])
+    second = cache_program(source, cache_dir=cache_dir)
+    assert second != first and list(second.load()) == [99]
+
+
+def test_writes_do_not_change_the_cache(tmp_path: Path) -> None:
+    source = _write_program(tmp_path / "prog.txt", [1, 0, 0, 0, 99])
+    cached = cache_program(source, cache_dir=tmp_path / "cache")
+    program = cached.load()
+    program[0] = 2
+    program[10] = 5
+    assert list(cached.load()) == [1, 0, 0, 0, 99]
+    assert program[:5] == [2, 0, 0, 0, 99]
+
+
+def test_loaded_program_pickles(tmp_path: Path) -> None:
+    source = _write_program(tmp_path / "prog.txt", ECHO_TWICE_PROGRAM)
+    cached = cache_program(source, cache_dir=tmp_path / "cache")
+    assert pickle.loads(pickle.dumps(cached.load())) == Intcode(ECHO_TWICE_PROGRAM)
+    assert pickle.loads(pickle.dumps(cached)) == cached
+
+
+def test_bad_cache_file(tmp_path: Path) -> None:
+    path = tmp_path / "bad.icp"
+    path.write_bytes(b"not a program cache file")
+    with pytest.raises(ProgramCacheException):
+        CachedProgram(path).load()
+
+
+@pytest.mark.parametrize("keep_bytes", [0, 10, 30, -1])
+def test_truncated_cache_file_is_rewritten(tmp_path: Path, keep_bytes: int) -> None:
+    cache_dir = tmp_path / "cache"
+    values = [104, 2**70, 99, *range(10)]
+    source = _write_program(tmp_path / "prog.txt", values)
+    path = cache_program(source, cache_dir=cache_dir).path
+    data = path.read_bytes()
+    path.write_bytes(data[:keep_bytes])
+    with pytest.raises(ProgramCacheException):
+        CachedProgram(path).load()
+    assert list(load_program(source, cache_dir=cache_dir)) == values
+    assert path.read_bytes() == data
@@ -0,0 +1,48 @@
+"""Test Intcode network scheduler."""
+
+from intcode import Intcode, IntcodeComputer, IntcodeStatus
+from intcode_network import IntcodeNetwork, IntcodeNetworkStatus
+
+# Day 7 feedback loop example with phase sequence 9,8,7,6,5.
+FEEDBACK_PROGRAM = [
+    int(x)
+    for x in (
+        "3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,"
+        "99,0,0,5"
+    ).split(",")
+]
+
+# Reads a value and writes it back out, forever.
+ECHO_PROGRAM = [3, 5, 4, 5, 1105, 1, 0]
+
+
+def test_feedback_loop_halts() -> None:
+    amps = [IntcodeComputer(Intcode(FEEDBACK_PROGRAM)) for _ in range(5)]
+    for amp, phase in zip(amps, [9, 8, 7, 6, 5]):
+        amp.inputs.put(phase)
+    amps[0].inputs.put(0)
+    network = IntcodeNetwork(amps, wiring={i: [(i + 1) % 5] for i in range(5)})
+    res = network.run()
+    assert res.status is IntcodeNetworkStatus.HALTED
+    assert res.last_outputs[4] == 139629729
+
+
+def test_deadlock_detected() -> None:
+    computers = [IntcodeComputer(Intcode(ECHO_PROGRAM)) for _ in range(2)]
+    computers[0].inputs.put(7)
+    res = IntcodeNetwork(computers, wiring={0: [1]}).run()
+    assert res.status is IntcodeNetworkStatus.DEADLOCK
+    assert res.node_statuses == [IntcodeStatus.NEEDS_INPUT] * 2
+    assert res.last_outputs == {0: 7, 1: 7}
+
+
+def test_idle_machines_are_not_polled() -> None:
+    # Inputs flow down the chain in one pass, after which every machine is waiting
+    # on an empty queue and none of them is run again.
+    computers = [IntcodeComputer(Intcode(ECHO_PROGRAM)) for _ in range(10)]
+    computers[0].inputs.put(3)
+    wiring = {i: [i + 1] for i in range(9)}
+    res = IntcodeNetwork(computers, wiring=wiring).run()
+    assert res.status is IntcodeNetworkStatus.DEADLOCK
+    assert res.last_outputs[9] == 3
+    assert res.n_runs == 10
@@ -0,0 +1,69 @@
+"""Test symbolic execution of Intcode programs."""
+
+import pytest
+from intcode import Intcode, IntcodeComputer
+from intcode_symbolic import (
+    Polynomial,
+    SymbolicBranchException,
+    SymbolicExecutionException,
+    SymbolicIntcodeComputer,
+    UnsolvableExpressionException,
+    solve_for_target,
+)
+from test_intcode import _read_program
+
+NOUN_VERB = {"noun": range(100), "verb": range(100)}
+
+
+def test_polynomial_arithmetic() -> None:
+    x, y = Polynomial.symbol("x"), Polynomial.symbol("y")
+    p = (x + Polynomial.constant(2)) * (x + y)
+    assert str(p) == "x*y + x^2 + 2*x + 2*y"
+    assert p.evaluate({"x": 3, "y": 4}) == 35
+    assert p.degree("x") == 2 and p.degree("y") == 1
+    two = Polynomial.constant(2)
+    assert p.split("y") == {0: x * x + two * x, 1: x + two}
+    assert (x + Polynomial.constant(-1) * x).is_constant
+
+
+def test_symbolic_day02_matches_computer() -> None:
+    program = list(_read_program("02"))
+    res = SymbolicIntcodeComputer(program, {1: "noun", 2: "verb"}).run()
+    expression = res.value_at(0)
+    assert expression.symbols == {"noun", "verb"}
+    for noun, verb in [(12, 2), (0, 0), (31, 46), (99, 99)]:
+        code = Intcode(program)
+        code[1], code[2] = noun, verb
+        IntcodeComputer(code).run()
+        assert expression.evaluate({"noun": noun, "verb": verb}) == code[0]
+
+
+def test_solve_for_target() -> None:
+    x, y = Polynomial.symbol("noun"), Polynomial.symbol("verb")
+    linear = Polynomial.constant(100) * x + y
+    assert solve_for_target(linear, 1234, NOUN_VERB) == {"noun": 12, "verb": 34}
+    assert solve_for_target(linear, 100 * 100, NOUN_VERB) is None
+    # No symbol appears linearly, so every pair is enumerated.
+    quadratic = x * x + y * y
+    assert solve_for_target(quadratic, 25, NOUN_VERB) == {"noun": 0, "verb": 5}
+    # A symbol missing from the expression takes the smallest value in its domain.
+    assert solve_for_target(y, 7, NOUN_VERB) == {"noun": 0, "verb": 7}
+
+
+def test_symbolic_branch_raises() -> None:
+    # Jump if the symbol at address 3 is non-zero.
+    with pytest.raises(SymbolicBranchException):
+        SymbolicIntcodeComputer([1005, 3, 0, 0, 99], {3: "x"}).run()
+
+
+def test_symbolic_missing_input_raises() -> None:
+    with pytest.raises(SymbolicExecutionException):
+        SymbolicIntcodeComputer([3, 0, 3, 0, 99], {}).run(inputs=[1])
+
+
+def test_symbolic_address_read_is_opaque() -> None:
+    # Add the value at the symbolic address `x` to itself.
+    res = SymbolicIntcodeComputer([1, 0, 0, 0, 99], {1: "x", 2: "x"}).run()
+    assert res.value_at(0).symbols == {"@[x]"}
+    with pytest.raises(UnsolvableExpressionException):
+        solve_for_target(res.value_at(0), 10, {"x": range(10)})
@@ -0,0 +1,82 @@
+"""Test binary Intcode traces."""
+
+from pathlib import Path
+
+from intcode import Intcode, IntcodeComputer, IntcodeInput
+from intcode_compiler import CompiledIntcodeComputer
+from intcode_trace import IntcodeTrace
+from test_intcode import ECHO_TWICE_PROGRAM, _read_program
+from test_intcode_compiler import PATCHED_IMMEDIATE_PROGRAM
+
+
+def test_trace_ring_buffer_keeps_last_records() -> None:
+    trace = IntcodeTrace(capacity=3)
+    for ptr in range(5):
+        trace.append(ptr, 1, (0, 1, 0), (ptr, 2, 10), 10, ptr + 2)
+    assert len(trace) == 3 and trace.n_recorded == 5
+    records = list(trace)
+    assert [r.instruction_pointer for r in records] == [2, 3, 4]
+    assert [r.index for r in records] == [2, 3, 4]
+    assert records[0].modes == (0, 1, 0)
+    assert records[0].params == (2, 2, 10)
+    assert (records[0].write_address, records[0].write_value) == (10, 4)
+    assert [r.index for r in trace.last(2)] == [3, 4]
+
+
+def test_trace_truncates_big_values() -> None:
+    trace = IntcodeTrace(capacity=1)
+    trace.append(0, 1, (1, 1, 0), (2**70, 1, 0), 0, 2**70 + 1)
+    record = trace.last(1)[0]
+    assert record.truncated
+    assert record.write_value == 1
+
+
+def test_computer_trace_records_execution() -> None:
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    trace = comp.enable_tracing(capacity=100)
+    assert comp.run(IntcodeInput([7, 0])).outputs == [7, 7, 0, 0]
+    assert [r.opcode for r in trace] == [3, 4, 4, 5] * 2 + [99]
+    inputs = list(trace.filter(opcode=3))
+    assert [(r.write_address, r.write_value) for r in inputs] == [(11, 7), (11, 0)]
+    assert [r.index for r in trace.filter(instruction_pointer=6)] == [3, 7]
+
+    memory = list(ECHO_TWICE_PROGRAM)
+    trace.replay(memory)
+    assert memory == list(comp.code)
+
+
+def test_traced_run_matches_untraced() -> None:
+    program = _read_program("05")
+    plain = IntcodeComputer(program.copy()).run(IntcodeInput([5]))
+    comp = IntcodeComputer(program.copy())
+    trace = comp.enable_tracing(capacity=10)
+    assert comp.run(IntcodeInput([5])) == plain
+    assert len(trace) == 10 and trace.last(1)[0].opcode == 99
+    assert comp.disable_tracing() is trace and comp.trace is None
+
+
+def test_trace_file_can_be_reopened(tmp_path: Path) -> None:
+    path = tmp_path / "trace.bin"
+    comp = IntcodeComputer(Intcode(ECHO_TWICE_PROGRAM))
+    trace = comp.enable_tracing(capacity=4, path=path)
+    comp.run(IntcodeInput([3, 0]))
+    expected = list(trace)
+    trace.close()
+
+    reopened = IntcodeTrace.open(path)
+    assert reopened.capacity == 4 and reopened.n_recorded == 9
+    assert list(reopened) == expected
+    reopened.close()
+
+
+def test_traced_write_invalidates_compiled_blocks() -> None:
+    comp = CompiledIntcodeComputer(Intcode(PATCHED_IMMEDIATE_PROGRAM))
+    stream = comp.stream()
+    outputs = [next(stream) for _ in range(4)]
+    assert 5 in comp._blocks
+    trace = comp.enable_tracing(capacity=100)
+    outputs.append(next(stream))
+    comp.disable_tracing()
+    outputs += list(stream)
+    assert outputs == [1, 2, 3, 4, 9, 14]
+    assert any(r.write_address == 7 for r in trace.last(len(trace)))
@@ -0,0 +1,63 @@
+"""Test the orbit graph."""
+
+import random
+
+import pytest
+from challenge_06 import TEST_ORBIT_MAP_INPUT
+from orbit_graph import OrbitGraph, OrbitMapException, UnknownBodyException
+
+
+def test_example_orbits() -> None:
+    graph = OrbitGraph.from_lines(TEST_ORBIT_MAP_INPUT + ["K)YOU", "I)SAN"])
+    assert graph.total_orbits() == 42 + 7 + 5
+    assert graph.depth("COM") == 0 and graph.depth("L") == 7
+    assert graph.common_center("YOU", "SAN") == "D"
+    assert graph.transfers("YOU", "SAN") == 4
+    # The depths are searched once and kept.
+    assert graph.depths is graph.depths
+
+
+def test_deep_chain() -> None:
+    n = 50_000
+    lines = ["COM)0"] + [f"{i}){i + 1}" for i in range(n)]
+    random.Random(6).shuffle(lines)
+    graph = OrbitGraph.from_lines(lines)
+    assert graph.depth(str(n)) == n + 1
+    assert graph.total_orbits() == (n + 1) * (n + 2) // 2
+    assert graph.transfers("10", str(n)) == n - 12
+
+
+def test_random_trees_match_parent_walk() -> None:
+    rng = random.Random(25)
+    for _ in range(20):
+        n = rng.randint(1, 300)
+        parents = {
+            f"b{i}": rng.choice(["COM"] + [f"b{j}" for j in range(i)]) for i in range(n)
+        }
+        graph = OrbitGraph(list((c, b) for b, c in parents.items()))
+        for body in parents:
+            depth, center = 0, body
+            while center != "COM":
+                depth, center = depth + 1, parents[center]
+            assert graph.depth(body) == depth
+        assert graph.total_orbits() == sum(graph.depth(b) for b in parents)
+
+
+def test_bad_orbit_maps() -> None:
+    with pytest.raises(OrbitMapException):
+        OrbitGraph.from_lines(["COM)A", "B)A"])
+    with pytest.raises(OrbitMapException):
+        OrbitGraph.from_lines(["COM)A", "B)C", "C)B"]).total_orbits()
+    # Cycles through the center of mass.
+    with pytest.raises(OrbitMapException):
+        OrbitGraph.from_lines(["COM)A", "A)COM"]).total_orbits()
+    with pytest.raises(OrbitMapException):
+        OrbitGraph.from_lines(["COM)COM"]).total_orbits()
+    with pytest.raises(OrbitMapException):
+        OrbitGraph.from_lines(["COM)A"]).transfers("COM", "A")
+    with pytest.raises(OrbitMapException):
+        OrbitGraph.from_lines(["COM-A"])
+    with pytest.raises(UnknownBodyException):
+        OrbitGraph.from_lines(["A)B"])
+    with pytest.raises(UnknownBodyException):
+        OrbitGraph.from_lines(["COM)A"]).depth("B")
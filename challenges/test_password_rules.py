@@ -0,0 +1,64 @@
+"""Test the password rule engine."""
+
+import numpy as np
+import pytest
+from password_rules import (
+    NonDecreasing,
+    PasswordValidator,
+    Rule,
+    UnknownRuleException,
+    candidate_batches,
+    count_matching,
+    digit_matrix,
+    forbidden_digits,
+    non_decreasing_matrix,
+    run_of_at_least,
+    run_of_exactly,
+    runs_of_at_most,
+)
+
+RULE_SETS: list[list[Rule]] = [
+    [NonDecreasing(), run_of_at_least(2)],
+    [NonDecreasing(), run_of_exactly(2)],
+    [run_of_exactly(3), forbidden_digits([0, 7])],
+    [runs_of_at_most(2), run_of_at_least(2)],
+    [],
+]
+
+
+def test_validator_single_password() -> None:
+    part_2 = PasswordValidator([NonDecreasing(), run_of_exactly(2)])
+    assert part_2.check(112233) and part_2.check(111122)
+    assert not part_2.check(123444) and not part_2.check(223450)
+    no_sevens = PasswordValidator([forbidden_digits([7])])
+    assert no_sevens.check(123) and not no_sevens.check(172)
+    with pytest.raises(UnknownRuleException):
+        PasswordValidator(["not a rule"])  # type: ignore[list-item]
+
+
+def test_mask_matches_single_checks() -> None:
+    numbers = np.arange(100_000, 130_000)
+    digits = digit_matrix(numbers, 6)
+    for rules in RULE_SETS:
+        validator = PasswordValidator(rules)
+        expected = [validator.check(int(x)) for x in numbers]
+        assert validator.mask(digits).tolist() == expected
+
+
+def test_non_decreasing_candidates() -> None:
+    assert non_decreasing_matrix(1)[:, 0].tolist() == list(range(10))
+    digits = non_decreasing_matrix(3)
+    assert len(digits) == 165 and (np.diff(digits, axis=1) >= 0).all()
+    batches = list(candidate_batches(5, 120, non_decreasing=True, batch_size=20))
+    numbers = [int("".join(map(str, row))) for b in batches for row in b]
+    expected = [x for x in range(5, 120) if list(str(x)) == sorted(str(x))]
+    assert numbers == expected
+
+
+def test_count_matching_many_rule_sets() -> None:
+    validators = [PasswordValidator(rules) for rules in RULE_SETS]
+    low, high = 0, 25_000
+    expected = [sum(v.check(x) for x in range(low, high)) for v in validators]
+    assert count_matching(validators, low, high, batch_size=4096) == expected
+    # Only non-decreasing candidates are built when every rule set needs them.
+    assert count_matching(validators[:2], 156218, 652527) == [1694, 1148]